@@ -0,0 +1,289 @@
+"""
+Micro-benchmarks for the harness primitives
+Serves a local stand-in of the store's navbar (fixtures/navbar.html) and times
+the operations the testers are built from: starting Chrome, driver.get,
+WebDriverWait + element_to_be_clickable, find_elements over ul.top_nav li a,
+bulk attribute reads and generate_html_report with 10/1k/100k results.
+
+Every run is appended to benchmarks/history.jsonl with the git revision and
+compared with the previous entry, so harness changes can be judged on data.
+
+Usage:
+    python benchmarks/bench_harness.py
+    python benchmarks/bench_harness.py --repeat 20 --only find_elements,attribute_reads
+    python benchmarks/bench_harness.py --no-record
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+HISTORY_PATH = os.path.join(BENCH_DIR, 'history.jsonl')
+
+REPORT_SIZES = (10, 1000, 100000)
+# Changes smaller than this fraction are treated as noise in the comparison
+NOISE = 0.10
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serve benchmarks/fixtures on a free local port"""
+
+    def __init__(self):
+        self._server = None
+
+    def __enter__(self):
+        handler = partial(_QuietHandler, directory=FIXTURE_DIR)
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/navbar.html"
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def measure(fn, repeat, setup=None):
+    """
+    Time fn() repeat times (setup() runs untimed before each call)
+
+    Returns:
+        dict: min/median/p95 in milliseconds and the number of runs
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 3),
+        'runs': len(timings),
+    }
+
+
+def _chrome_options():
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return options
+
+
+def browser_benchmarks(url, repeat, selected):
+    """Benchmarks that need Chrome; returns {} when Chrome cannot start"""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    results = {}
+    if 'driver_creation' in selected:
+        drivers = []
+
+        def create():
+            drivers.append(webdriver.Chrome(options=_chrome_options()))
+
+        def quit_previous():
+            while drivers:
+                drivers.pop().quit()
+
+        try:
+            # Fewer runs: every run starts a full browser
+            results['driver_creation'] = measure(create, max(1, repeat // 5), setup=quit_previous)
+        except Exception as e:
+            print(f"[BENCH] Chrome could not start, skipping browser benchmarks: {str(e).splitlines()[0]}")
+            return results
+        finally:
+            quit_previous()
+
+    try:
+        driver = webdriver.Chrome(options=_chrome_options())
+    except Exception as e:
+        print(f"[BENCH] Chrome could not start, skipping browser benchmarks: {str(e).splitlines()[0]}")
+        return results
+
+    try:
+        driver.get(url)
+        if 'driver_get' in selected:
+            results['driver_get'] = measure(lambda: driver.get(url), repeat)
+        if 'wait_clickable' in selected:
+            results['wait_clickable'] = measure(
+                lambda: WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".hamburger-icon"))),
+                repeat
+            )
+
+        links = []
+        if 'find_elements' in selected:
+            def find_links():
+                links[:] = driver.find_element(By.CSS_SELECTOR, "ul.top_nav").find_elements(By.CSS_SELECTOR, "li a")
+            results['find_elements'] = measure(find_links, repeat)
+            results['find_elements']['elements'] = len(links)
+
+        if 'attribute_reads' in selected:
+            links = links or driver.find_element(By.CSS_SELECTOR, "ul.top_nav").find_elements(By.CSS_SELECTOR, "li a")
+            # What the steps do today: one round trip per element and attribute
+            results['attribute_reads'] = measure(
+                lambda: [(link.text, link.get_attribute('href')) for link in links], repeat
+            )
+            # The same data in a single script round trip, for comparison
+            results['attribute_reads_script'] = measure(
+                lambda: driver.execute_script(
+                    "return Array.from(arguments[0], a => [a.innerText, a.href]);", links
+                ),
+                repeat
+            )
+            results['attribute_reads']['elements'] = len(links)
+    finally:
+        driver.quit()
+    return results
+
+
+def _synthetic_results(count):
+    statuses = ('PASSED', 'PASSED', 'PASSED', 'FAILED', 'QUARANTINED')
+    return [{
+        'step': f'Step {i + 1}: Synthetic <step> & check',
+        'status': statuses[i % len(statuses)],
+        'message': f'Synthetic result {i} with a message long enough to look like a real one',
+        'duration': f'{(i % 97) / 10:.2f}s',
+        'details': [('Attempts', '1'), ('Network', '12 request(s), 340 KB')] if i % 3 == 0 else [],
+    } for i in range(count)]
+
+
+def report_benchmarks(repeat, sizes):
+    """Time NavbarTester.generate_html_report for each result count (no browser needed)"""
+    from suites import load_suite_class
+
+    tester_cls = load_suite_class('navbar')
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The report is written to ./test_reports; keep it out of the repository
+        os.chdir(work_dir)
+        try:
+            for size in sizes:
+                tester = tester_cls('http://127.0.0.1/')
+                tester.test_results = _synthetic_results(size)
+                tester.start_time, tester.end_time = 0.0, 1.0
+
+                def generate():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        os.remove(tester.generate_html_report(True))
+
+                runs = repeat if size <= 1000 else max(1, min(repeat, 3))
+                results[f'generate_html_report_{size}'] = measure(generate, runs)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_revision():
+    """Short revision of the working tree, with '+dirty' if it has local changes"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{revision}+dirty" if dirty else revision
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current, previous):
+    """Print each benchmark's median against the previous entry"""
+    print(f"\n{'Benchmark':<32}{'median ms':>12}{'previous':>12}{'change':>10}")
+    for name, stats in current['results'].items():
+        before = (previous or {}).get('results', {}).get(name)
+        if not before:
+            print(f"{name:<32}{stats['median_ms']:>12.2f}{'-':>12}{'new':>10}")
+            continue
+        change = (stats['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0.0
+        flag = ' slower' if change > NOISE else (' faster' if change < -NOISE else '')
+        print(f"{name:<32}{stats['median_ms']:>12.2f}{before['median_ms']:>12.2f}{change * 100:>+9.1f}%{flag}")
+    if previous:
+        print(f"\nCompared with {previous['revision']} ({previous['timestamp']})")
+
+
+BENCHMARKS = ['driver_creation', 'driver_get', 'wait_clickable', 'find_elements', 'attribute_reads', 'generate_html_report']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the harness primitives against a local navbar fixture')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per benchmark')
+    parser.add_argument('--only', help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in REPORT_SIZES),
+                        help='Result counts for generate_html_report')
+    parser.add_argument('--no-record', action='store_true', help='Do not append to the history file')
+    args = parser.parse_args(argv)
+
+    selected = set(args.only.split(',')) if args.only else set(BENCHMARKS)
+    unknown = selected - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    if selected - {'generate_html_report'}:
+        with FixtureServer() as url:
+            results.update(browser_benchmarks(url, args.repeat, selected))
+    if 'generate_html_report' in selected:
+        results.update(report_benchmarks(args.repeat, [int(size) for size in args.sizes.split(',')]))
+
+    import selenium
+    entry = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'selenium': selenium.__version__,
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    history = load_history()
+    compare(entry, history[-1] if history else None)
+
+    if not args.no_record:
+        with open(HISTORY_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        print(f"[BENCH] Recorded in {os.path.relpath(HISTORY_PATH, REPO_DIR)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
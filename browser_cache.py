@@ -0,0 +1,428 @@
+"""
+Shared browser disk cache and cold-vs-warm cache benchmark
+Without it, every Chrome the testers start (pooled or one per step 7-14)
+begins with an empty profile and downloads the store's full asset set again.
+SharedBrowserCache gives each browser a managed cache directory instead. The
+directories are fixed slots under one root, each bounded with
+--disk-cache-size, and a browser takes the most recently used free slot, so
+later browsers start with a warm HTTP cache. Two running Chromes cannot
+share one cache directory, so there is one slot per browser that runs at the
+same time. The root may be shared by several processes (e.g. CLI runs next to
+the scheduler): a browser holds an exclusive lock on its slot's lock file, and
+slots locked by another process are skipped. The rest of the profile (cookies, storage) is recreated empty
+for every browser, so steps stay as isolated as before.
+
+The benchmark mode loads the same pages in a new browser with an empty cache
+(cold) and again in a second new browser with the cache the first one left
+(warm, like a returning visitor). It compares Navigation Timing and Resource
+Timing between the two.
+
+Usage:
+    python "the_soul_store_navbar (1).py" --shared-cache
+    python soul_store_cli.py navbar --repeat 5 --concurrency 2 --shared-cache
+    python browser_cache.py --paths /,/men,/women --rounds 3
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import threading
+import time
+from html import escape
+from urllib.parse import urljoin
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from step_runner import StepHook
+
+
+DEFAULT_ROOT = 'test_reports/browser_cache'
+DEFAULT_PATHS = ['/', '/men', '/women']
+
+# The default buffer (250 entries) is smaller than a store page's resource list
+RESOURCE_BUFFER_JS = "performance.setResourceTimingBufferSize(2000);"
+
+PAGE_TIMING_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav || !nav.loadEventEnd) { return null; }
+const resources = performance.getEntriesByType('resource');
+let transfer = nav.transferSize, cached = 0, network = 0, opaque = 0;
+for (const entry of resources) {
+    transfer += entry.transferSize;
+    if (entry.transferSize === 0 && entry.decodedBodySize === 0) {
+        // Cross-origin without Timing-Allow-Origin: sizes are hidden
+        opaque += 1;
+    } else if (entry.transferSize === 0) {
+        cached += 1;
+    } else {
+        network += 1;
+    }
+}
+return {
+    ttfb_ms: nav.responseStart - nav.startTime,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd - nav.startTime,
+    load_ms: nav.loadEventEnd - nav.startTime,
+    requests: resources.length,
+    transfer_kb: transfer / 1024,
+    from_cache: cached,
+    from_network: network,
+    opaque: opaque,
+};
+"""
+
+
+def _lock_file(path):
+    """
+    Take an exclusive lock on path without waiting
+
+    The lock is released when the returned file is closed, or when the process
+    exits, so a crashed run never leaves a slot locked.
+
+    Returns:
+        file: Open lock file to pass to _unlock_file, or None if another process holds the lock
+    """
+    lock = open(path, 'a+b')
+    try:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def _unlock_file(lock):
+    try:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+    lock.close()
+
+
+def _dir_size(path):
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+class SharedBrowserCache(StepHook):
+    def __init__(self, root=DEFAULT_ROOT, cache_mb=256, slots=4):
+        """
+        Args:
+            root (str): Directory holding the cache slots (kept between runs)
+            cache_mb (int): Disk cache limit per slot; the root stays below slots * cache_mb
+            slots (int): Cache directories, i.e. browsers that get a warm cache at the same time;
+                further browsers start with a temporary empty profile as before
+        """
+        self.root = os.path.abspath(root)
+        self.cache_mb = cache_mb
+        self.slots = max(1, slots)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Slots not used by a browser of this process (another process may still hold one)
+        self._free = [os.path.join(self.root, f'slot-{index}') for index in range(self.slots)]
+        # slot directory -> open lock file, while a browser of this process uses the slot
+        self._locks = {}
+        # id(driver) -> slot directory
+        self._drivers = {}
+        self.stats = {'warm_starts': 0, 'cold_starts': 0, 'unmanaged': 0}
+        os.makedirs(self.root, exist_ok=True)
+        self.prune()
+
+    @staticmethod
+    def _cache_mtime(slot):
+        cache_dir = os.path.join(slot, 'cache')
+        return os.path.getmtime(cache_dir) if os.path.isdir(cache_dir) else 0.0
+
+    def prune(self):
+        """Delete slots beyond the configured number (left by runs with more slots) that nobody uses"""
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not name.startswith('slot-') or name.endswith('.lock') or path in self._free:
+                continue
+            with self._lock:
+                if path in self._locks:
+                    continue
+            # A process running with more slots may still have a browser in it
+            lock = _lock_file(f'{path}.lock')
+            if lock is None:
+                continue
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                _unlock_file(lock)
+
+    def clear(self):
+        """Empty the caches of every free slot that no other process is using"""
+        with self._lock:
+            slots = list(self._free)
+        for slot in slots:
+            lock = _lock_file(f'{slot}.lock')
+            if lock is None:
+                continue
+            try:
+                shutil.rmtree(os.path.join(slot, 'cache'), ignore_errors=True)
+            finally:
+                _unlock_file(lock)
+
+    def usage_mb(self):
+        return _dir_size(self.root) / (1024 * 1024)
+
+    def _take_slot(self):
+        """Lock the free slot with the most recently used cache, or return None if all are in use"""
+        with self._lock:
+            # Caches change under other processes too, so look at the disk every time
+            for slot in sorted(self._free, key=self._cache_mtime, reverse=True):
+                lock = _lock_file(f'{slot}.lock')
+                if lock is None:
+                    continue
+                warm = self._cache_mtime(slot) > 0
+                self._free.remove(slot)
+                self._locks[slot] = lock
+                self.stats['warm_starts' if warm else 'cold_starts'] += 1
+                return slot
+            return None
+
+    def _return_slot(self, slot):
+        with self._lock:
+            cache_dir = os.path.join(slot, 'cache')
+            if os.path.isdir(cache_dir):
+                os.utime(cache_dir)
+            lock = self._locks.pop(slot, None)
+            if lock:
+                _unlock_file(lock)
+            self._free.append(slot)
+
+    def configure_options(self, tester, options):
+        pending = getattr(self._local, 'slot', None)
+        if pending:
+            # A launch on this thread ended without on_driver_created or on_driver_launch_failed
+            self._return_slot(pending)
+        slot = self._take_slot()
+        self._local.slot = slot
+        if slot is None:
+            with self._lock:
+                self.stats['unmanaged'] += 1
+            return
+        profile_dir = os.path.join(slot, 'profile')
+        # Only the HTTP cache carries over; cookies and storage start empty
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f'--user-data-dir={profile_dir}')
+        options.add_argument(f"--disk-cache-dir={os.path.join(slot, 'cache')}")
+        options.add_argument(f'--disk-cache-size={self.cache_mb * 1024 * 1024}')
+
+    def on_driver_launch_failed(self, tester, error):
+        # Chrome never started: free the slot and its lock now, the thread may never launch again
+        slot = getattr(self._local, 'slot', None)
+        self._local.slot = None
+        if slot is not None:
+            self._return_slot(slot)
+
+    def on_driver_created(self, tester, driver):
+        slot = getattr(self._local, 'slot', None)
+        self._local.slot = None
+        # Also called for browsers taken from a DriverPool; those already hold a slot
+        if slot is None or id(driver) in self._drivers:
+            return
+        with self._lock:
+            self._drivers[id(driver)] = slot
+        original_quit = driver.quit
+
+        def quit():
+            # The slot is free once Chrome has exited (pooled browsers keep it while idle)
+            try:
+                original_quit()
+            finally:
+                with self._lock:
+                    self._drivers.pop(id(driver), None)
+                self._return_slot(slot)
+
+        driver.quit = quit
+
+    def report_section(self, tester):
+        starts = self.stats['warm_starts'] + self.stats['cold_starts']
+        if not starts:
+            return None
+        return ('💾 Shared Browser Cache', f'''
+            <p class="report-note">{self.stats['warm_starts']} of {starts} managed browser start(s) had a warm cache
+            ({self.stats['unmanaged']} more started without one, all {self.slots} slot(s) being in use here or in another process).
+            Cache on disk: {self.usage_mb():.0f} MB of at most {self.slots * self.cache_mb} MB in {escape(self.root)}</p>''')
+
+
+def measure_page(driver, url, settle=2.0, timeout=30):
+    """Load url and return its Navigation/Resource Timing summary (None if it never finished loading)"""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': RESOURCE_BUFFER_JS})
+    except Exception:
+        pass
+    driver.get(url)
+    deadline = time.time() + timeout
+    timing = None
+    while time.time() < deadline:
+        timing = driver.execute_script(PAGE_TIMING_JS)
+        if timing:
+            break
+        time.sleep(0.25)
+    # Late requests finish and cache entries are written before the browser quits
+    time.sleep(settle)
+    return timing
+
+
+def _median(samples, key):
+    values = [sample[key] for sample in samples if sample]
+    return statistics.median(values) if values else None
+
+
+class CacheBenchmarkSummary(StepHook):
+    """Adds the cold vs warm table to the benchmark report"""
+
+    COLUMNS = [
+        ('load_ms', 'Load (ms)', '{:.0f}'),
+        ('dom_content_loaded_ms', 'DCL (ms)', '{:.0f}'),
+        ('ttfb_ms', 'TTFB (ms)', '{:.0f}'),
+        ('transfer_kb', 'Transferred (KB)', '{:.0f}'),
+        ('from_network', 'From network', '{:.0f}'),
+        ('from_cache', 'From cache', '{:.0f}'),
+    ]
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def report_section(self, tester):
+        def cell(value, form):
+            return '-' if value is None else form.format(value)
+
+        rows = ''
+        for path, samples in self.pages.items():
+            for mode in ('cold', 'warm'):
+                values = ''.join(f"<td>{cell(_median(samples[mode], key), form)}</td>" for key, _, form in self.COLUMNS)
+                rows += f"<tr><td>{escape(path)}</td><td>{mode}</td>{values}</tr>"
+        header = ''.join(f'<th>{title}</th>' for _, title, _ in self.COLUMNS)
+        return ('💾 Cold vs Warm Cache', f'''
+            <p class="report-note">Medians per page. Cold: new browser, empty disk cache. Warm: new browser with the cache the cold load left (a returning visitor). Cross-origin resources without Timing-Allow-Origin are not counted as network or cache.</p>
+            <table class="report-table">
+                <tr><th>Page</th><th>Mode</th>{header}</tr>{rows}
+            </table>''')
+
+
+def run_cache_benchmark(tester_cls, website_url, paths=None, rounds=3, device_profile=None,
+                        root=None, settle=2.0):
+    """
+    Load each page cold and then warm, `rounds` times, and write a report
+
+    Returns:
+        tuple: (overall_result: bool, pages: {path: {'cold': [...], 'warm': [...]}}, report_filename: str)
+    """
+    from perf_budget import step_metrics
+
+    paths = paths or DEFAULT_PATHS
+    cache = SharedBrowserCache(root or os.path.join(DEFAULT_ROOT, 'benchmark'), slots=1)
+    tester = tester_cls(website_url, device_profile=device_profile, hooks=[cache])
+    tester.start_time = time.time()
+    pages = {path: {'cold': [], 'warm': []} for path in paths}
+
+    print("=" * 60)
+    print("STARTING CACHE BENCHMARK")
+    print(f"Pages: {', '.join(paths)}, rounds: {rounds}")
+    print("=" * 60)
+
+    for round_number in range(1, rounds + 1):
+        for path in paths:
+            url = urljoin(website_url, path)
+            cache.clear()
+            for mode in ('cold', 'warm'):
+                driver = None
+                try:
+                    driver = tester._create_driver()
+                    timing = measure_page(driver, url, settle)
+                except Exception as e:
+                    print(f"[CACHE] {path} ({mode}) failed: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+                    timing = None
+                finally:
+                    if driver is not None:
+                        tester._release_driver(driver)
+                pages[path][mode].append(timing)
+                if timing:
+                    print(f"[CACHE] Round {round_number} {path} {mode}: load {timing['load_ms']:.0f} ms, "
+                          f"{timing['transfer_kb']:.0f} KB transferred, {timing['from_cache']} from cache")
+
+    overall_result = True
+    for path, samples in pages.items():
+        cold_load, warm_load = _median(samples['cold'], 'load_ms'), _median(samples['warm'], 'load_ms')
+        cold_kb, warm_kb = _median(samples['cold'], 'transfer_kb'), _median(samples['warm'], 'transfer_kb')
+        failed = sum(1 for sample in samples['cold'] + samples['warm'] if not sample)
+        if cold_load is None or warm_load is None:
+            status, message = 'FAILED', 'The page never finished loading'
+        else:
+            status = 'FAILED' if failed else 'PASSED'
+            change = (warm_load - cold_load) / cold_load * 100 if cold_load else 0.0
+            message = (f"Warm load {warm_load / 1000:.2f}s vs cold {cold_load / 1000:.2f}s ({change:+.0f}%); "
+                       f"transferred {warm_kb:.0f} KB vs {cold_kb:.0f} KB")
+            if failed:
+                message += f"; {failed} load(s) did not finish"
+        overall_result = overall_result and status == 'PASSED'
+        tester.test_results.append({
+            'step': f'Cache: {path}',
+            'status': status,
+            'message': message,
+            'duration': f"{(warm_load or 0) / 1000:.2f}s",
+            'details': [('Warm loads from cache', f"{_median(samples['warm'], 'from_cache') or 0:.0f} resource(s)")],
+            'metrics': step_metrics(
+                cold_load_s=cold_load / 1000 if cold_load is not None else None,
+                warm_load_s=warm_load / 1000 if warm_load is not None else None,
+                cold_transfer_kb=cold_kb,
+                warm_transfer_kb=warm_kb,
+            ),
+            'group': 'Cold vs warm cache',
+        })
+
+    tester.end_time = time.time()
+    tester.hooks.append(CacheBenchmarkSummary(pages))
+    print("=" * 60)
+    print(f"CACHE BENCHMARK: {'PASSED' if overall_result else 'FAILED'}")
+    print("=" * 60)
+    report_filename = tester.generate_html_report(overall_result)
+    return overall_result, pages, report_filename
+
+
+def main(argv=None):
+    from suites import SUITES, load_suite_class
+    from viewport_matrix import DEVICE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Compare page loads with an empty and a warm browser cache')
+    parser.add_argument('--url', default=SUITES['navbar']['url'])
+    parser.add_argument('--paths', default=','.join(DEFAULT_PATHS), help='Comma-separated pages to load')
+    parser.add_argument('--rounds', type=int, default=3, help='Cold/warm pairs per page')
+    parser.add_argument('--profile', choices=list(DEVICE_PROFILES), help='Device profile')
+    parser.add_argument('--settle', type=float, default=2.0, help='Seconds to wait after load before the browser quits')
+    args = parser.parse_args(argv)
+
+    paths = [path for path in args.paths.split(',') if path]
+    overall_result, _, _ = run_cache_benchmark(load_suite_class('navbar'), args.url, paths, args.rounds,
+                                               args.profile, settle=args.settle)
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
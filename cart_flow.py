@@ -0,0 +1,291 @@
+"""
+End-to-end cart flow with per-transition latency percentiles
+Each session opens a category listing, opens a product, picks a size, adds it
+to the cart, opens the cart, raises the quantity and removes the item again.
+Every transition is timed from the action until the page reflects it. Sessions
+run repeatedly (optionally several at once) on browsers from a DriverPool; the
+pool clears cookies and storage between uses, so every session starts with an
+empty guest cart. The report shows p50/p90/p95/max per transition.
+
+Usage:
+    python cart_flow.py --sessions 20 --concurrency 2
+    python cart_flow.py --listing /sneakers --sessions 5 --profile mobile
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from urllib.parse import urljoin
+
+from driver_pool import DriverPool
+from step_runner import StepHook
+
+
+TRANSITIONS = ['open_listing', 'open_product', 'add_to_cart', 'open_cart', 'update_quantity', 'remove_item']
+
+PRODUCT_LINK_SELECTOR = "a[href*='/product/']"
+SIZE_SELECTORS = (
+    "[class*='size'] button:not([disabled]):not([class*='disabled']), "
+    "[class*='size'] li:not([class*='disabled']):not([class*='outofstock'])"
+)
+ADD_TO_CART_XPATH = ("//button[contains(translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', "
+                     "'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'ADD TO CART')]")
+CART_COUNT_SELECTOR = "img[alt='Cart'] ~ .count, [class*='cart'] .count, [class*='cart'] [class*='badge']"
+CART_ITEM_SELECTOR = "[class*='cart-item'], [class*='cartItem'], [class*='cart_item'], [class*='cart-product']"
+QUANTITY_SELECT_SELECTOR = "select[class*='qty'], select[class*='quantity'], select[name*='qty'], select[name*='quantity']"
+QUANTITY_PLUS_SELECTOR = "[class*='plus'], [class*='increase'], [class*='increment'], button[aria-label*='increase' i]"
+REMOVE_XPATH = ("//*[self::button or self::a or self::span][contains(translate(normalize-space(.), "
+                "'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'REMOVE')]")
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _cart_count(driver):
+    """Number shown on the header cart badge (0 when there is none)"""
+    from selenium.webdriver.common.by import By
+
+    for badge in driver.find_elements(By.CSS_SELECTOR, CART_COUNT_SELECTOR):
+        text = badge.text.strip()
+        if text.isdigit():
+            return int(text)
+    return 0
+
+
+def _visible(driver, by, selector):
+    return [element for element in driver.find_elements(by, selector) if element.is_displayed()]
+
+
+def _timed(driver, action, condition, timeout):
+    """
+    Run action(), then wait until condition(driver) is truthy
+
+    Returns:
+        float: Seconds from the start of the action until the condition held
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    start = time.perf_counter()
+    action()
+    WebDriverWait(driver, timeout, poll_frequency=0.05).until(condition)
+    return time.perf_counter() - start
+
+
+def cart_session(driver, website_url, listing='/men', product_index=0, timeout=15):
+    """
+    Run the cart flow once in a browser
+
+    Returns:
+        dict: {'timings': {transition: seconds}, 'error': (transition, message) or None}
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import Select
+
+    timings = {}
+    state = {}
+
+    def open_listing():
+        driver.get(urljoin(website_url, listing))
+
+    def open_product():
+        products = _visible(driver, By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR)
+        product = products[product_index % len(products)]
+        state['product_url'] = product.get_attribute('href')
+        # Product cards may open in a new tab; load the product in this one
+        driver.get(state['product_url'])
+
+    def add_to_cart():
+        state['count_before'] = _cart_count(driver)
+        sizes = _visible(driver, By.CSS_SELECTOR, SIZE_SELECTORS)
+        if sizes:
+            driver.execute_script("arguments[0].click();", sizes[0])
+        button = _visible(driver, By.XPATH, ADD_TO_CART_XPATH)[0]
+        driver.execute_script("arguments[0].click();", button)
+
+    def open_cart():
+        driver.get(urljoin(website_url, '/cart'))
+
+    def update_quantity():
+        item = _visible(driver, By.CSS_SELECTOR, CART_ITEM_SELECTOR)[0]
+        state['item_text'] = item.text
+        selects = item.find_elements(By.CSS_SELECTOR, QUANTITY_SELECT_SELECTOR)
+        if selects:
+            Select(selects[0]).select_by_index(1)
+        else:
+            driver.execute_script("arguments[0].click();", item.find_elements(By.CSS_SELECTOR, QUANTITY_PLUS_SELECTOR)[0])
+
+    def remove_item():
+        state['items_before'] = len(_visible(driver, By.CSS_SELECTOR, CART_ITEM_SELECTOR))
+        driver.execute_script("arguments[0].click();", _visible(driver, By.XPATH, REMOVE_XPATH)[0])
+        # Some carts ask for confirmation in a dialog with a second REMOVE button
+        time.sleep(0.2)
+        confirm = _visible(driver, By.XPATH, f"//*[@role='dialog' or contains(@class, 'modal')]{REMOVE_XPATH}")
+        if confirm:
+            driver.execute_script("arguments[0].click();", confirm[-1])
+
+    def quantity_changed(d):
+        items = _visible(d, By.CSS_SELECTOR, CART_ITEM_SELECTOR)
+        return bool(items) and items[0].text != state['item_text']
+
+    flow = [
+        ('open_listing', open_listing, lambda d: _visible(d, By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR)),
+        ('open_product', open_product, lambda d: _visible(d, By.XPATH, ADD_TO_CART_XPATH)),
+        ('add_to_cart', add_to_cart, lambda d: _cart_count(d) > state['count_before']),
+        ('open_cart', open_cart, lambda d: _visible(d, By.CSS_SELECTOR, CART_ITEM_SELECTOR)),
+        ('update_quantity', update_quantity, quantity_changed),
+        ('remove_item', remove_item, lambda d: len(_visible(d, By.CSS_SELECTOR, CART_ITEM_SELECTOR)) < state['items_before']),
+    ]
+    for transition, action, condition in flow:
+        try:
+            timings[transition] = round(_timed(driver, action, condition, timeout), 3)
+        except TimeoutException:
+            return {'timings': timings, 'error': (transition, f'Page did not reflect the action within {timeout}s'),
+                    'product': state.get('product_url')}
+        except Exception as e:
+            message = str(e).splitlines()[0] if str(e).strip() else type(e).__name__
+            return {'timings': timings, 'error': (transition, message), 'product': state.get('product_url')}
+    return {'timings': timings, 'error': None, 'product': state.get('product_url')}
+
+
+class CartSummary(StepHook):
+    """Adds the per-transition latency percentiles to the cart flow report"""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def percentiles(self):
+        """{transition: stats} over every session that reached the transition"""
+        stats = {}
+        for transition in TRANSITIONS:
+            values = [session['timings'][transition] for session in self.sessions if transition in session['timings']]
+            failures = sum(1 for session in self.sessions if session['error'] and session['error'][0] == transition)
+            if not values and not failures:
+                continue
+            stats[transition] = {
+                'runs': len(values),
+                'failures': failures,
+                'p50': _percentile(values, 0.5) if values else None,
+                'p90': _percentile(values, 0.9) if values else None,
+                'p95': _percentile(values, 0.95) if values else None,
+                'max': max(values) if values else None,
+            }
+        return stats
+
+    def report_section(self, tester):
+        def seconds(value):
+            return '-' if value is None else f'{value:.2f}'
+
+        rows = ''.join(f'''
+                <tr>
+                    <td>{transition}</td>
+                    <td>{stats['runs']}</td>
+                    <td>{stats['failures']}</td>
+                    <td>{seconds(stats['p50'])}</td>
+                    <td>{seconds(stats['p90'])}</td>
+                    <td>{seconds(stats['p95'])}</td>
+                    <td>{seconds(stats['max'])}</td>
+                </tr>''' for transition, stats in self.percentiles().items())
+        errors = ''.join(f"<li>{escape(session['error'][0])}: {escape(session['error'][1])}</li>"
+                         for session in self.sessions if session['error'])
+        return ('🛒 Cart Flow Latency', f'''
+            <p class="report-note">{len(self.sessions)} session(s); each transition is timed from the action until the page reflects it.</p>
+            <table class="report-table">
+                <tr><th>Transition</th><th>Runs</th><th>Failed</th><th>p50 (s)</th><th>p90 (s)</th><th>p95 (s)</th><th>Max (s)</th></tr>{rows}
+            </table>{f'<ul>{errors}</ul>' if errors else ''}''')
+
+
+def run_cart_flow(tester_cls, website_url, sessions=10, concurrency=1, listing='/men',
+                  device_profile=None, pool=None, timeout=15):
+    """
+    Run the cart flow repeatedly on pooled browsers and write a report
+
+    Returns:
+        tuple: (overall_result: bool, sessions: list, report_filename: str)
+    """
+    from perf_budget import step_metrics
+
+    pool = pool or DriverPool(max_idle=max(2, concurrency))
+    tester = tester_cls(website_url, device_profile=device_profile, driver_pool=pool)
+    tester.start_time = time.time()
+
+    print("=" * 60)
+    print("STARTING CART FLOW")
+    print(f"Sessions: {sessions}, concurrency: {concurrency}, listing: {listing}")
+    print("=" * 60)
+
+    def run_one(number):
+        driver = None
+        try:
+            driver = tester._create_driver()
+            # Vary the product so one out-of-stock item does not fail every session
+            outcome = cart_session(driver, website_url, listing, product_index=number, timeout=timeout)
+        except Exception as e:
+            outcome = {'timings': {}, 'error': ('browser', str(e)), 'product': None}
+        finally:
+            if driver is not None:
+                tester._release_driver(driver)
+        total = sum(outcome['timings'].values())
+        status = f"failed at {outcome['error'][0]}" if outcome['error'] else f"completed in {total:.2f}s"
+        print(f"[CART] Session {number + 1}: {status}")
+        return outcome
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            results = list(executor.map(run_one, range(sessions)))
+    finally:
+        pool.close()
+
+    summary = CartSummary(results)
+    for transition, stats in summary.percentiles().items():
+        message = (f"p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s over {stats['runs']} run(s)"
+                   if stats['runs'] else 'Never completed')
+        if stats['failures']:
+            message += f"; failed in {stats['failures']} session(s)"
+        tester.test_results.append({
+            'step': f'Cart: {transition}',
+            'status': 'FAILED' if stats['failures'] else 'PASSED',
+            'message': message,
+            'duration': f"{stats['p50'] or 0:.2f}s",
+            'details': [('p90', f"{stats['p90']:.2f}s"), ('Max', f"{stats['max']:.2f}s")] if stats['runs'] else [],
+            'metrics': step_metrics(p50_s=stats['p50'], p95_s=stats['p95']),
+            'group': 'Cart flow',
+        })
+
+    tester.end_time = time.time()
+    tester.hooks.append(summary)
+    completed = sum(1 for outcome in results if not outcome['error'])
+    overall_result = bool(results) and completed == len(results)
+    print("=" * 60)
+    print(f"CART FLOW: {completed}/{len(results)} session(s) completed")
+    print(f"Browsers started {pool.stats['created']}, reused {pool.stats['reused']}")
+    print("=" * 60)
+    report_filename = tester.generate_html_report(overall_result)
+    return overall_result, results, report_filename
+
+
+def main(argv=None):
+    from suites import SUITES, load_suite_class
+    from viewport_matrix import DEVICE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Time add-to-cart, quantity update and removal over pooled sessions')
+    parser.add_argument('--url', default=SUITES['navbar']['url'])
+    parser.add_argument('--listing', default='/men', help='Listing to pick products from')
+    parser.add_argument('--sessions', type=int, default=10, help='Cart flows to run')
+    parser.add_argument('--concurrency', type=int, default=1, help='Sessions running at the same time')
+    parser.add_argument('--profile', choices=list(DEVICE_PROFILES), help='Device profile')
+    parser.add_argument('--timeout', type=float, default=15, help='Seconds to wait for each transition')
+    parser.add_argument('--max-uses', type=int, default=25, help='Recycle a browser after this many sessions')
+    args = parser.parse_args(argv)
+
+    pool = DriverPool(max_uses=args.max_uses, max_idle=max(2, args.concurrency))
+    overall_result, _, _ = run_cart_flow(load_suite_class('navbar'), args.url, args.sessions, args.concurrency,
+                                         args.listing, args.profile, pool, args.timeout)
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
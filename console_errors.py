@@ -0,0 +1,125 @@
+"""
+Per-page console and JavaScript error collection
+Collects browser console errors, uncaught JavaScript exceptions and failed
+network requests from every browser a step uses, and attaches the counts and
+a few samples to the step result.
+"""
+
+import threading
+import weakref
+
+from devtools_events import enable_logging, read_events, subscribe
+from step_runner import StepHook
+
+
+class ConsoleErrorCollector(StepHook):
+    def __init__(self, max_samples=5, sample_length=200):
+        """
+        Args:
+            max_samples (int): Samples kept per category and step
+            sample_length (int): Samples are cut to this many characters
+        """
+        self.max_samples = max_samples
+        self.sample_length = sample_length
+        self._lock = threading.Lock()
+        # Collected entries per tester, so one collector can serve parallel testers
+        # (weak keys: finished testers drop out)
+        self._collected = weakref.WeakKeyDictionary()
+
+    def configure_options(self, tester, options):
+        enable_logging(options, browser=True, performance=True)
+
+    def on_driver_created(self, tester, driver):
+        subscribe(driver, self)
+
+    def before_step(self, tester, step_name):
+        with self._lock:
+            self._collected[tester] = {
+                'console_errors': [],
+                'js_exceptions': [],
+                'failed_requests': [],
+                # requestId -> URL, used to name failed requests
+                'request_urls': {},
+            }
+
+    def on_driver_release(self, tester, driver):
+        # Fresh-browser steps quit their driver before returning, so collect now
+        self._collect(tester, driver)
+
+    def after_step(self, tester, step_name, result):
+        # Steps 1-6 share the main browser, which stays open after the step
+        if getattr(tester, '_driver', None) is not None:
+            self._collect(tester, tester._driver)
+
+        with self._lock:
+            collected = self._collected.pop(tester, None)
+        if collected is None:
+            return
+
+        summary = {
+            'console_errors': len(collected['console_errors']),
+            'js_exceptions': len(collected['js_exceptions']),
+            'failed_requests': len(collected['failed_requests']),
+            'samples': {
+                key: collected[key][:self.max_samples]
+                for key in ('console_errors', 'js_exceptions', 'failed_requests')
+            },
+        }
+        result['console'] = summary
+
+        counts = (f"{summary['console_errors']} console error(s), "
+                  f"{summary['js_exceptions']} JS exception(s), "
+                  f"{summary['failed_requests']} failed request(s)")
+        details = result.setdefault('details', [])
+        details.append(('Page errors', counts))
+        for key, label in (('js_exceptions', 'JS exception'),
+                           ('console_errors', 'Console error'),
+                           ('failed_requests', 'Failed request')):
+            for sample in summary['samples'][key]:
+                details.append((label, sample))
+
+        if summary['console_errors'] or summary['js_exceptions'] or summary['failed_requests']:
+            print(f"[CONSOLE] {step_name}: {counts}")
+
+    def _clip(self, text):
+        text = ' '.join(str(text).split())
+        return text if len(text) <= self.sample_length else text[:self.sample_length - 3] + '...'
+
+    def _collect(self, tester, driver):
+        with self._lock:
+            collected = self._collected.get(tester)
+        if collected is None:
+            return
+
+        try:
+            browser_entries = driver.get_log('browser')
+        except Exception:
+            browser_entries = []
+
+        for entry in browser_entries:
+            if entry.get('level') != 'SEVERE':
+                continue
+            message = entry.get('message', '')
+            source = entry.get('source', '')
+            if source == 'network':
+                # Counted from the DevTools events below, with the status code
+                continue
+            if source == 'javascript' or 'Uncaught' in message:
+                collected['js_exceptions'].append(self._clip(message))
+            else:
+                collected['console_errors'].append(self._clip(message))
+
+        for event in read_events(driver, self):
+            method = event.get('method')
+            params = event.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                collected['request_urls'][params.get('requestId')] = params.get('request', {}).get('url', '')
+            elif method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if response.get('status', 0) >= 400:
+                    collected['failed_requests'].append(self._clip(f"HTTP {response['status']} {response.get('url', '')}"))
+            elif method == 'Network.loadingFailed':
+                if params.get('canceled') or params.get('blockedReason'):
+                    continue
+                url = collected['request_urls'].get(params.get('requestId'), params.get('requestId'))
+                collected['failed_requests'].append(self._clip(f"{params.get('errorText', 'Failed')} {url}"))
@@ -0,0 +1,85 @@
+"""
+Shared access to Chrome's DevTools performance log
+Chrome hands out each performance log entry only once, so entries are buffered
+per driver and every collector reads them through its own cursor.
+"""
+
+import json
+import threading
+import weakref
+
+
+_buffers = weakref.WeakKeyDictionary()
+_buffers_lock = threading.Lock()
+
+
+def enable_logging(options, browser=False, performance=False):
+    """
+    Turn on Chrome's browser (console) and/or performance (DevTools) logs
+
+    Settings requested by several hooks are merged into one capability.
+    """
+    prefs = dict(options.capabilities.get('goog:loggingPrefs') or {})
+    if browser:
+        prefs['browser'] = 'ALL'
+    if performance:
+        prefs['performance'] = 'ALL'
+    options.set_capability('goog:loggingPrefs', prefs)
+
+
+def _buffer_for(driver):
+    with _buffers_lock:
+        if driver not in _buffers:
+            _buffers[driver] = {'events': [], 'cursors': {}, 'lock': threading.Lock()}
+        return _buffers[driver]
+
+
+def subscribe(driver, consumer):
+    """
+    Register a consumer when the driver is created
+
+    Events are dropped once every registered consumer has read them, so
+    consumers must subscribe before the first read_events call on the driver.
+    """
+    buffer = _buffer_for(driver)
+    with buffer['lock']:
+        buffer['cursors'].setdefault(consumer, 0)
+
+
+def read_events(driver, consumer):
+    """
+    Return DevTools events logged since this consumer's previous call
+
+    Args:
+        driver (WebDriver): Chrome WebDriver with performance logging enabled
+        consumer (object): Any hashable key identifying the reader (usually the hook)
+
+    Returns:
+        list: {'method': ..., 'params': ...} dicts in log order
+    """
+    buffer = _buffer_for(driver)
+    with buffer['lock']:
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            entries = []
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            buffer['events'].append(message)
+
+        cursor = buffer['cursors'].get(consumer, 0)
+        new_events = buffer['events'][cursor:]
+        buffer['cursors'][consumer] = len(buffer['events'])
+
+        # Drop events every consumer has read so long-lived drivers do not grow the buffer
+        consumed = min(buffer['cursors'].values())
+        if consumed:
+            del buffer['events'][:consumed]
+            for key in buffer['cursors']:
+                buffer['cursors'][key] -= consumed
+
+        return new_events
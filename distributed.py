@@ -0,0 +1,433 @@
+"""
+Coordinator/worker mode for distributing test steps across machines
+Workers run on any host with Chrome and accept jobs over a line-delimited JSON
+protocol on TCP. The coordinator shards NavbarTester/LoginTester steps (and
+search or login load jobs) across the workers and merges the results into one
+HTML report.
+
+Usage:
+    python distributed.py worker --port 7001 [--slots 2] [--token SECRET]
+    python distributed.py coordinator --workers localhost:7001,localhost:7002 --suite navbar
+    python distributed.py coordinator --workers host1:7001 --search-queries Shirts,Hoodies,Joggers
+"""
+
+import argparse
+import ipaddress
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+
+from step_runner import run_step, PASSING_STATUSES
+from suites import SUITES, load_suite_class, suite_steps
+
+
+PROTOCOL_VERSION = 1
+
+# Tester options a job may set; jobs from the network may only set JSON values
+LOCAL_OPTIONS = ('device_profile', 'html_report', 'retry_policy', 'flake_tracker', 'hooks', 'driver_pool')
+REMOTE_OPTIONS = ('device_profile', 'html_report')
+
+
+def make_job(suite, steps, website_url=None, stop_on_failure=True, options=None, label=None):
+    """
+    Build a job description
+
+    Args:
+        suite (str): Suite name from suites.SUITES
+        steps (list): Step names or [name, [args...]] pairs, run in order on one tester
+        website_url (str): URL under test (default: the suite's URL)
+        stop_on_failure (bool): Skip the remaining steps after a failure
+        options (dict): Extra keyword arguments for the tester constructor
+        label (str): Name shown in logs
+    """
+    normalized = [[step, []] if isinstance(step, str) else [step[0], list(step[1])] for step in steps]
+    return {
+        'suite': suite,
+        'website_url': website_url or SUITES[suite]['url'],
+        'steps': normalized,
+        'stop_on_failure': stop_on_failure,
+        'options': options or {},
+        'label': label or f"{suite}: {', '.join(step for step, _ in normalized)}",
+    }
+
+
+def navbar_shards(website_url=None):
+    """Steps 1-6 as one job on a shared browser, steps 7-14 as one job each"""
+    suite = SUITES['navbar']
+    jobs = [make_job('navbar', suite['main_steps'], website_url, label='navbar: main browser steps')]
+    for step in suite['fresh_steps']:
+        args = ['Shirts'] if step == 'test_search_functionality' else []
+        jobs.append(make_job('navbar', [[step, args]], website_url, label=f'navbar: {step}'))
+    return jobs
+
+
+def search_load_jobs(queries, website_url=None):
+    """One search job per query"""
+    return [
+        make_job('navbar', [['test_search_functionality', [query]]], website_url, label=f'search: {query}')
+        for query in queries
+    ]
+
+
+def login_load_jobs(numbers, otp='', wait_before_otp=0, website_url=None):
+    """One complete login flow per number"""
+    return [
+        make_job('login', [
+            ['test_login_with_number', [number]],
+            # A given OTP is typed; without one the step waits for manual entry
+            ['test_otp_entry', [otp, wait_before_otp, bool(otp)]],
+            ['check_login_success', []],
+        ], website_url, label=f'login: {number}')
+        for number in numbers
+    ]
+
+
+def validate_job(job, allowed_options=LOCAL_OPTIONS):
+    """
+    Check that a job only names known steps and options
+
+    Raises:
+        ValueError: Unknown suite, step or option, or a URL that is not http(s)
+    """
+    if job.get('suite') not in SUITES:
+        raise ValueError(f"Unknown suite '{job.get('suite')}'")
+    known_steps = suite_steps(job['suite'])
+    for step, _ in job['steps']:
+        if step not in known_steps:
+            raise ValueError(f"Unknown step '{step}' in suite '{job['suite']}'")
+    for option in job.get('options', {}):
+        if option not in allowed_options:
+            raise ValueError(f"Option '{option}' is not allowed")
+    if not str(job.get('website_url', '')).startswith(('http://', 'https://')):
+        raise ValueError(f"Website URL must be http(s): {job.get('website_url')}")
+
+
+def run_job(job):
+    """Run a job in this process and return its step results"""
+    validate_job(job)
+    tester_cls = load_suite_class(job['suite'])
+    tester = tester_cls(job['website_url'], **job.get('options', {}))
+    try:
+        for step, args in job['steps']:
+            outcome = run_step(tester, getattr(tester, step), *args)
+            passed = outcome[0] if isinstance(outcome, tuple) else outcome
+            if not passed and job.get('stop_on_failure', True):
+                break
+    finally:
+        tester.close()
+    return tester.test_results
+
+
+def _send(sock_file, message):
+    sock_file.write((json.dumps(message) + '\n').encode('utf-8'))
+    sock_file.flush()
+
+
+def _receive(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError('Connection closed')
+    return json.loads(line.decode('utf-8'))
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                message = _receive(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            if server.token and message.get('token') != server.token:
+                _send(self.wfile, {'type': 'error', 'error': 'Invalid token'})
+                return
+
+            if message.get('type') == 'ping':
+                _send(self.wfile, {'type': 'pong', 'version': PROTOCOL_VERSION,
+                                   'slots': server.slots, 'worker': server.name})
+                continue
+
+            if message.get('type') != 'job':
+                _send(self.wfile, {'type': 'error', 'error': f"Unknown message type {message.get('type')}"})
+                continue
+
+            job = message['job']
+            print(f"[WORKER] Running {job.get('label')}")
+            job_start = time.time()
+            with server.slot_semaphore:
+                try:
+                    # Jobs come from the network: only known steps and plain options
+                    validate_job(job, REMOTE_OPTIONS)
+                    results = run_job(job)
+                    reply = {'type': 'result', 'results': results}
+                except Exception as e:
+                    reply = {'type': 'result', 'results': [{
+                        'step': str(job.get('label')),
+                        'status': 'FAILED',
+                        'message': f'Worker could not run job: {str(e)}',
+                        'duration': f'{time.time() - job_start:.2f}s',
+                    }]}
+            reply['worker'] = server.name
+            reply['duration'] = time.time() - job_start
+            _send(self.wfile, reply)
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=7001, slots=1, token=None):
+        """
+        Worker that runs jobs sent by a coordinator
+
+        Args:
+            host (str): Interface to listen on (anything but loopback needs a token)
+            port (int): TCP port
+            slots (int): Jobs (browsers) run at the same time
+            token (str): Shared secret the coordinator must send
+        """
+        if not token and not _is_loopback(host):
+            raise ValueError(f"A worker listening on {host} needs a token")
+        super().__init__((host, port), _WorkerHandler)
+        self.slots = slots
+        self.slot_semaphore = threading.BoundedSemaphore(slots)
+        self.token = token
+        self.name = f"{socket.gethostname()}:{self.server_address[1]}"
+
+
+def run_worker(host='127.0.0.1', port=7001, slots=1, token=None):
+    """Serve jobs until interrupted"""
+    server = WorkerServer(host, port, slots, token)
+    print(f"[WORKER] Listening on {host}:{server.server_address[1]} with {slots} slot(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[WORKER] Shutting down")
+    finally:
+        server.server_close()
+
+
+class Coordinator:
+    def __init__(self, workers, token=None, connect_timeout=10):
+        """
+        Coordinator that shards jobs across workers
+
+        Args:
+            workers (list): "host:port" strings or (host, port) tuples
+            token (str): Shared secret sent with every message
+            connect_timeout (float): Seconds to wait when connecting to a worker
+        """
+        self.workers = [self._parse_address(worker) for worker in workers]
+        self.token = token
+        self.connect_timeout = connect_timeout
+
+    @staticmethod
+    def _parse_address(worker):
+        if isinstance(worker, (tuple, list)):
+            return worker[0], int(worker[1])
+        host, _, port = worker.rpartition(':')
+        return host or 'localhost', int(port)
+
+    def _connect(self, address):
+        sock = socket.create_connection(address, timeout=self.connect_timeout)
+        sock.settimeout(None)  # Jobs can take minutes
+        return sock, sock.makefile('rwb')
+
+    def _slot_loop(self, address, jobs, results, lock):
+        """
+        Pull jobs from the shared queue and run them on one worker slot
+
+        Every job taken is marked done (task_done) once it has a result or was
+        handed back to the queue, so run() knows when all jobs are resolved. The
+        slot waits for jobs until it gets the None sentinel.
+        """
+        try:
+            sock, sock_file = self._connect(address)
+        except OSError as e:
+            print(f"[COORDINATOR] Could not connect to {address[0]}:{address[1]}: {str(e)}")
+            return
+
+        with sock:
+            while True:
+                item = jobs.get()
+                if item is None:
+                    jobs.task_done()
+                    return
+                index, job = item
+
+                try:
+                    _send(sock_file, {'type': 'job', 'job': job, 'token': self.token})
+                    reply = _receive(sock_file)
+                except (OSError, ConnectionError, ValueError) as e:
+                    # Hand the job back so another worker picks it up
+                    print(f"[COORDINATOR] Lost worker {address[0]}:{address[1]}: {str(e)}")
+                    jobs.put(item)
+                    jobs.task_done()
+                    return
+
+                if reply.get('type') == 'error':
+                    print(f"[COORDINATOR] Worker {address[0]}:{address[1]} rejected job: {reply['error']}")
+                    jobs.put(item)
+                    jobs.task_done()
+                    return
+
+                for result in reply['results']:
+                    result['suite'] = job['suite']
+                    result['worker'] = reply['worker']
+                    result.setdefault('details', []).append(('Worker', reply['worker']))
+                with lock:
+                    results[index] = reply['results']
+                jobs.task_done()
+                print(f"[COORDINATOR] {job['label']} finished on {reply['worker']} in {reply['duration']:.2f}s")
+
+    def _worker_slots(self, address):
+        try:
+            sock, sock_file = self._connect(address)
+            with sock:
+                _send(sock_file, {'type': 'ping', 'token': self.token})
+                reply = _receive(sock_file)
+            return reply.get('slots', 1) if reply.get('type') == 'pong' else 0
+        except (OSError, ConnectionError, ValueError) as e:
+            print(f"[COORDINATOR] Worker {address[0]}:{address[1]} unavailable: {str(e)}")
+            return 0
+
+    def run(self, jobs):
+        """
+        Run all jobs across the workers
+
+        Returns:
+            list: Step results in job order (jobs no worker could run are reported as FAILED)
+        """
+        pending = queue.Queue()
+        for index, job in enumerate(jobs):
+            pending.put((index, job))
+
+        results = {}
+        lock = threading.Lock()
+        threads = []
+        for address in self.workers:
+            for _ in range(self._worker_slots(address)):
+                thread = threading.Thread(target=self._slot_loop, args=(address, pending, results, lock), daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        # Wait until every job has a result, or until no slot is left to run the rest
+        resolved = threading.Event()
+        threading.Thread(target=lambda: (pending.join(), resolved.set()), daemon=True).start()
+        while not resolved.wait(0.5):
+            if not any(thread.is_alive() for thread in threads):
+                break
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+
+        merged = []
+        for index, job in enumerate(jobs):
+            merged.extend(results.get(index) or [{
+                'step': job['label'],
+                'status': 'FAILED',
+                'message': 'No worker was available to run this job',
+                'duration': '0.00s',
+            }])
+        return merged
+
+
+def run_distributed(workers, jobs, token=None):
+    """
+    Run jobs on the workers and write one merged HTML report
+
+    Returns:
+        tuple: (overall_result: bool, results: list, report_filename: str)
+    """
+    print("=" * 60)
+    print("STARTING DISTRIBUTED TEST RUN")
+    print(f"Workers: {', '.join(str(worker) for worker in workers)}")
+    print(f"Jobs: {len(jobs)}")
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    start_time = time.time()
+    results = Coordinator(workers, token=token).run(jobs)
+
+    suites_used = list(dict.fromkeys(job['suite'] for job in jobs))
+    if len(suites_used) > 1:
+        for result in results:
+            result.setdefault('group', result.get('suite'))
+
+    # The navbar report groups results, so it is used whenever navbar jobs are present
+    report_suite = 'navbar' if 'navbar' in suites_used else suites_used[0]
+    report_url = next(job['website_url'] for job in jobs if job['suite'] == report_suite)
+
+    # Report-only tester: the driver is created lazily, so no browser starts here
+    report_tester = load_suite_class(report_suite)(report_url)
+    report_tester.start_time = start_time
+    report_tester.end_time = time.time()
+    report_tester.test_results = results
+
+    overall_result = all(result['status'] in PASSING_STATUSES for result in results)
+    print("=" * 60)
+    print(f"DISTRIBUTED RESULT: {'PASSED' if overall_result else 'FAILED'}")
+    print("=" * 60)
+
+    report_filename = report_tester.generate_html_report(overall_result)
+    return overall_result, results, report_filename
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Distribute Soul Store test steps across worker machines')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    worker = subparsers.add_parser('worker', help='Run a worker')
+    worker.add_argument('--host', default='127.0.0.1',
+                        help='Interface to listen on (other than loopback needs --token)')
+    worker.add_argument('--port', type=int, default=7001)
+    worker.add_argument('--slots', type=int, default=1, help='Browsers run at the same time')
+    worker.add_argument('--token')
+
+    coordinator = subparsers.add_parser('coordinator', help='Shard a run across workers')
+    coordinator.add_argument('--workers', required=True, help='Comma-separated host:port list')
+    coordinator.add_argument('--suite', choices=list(SUITES), default='navbar')
+    coordinator.add_argument('--url', help='Website URL (default: the suite URL)')
+    coordinator.add_argument('--search-queries', help='Comma-separated queries for a search load run')
+    coordinator.add_argument('--login-numbers', help='Comma-separated numbers for a login load run')
+    coordinator.add_argument('--otp', default='')
+    coordinator.add_argument('--token')
+
+    args = parser.parse_args(argv)
+
+    if args.mode == 'worker':
+        if not args.token and not _is_loopback(args.host):
+            parser.error(f'--token is required when the worker listens on {args.host}')
+        run_worker(args.host, args.port, args.slots, args.token)
+        return 0
+
+    if args.search_queries:
+        jobs = search_load_jobs(args.search_queries.split(','), args.url)
+    elif args.login_numbers:
+        jobs = login_load_jobs(args.login_numbers.split(','), args.otp, website_url=args.url)
+    elif args.suite == 'navbar':
+        jobs = navbar_shards(args.url)
+    else:
+        jobs = login_load_jobs([input('Number to log in with: ')], args.otp, website_url=args.url)
+
+    overall_result, _, _ = run_distributed(args.workers.split(','), jobs, token=args.token)
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+"""
+Incremental runs: skip structural checks whose DOM has not changed
+Right after the page loads (step 1), hashes the navbar subtrees the structural
+steps look at: ul.top_nav, .icon-container and the header cart and wishlist
+links. Tags, stable attributes and text are hashed; class order, state classes
+(active, show, ...), query strings and numbers (e.g. the cart count) are not.
+
+When a structural step passes, the hashes it depends on are stored as its
+baseline. On a later run with the same hashes the step is not run again and is
+recorded as SKIPPED. A failure removes the baseline, and a step is re-checked
+after max_skips skips in a row even if nothing changed.
+
+Usage:
+    python "the_soul_store_navbar (1).py" --incremental
+    python soul_store_cli.py navbar --steps 1-6 --incremental
+    python scheduler.py --config schedule.json --incremental
+"""
+
+import hashlib
+import json
+import os
+import threading
+import weakref
+from datetime import datetime
+
+from step_runner import StepHook
+
+
+# name -> (CSS selector, closest ancestor to hash instead of the match, or None)
+FINGERPRINT_TARGETS = {
+    'top_nav': ('ul.top_nav', None),
+    'icons': ('.icon-container', None),
+    'cart': ("img.headercart, img[alt='Cart']", 'a'),
+    'wishlist': ("a#navbarDropdownuser, img[alt='wishlist']", 'a'),
+}
+
+# Steps that only inspect markup, and the subtrees each one depends on
+STRUCTURAL_STEPS = {
+    'test_navbar_structure': ('top_nav', 'icons', 'cart', 'wishlist'),
+    'test_top_navigation_menu': ('top_nav',),
+}
+
+# The step after which the page is loaded and fingerprinted
+LOAD_STEP = 'test_hamburger_menu_presence'
+
+FINGERPRINT_JS = """
+const targets = arguments[0];
+const ATTRIBUTES = ['id', 'class', 'href', 'src', 'alt', 'role', 'aria-label', 'type', 'name'];
+const STATE_CLASSES = /^(active|show|open|hover|focus|selected|expanded|collapsed|visible|hidden|in)$/;
+const attribute = (name, value) => {
+    if (name === 'class') {
+        value = value.split(/\\s+/).filter(c => c && !STATE_CLASSES.test(c)).sort().join(' ');
+    } else if (name === 'href' || name === 'src') {
+        value = value.split(/[?#]/)[0];
+    }
+    return `${name}=${JSON.stringify(value)}`;
+};
+const canonical = (element, depth) => {
+    const tag = element.tagName.toLowerCase();
+    if (depth > 15 || tag === 'script' || tag === 'style') return '';
+    let out = '<' + [tag].concat(ATTRIBUTES.filter(name => element.hasAttribute(name))
+        .map(name => attribute(name, element.getAttribute(name)))).join(' ') + '>';
+    for (const child of element.childNodes) {
+        if (child.nodeType === 1) {
+            out += canonical(child, depth + 1);
+        } else if (child.nodeType === 3) {
+            const text = child.textContent.replace(/\\s+/g, ' ').trim().replace(/\\d+/g, '#');
+            if (text) out += JSON.stringify(text);
+        }
+    }
+    return out + `</${tag}>`;
+};
+const result = {};
+for (const [name, [selector, closest]] of Object.entries(targets)) {
+    const seen = new Set();
+    const parts = [];
+    for (const match of document.querySelectorAll(selector)) {
+        const element = closest ? (match.closest(closest) || match) : match;
+        if (seen.has(element)) continue;
+        seen.add(element);
+        parts.push(canonical(element, 0));
+    }
+    result[name] = parts.length ? parts.join('\\n') : null;
+}
+return result;
+"""
+
+
+def fingerprint_page(driver, targets=None):
+    """
+    Hash the target subtrees of the current page
+
+    Returns:
+        dict: {target name: sha256 hex digest, or None when nothing matches}
+    """
+    targets = targets or FINGERPRINT_TARGETS
+    markup = driver.execute_script(FINGERPRINT_JS, {name: list(target) for name, target in targets.items()})
+    return {
+        name: hashlib.sha256(markup[name].encode('utf-8')).hexdigest() if markup.get(name) else None
+        for name in targets
+    }
+
+
+class DomFingerprints(StepHook):
+    def __init__(self, store_path='test_reports/dom_fingerprints.json', max_skips=20,
+                 structural_steps=None):
+        """
+        Load (or create) the fingerprint store
+
+        Args:
+            store_path (str): JSON file with the baselines of the last passing runs
+            max_skips (int): Run a step anyway after this many skips in a row
+            structural_steps (dict): {step name: target names} (default: STRUCTURAL_STEPS)
+        """
+        self.store_path = store_path
+        self.max_skips = max_skips
+        self.structural_steps = structural_steps or STRUCTURAL_STEPS
+        self._lock = threading.Lock()
+        self.store = {'baselines': {}}
+        # tester -> fingerprints taken when its page loaded in this run (weak keys: finished testers drop out)
+        self._current = weakref.WeakKeyDictionary()
+        if os.path.exists(store_path):
+            with open(store_path, 'r', encoding='utf-8') as f:
+                self.store.update(json.load(f))
+
+    @staticmethod
+    def _baseline_key(tester, step_name):
+        # Different URLs and device profiles render different markup
+        profile = getattr(tester, 'device_profile', None) or 'default'
+        return f"{type(tester).__name__}.{step_name}|{tester.website_url}|{profile}"
+
+    def skip_step(self, tester, step_name):
+        targets = self.structural_steps.get(step_name)
+        current = self._current.get(tester)
+        if not targets or not current:
+            return None
+
+        with self._lock:
+            baseline = self.store['baselines'].get(self._baseline_key(tester, step_name))
+            if not baseline or baseline['skips'] >= self.max_skips:
+                return None
+            if any(current.get(target) is None or baseline['fingerprints'].get(target) != current[target]
+                   for target in targets):
+                return None
+            baseline['skips'] += 1
+            self._save()
+
+        print(f"[INCREMENTAL] {step_name}: DOM unchanged since {baseline['passed_at']}; skipped")
+        return (baseline['title'],
+                f"DOM fingerprint of {', '.join(targets)} unchanged since the last passing run "
+                f"({baseline['passed_at']}); skip {baseline['skips']} of {self.max_skips}")
+
+    def after_step(self, tester, step_name, result):
+        if step_name == LOAD_STEP:
+            self._current.pop(tester, None)
+            if result['status'] == 'PASSED' and getattr(tester, '_driver', None) is not None:
+                self._current[tester] = fingerprint_page(tester._driver)
+            return
+
+        targets = self.structural_steps.get(step_name)
+        current = self._current.get(tester)
+        if not targets or not current or result['status'] == 'SKIPPED':
+            return
+        key = self._baseline_key(tester, step_name)
+        with self._lock:
+            if result['status'] == 'PASSED' and all(current.get(target) for target in targets):
+                self.store['baselines'][key] = {
+                    'title': result['step'],
+                    'fingerprints': {target: current[target] for target in targets},
+                    'passed_at': datetime.now().isoformat(timespec='seconds'),
+                    'skips': 0,
+                }
+            else:
+                # Never skip a step on the strength of a run where it failed
+                self.store['baselines'].pop(key, None)
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.store_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.store, f, indent=2)
+        os.replace(tmp_path, self.store_path)
@@ -0,0 +1,180 @@
+"""
+Reusable Chrome WebDriver pool for long runs
+Hands released browsers back out instead of starting a new Chrome for every
+step. A browser is recycled (quit and replaced) once it reaches its use or age
+limit, or once its process tree has grown more than a set amount of memory
+since its first use, so a run lasting hours does not exhaust the host.
+
+Use one pool per tester configuration: pooled browsers keep the ChromeOptions
+(device profile, hook settings) they were created with.
+"""
+
+import threading
+import time
+
+
+class DriverPool:
+    def __init__(self, max_uses=25, max_age=1800, rss_growth_mb=300, max_idle=2, clear_cache=False):
+        """
+        Args:
+            max_uses (int): Recycle a browser after this many acquire/release cycles
+            max_age (float): Recycle a browser after this many seconds
+            rss_growth_mb (float): Recycle a browser once its RSS grew this much
+                since its first release (needs psutil; None disables the check)
+            max_idle (int): Idle browsers kept for reuse; extra ones are quit
+            clear_cache (bool): Also clear the HTTP cache between uses
+        """
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.rss_growth_mb = rss_growth_mb
+        self.max_idle = max_idle
+        self.clear_cache = clear_cache
+        self._lock = threading.Lock()
+        self._idle = []
+        # id(driver) -> {'driver', 'created', 'uses', 'baseline_rss', 'lifetime'}
+        self._info = {}
+        self._lifetimes = 0
+        self.stats = {'created': 0, 'reused': 0, 'recycled': {}}
+        # (time, lifetime number, rss_mb) measured at every release
+        self.memory_samples = []
+        self._rss_reader = None
+
+    def _rss_mb(self, driver):
+        if self.rss_growth_mb is None:
+            return None
+        if self._rss_reader is None:
+            try:
+                from resource_monitor import driver_rss_mb
+                self._rss_reader = driver_rss_mb
+            except ImportError:
+                print("[POOL] psutil not installed; memory-based recycling disabled")
+                self.rss_growth_mb = None
+                return None
+        return self._rss_reader(driver)
+
+    def _healthy(self, driver):
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, launch):
+        """
+        Return an idle pooled browser, or a new one from launch()
+
+        Args:
+            launch (callable): Creates a new WebDriver (the tester's launcher)
+        """
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                break
+            if self._healthy(driver):
+                with self._lock:
+                    self._info[id(driver)]['uses'] += 1
+                    self.stats['reused'] += 1
+                return driver
+            self._retire(driver, 'unresponsive')
+
+        driver = launch()
+        with self._lock:
+            self._lifetimes += 1
+            self._info[id(driver)] = {
+                'driver': driver,
+                'created': time.time(),
+                'uses': 1,
+                'baseline_rss': None,
+                'lifetime': self._lifetimes,
+            }
+            self.stats['created'] += 1
+        return driver
+
+    def _recycle_reason(self, driver, info):
+        if self.max_uses and info['uses'] >= self.max_uses:
+            return 'max uses'
+        if self.max_age and time.time() - info['created'] >= self.max_age:
+            return 'max age'
+
+        rss = self._rss_mb(driver)
+        if rss is None:
+            return None
+        with self._lock:
+            self.memory_samples.append((time.time(), info['lifetime'], rss))
+            if info['baseline_rss'] is None:
+                # The first page load sets the baseline; growth after that is suspicious
+                info['baseline_rss'] = rss
+                return None
+        if rss - info['baseline_rss'] > self.rss_growth_mb:
+            return 'memory growth'
+        return None
+
+    def _reset(self, driver):
+        """Return a browser to a blank, logged-out state"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        if self.clear_cache:
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        driver.get('about:blank')
+
+    def release(self, driver):
+        """Put a browser back into the pool, or quit it if it is due for recycling"""
+        with self._lock:
+            info = self._info.get(id(driver))
+        if info is None:
+            # Not from this pool
+            driver.quit()
+            return
+
+        reason = self._recycle_reason(driver, info)
+        if reason is None:
+            try:
+                self._reset(driver)
+            except Exception:
+                reason = 'reset failed'
+
+        with self._lock:
+            if reason is None and len(self._idle) >= self.max_idle:
+                reason = 'pool full'
+            if reason is None:
+                self._idle.append(driver)
+                return
+        self._retire(driver, reason)
+
+    def _retire(self, driver, reason):
+        with self._lock:
+            self._info.pop(id(driver), None)
+            self.stats['recycled'][reason] = self.stats['recycled'].get(reason, 0) + 1
+        if reason not in ('pool full', 'shutdown'):
+            print(f"[POOL] Recycling browser ({reason})")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def idle_count(self):
+        with self._lock:
+            return len(self._idle)
+
+    def trim(self, count):
+        """Quit up to count idle browsers (e.g. to make room for another pool) and return how many were quit"""
+        with self._lock:
+            count = max(0, min(count, len(self._idle)))
+            # Oldest idle browsers first; the most recently released stay warm
+            trimmed, self._idle = self._idle[:count], self._idle[count:]
+        for driver in trimmed:
+            self._retire(driver, 'pool full')
+        return len(trimmed)
+
+    def close(self):
+        """Quit every idle browser"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._retire(driver, 'shutdown')
@@ -0,0 +1,193 @@
+"""
+Failure clustering for large result sets
+Normalizes raw step messages (Selenium session ids, stack traces, addresses,
+numbers) into failure signatures and groups failures by signature with their
+count, first/last seen time and example steps. Reports use it to show one row
+per signature and to render only a few examples of each repeated failure.
+"""
+
+import hashlib
+import re
+import time
+from datetime import datetime
+from html import escape
+
+from step_runner import StepHook, PASSING_STATUSES
+
+
+# Reports with more results than this render at most EXAMPLES_PER_SIGNATURE failures per signature
+COMPACT_THRESHOLD = 200
+EXAMPLES_PER_SIGNATURE = 3
+
+_NOISE = [
+    # Selenium appends the native stack trace and the browser build to every message
+    (re.compile(r'\s*Stacktrace:.*', re.DOTALL), ''),
+    (re.compile(r'\s*\(Session info:[^)]*\)'), ''),
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.IGNORECASE), '<id>'),
+    (re.compile(r'\b[0-9a-f]{32}\b', re.IGNORECASE), '<id>'),
+    (re.compile(r'\b0x[0-9a-f]+\b', re.IGNORECASE), '<addr>'),
+    (re.compile(r'\bf\.[0-9A-F]{20,}\.d\.[0-9A-F]{20,}\.e\.\d+\b'), '<element>'),
+    (re.compile(r'\(\d+,\s*\d+\)'), '(<x>, <y>)'),
+    # Timings keep their unit; "1.52s" and "830ms" are still different kinds of value
+    (re.compile(r'\b\d+(\.\d+)?\s?(ms|s)\b'), r'<n>\2'),
+    # HTTP status codes tell failures apart ("status of 404" vs "status of 500"), so they are kept
+    (re.compile(r'(\b(?:HTTP|status(?: code)?(?: of)?|code)\s*:?\s*)?\b(\d+(\.\d+)?)\b', re.IGNORECASE),
+     lambda match: match.group(0) if match.group(1) and re.fullmatch(r'[1-5]\d\d', match.group(2))
+     else (match.group(1) or '') + '<n>'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def short_message(message, limit=300):
+    """The readable part of a step message: no stack trace or session info, at most limit characters"""
+    text = _NOISE[1][0].sub('', _NOISE[0][0].sub('', str(message or ''))).strip()
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def normalize_message(message):
+    """Message with run-specific values replaced, so repeats of one failure compare equal"""
+    text = str(message or '')
+    for pattern, replacement in _NOISE:
+        text = pattern.sub(replacement, text)
+    return text.strip()[:300]
+
+
+def signature(message):
+    """Short stable id of a normalized message"""
+    return hashlib.sha1(normalize_message(message).encode('utf-8')).hexdigest()[:8]
+
+
+class FailureClusters:
+    """Failure signatures collected incrementally (results are not kept)"""
+
+    def __init__(self, examples=EXAMPLES_PER_SIGNATURE):
+        self.examples = examples
+        self._clusters = {}
+
+    def add(self, result, seen_at=None):
+        """Count a result if it failed; seen_at defaults to the result's timestamp or now"""
+        if result['status'] in PASSING_STATUSES:
+            return None
+        seen_at = seen_at or result.get('timestamp') or time.time()
+        key = signature(result['message'])
+        cluster = self._clusters.get(key)
+        if cluster is None:
+            cluster = self._clusters[key] = {
+                'signature': key,
+                'message': normalize_message(result['message']),
+                'count': 0,
+                'first_seen': seen_at,
+                'last_seen': seen_at,
+                'steps': {},
+                'examples': [],
+            }
+        cluster['count'] += 1
+        cluster['first_seen'] = min(cluster['first_seen'], seen_at)
+        cluster['last_seen'] = max(cluster['last_seen'], seen_at)
+        cluster['steps'][result['step']] = cluster['steps'].get(result['step'], 0) + 1
+        if len(cluster['examples']) < self.examples:
+            cluster['examples'].append((result['step'], short_message(result['message'])))
+        return key
+
+    def clusters(self):
+        """Signatures, most frequent first"""
+        return sorted(self._clusters.values(), key=lambda cluster: (-cluster['count'], cluster['first_seen']))
+
+    def __len__(self):
+        return len(self._clusters)
+
+
+def cluster_failures(results):
+    clusters = FailureClusters()
+    for result in results:
+        clusters.add(result)
+    return clusters
+
+
+def compact_results(results, threshold=COMPACT_THRESHOLD, examples=EXAMPLES_PER_SIGNATURE):
+    """
+    Results to render in a report
+
+    Up to `threshold` results are returned unchanged. Above it, only the first
+    `examples` failures of each signature are kept (passing results stay).
+
+    Returns:
+        tuple: (results to render, number of failures left out)
+    """
+    if len(results) <= threshold:
+        return results, 0
+    shown, seen = [], {}
+    for result in results:
+        if result['status'] not in PASSING_STATUSES:
+            key = signature(result['message'])
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > examples:
+                continue
+        shown.append(result)
+    return shown, len(results) - len(shown)
+
+
+def _when(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def triage_section(clusters, max_rows=50):
+    """(title, html) table of the failure signatures, or None with fewer than two failures"""
+    rows = clusters.clusters()
+    if sum(cluster['count'] for cluster in rows) < 2:
+        return None
+    table = ''
+    for cluster in rows[:max_rows]:
+        steps = sorted(cluster['steps'].items(), key=lambda item: -item[1])
+        step_list = ', '.join(f"{escape(step)} ({count})" for step, count in steps[:3])
+        if len(steps) > 3:
+            step_list += f", +{len(steps) - 3} more"
+        example_step, example = cluster['examples'][0]
+        table += f'''
+                <tr>
+                    <td><code>{cluster['signature']}</code></td>
+                    <td>{cluster['count']}</td>
+                    <td>{escape(cluster['message'])}</td>
+                    <td>{step_list}</td>
+                    <td>{_when(cluster['first_seen'])}</td>
+                    <td>{_when(cluster['last_seen'])}</td>
+                    <td>{escape(example_step)}: {escape(example)}</td>
+                </tr>'''
+    more = (f'<p class="report-note">{len(rows) - max_rows} less frequent signature(s) not shown.</p>'
+            if len(rows) > max_rows else '')
+    total = sum(cluster['count'] for cluster in rows)
+    return ('🧩 Failure Signatures', f'''
+            <p class="report-note">{total} failure(s) in {len(rows)} signature(s). Session ids, addresses, numbers and stack traces are removed before grouping.</p>
+            <table class="report-table">
+                <tr><th>Signature</th><th>Count</th><th>Normalized message</th><th>Steps</th><th>First seen</th><th>Last seen</th><th>Example</th></tr>{table}
+            </table>{more}''')
+
+
+def render_failure_triage(tester, omitted=0):
+    """Report block with the failure signatures of a tester's results ('' when there is nothing to group)"""
+    if any(isinstance(hook, FailureTriage) for hook in tester.hooks):
+        # Results were aggregated (e.g. soak rows); the hook reports the raw failures instead
+        return ''
+    section = triage_section(cluster_failures(tester.test_results))
+    if not section:
+        return ''
+    title, body = section
+    if omitted:
+        body = (f'''
+            <p class="report-note">{omitted} repeated failure(s) are not listed individually above; '''
+                f'''each signature keeps {EXAMPLES_PER_SIGNATURE} example(s).</p>''' + body)
+    return f'''
+        <div class="test-details">
+            <h2>{title}</h2>{body}
+        </div>
+        '''
+
+
+class FailureTriage(StepHook):
+    """Report section for failures clustered elsewhere (e.g. across soak iterations)"""
+
+    def __init__(self, clusters):
+        self.clusters = clusters
+
+    def report_section(self, tester):
+        return triage_section(self.clusters)
@@ -0,0 +1,106 @@
+"""
+Flakiness tracking across runs
+Keeps a small JSON store of recent step outcomes, computes a flakiness score
+per step and holds the quarantine list used by step_runner.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class FlakeTracker:
+    def __init__(self, store_path='test_reports/flake_store.json', window=50, auto_quarantine_score=None):
+        """
+        Load (or create) the flake store
+
+        Args:
+            store_path (str): JSON file kept between runs
+            window (int): Number of recent outcomes used for the score
+            auto_quarantine_score (float): Quarantine steps whose score reaches this value
+                (default: only steps added explicitly are quarantined)
+        """
+        self.store_path = store_path
+        self.window = window
+        self.auto_quarantine_score = auto_quarantine_score
+        self._lock = threading.Lock()
+        self.store = {'steps': {}, 'quarantine': []}
+
+        if os.path.exists(store_path):
+            with open(store_path, 'r', encoding='utf-8') as f:
+                self.store.update(json.load(f))
+
+    @staticmethod
+    def flakiness_score(outcomes):
+        """
+        Score between 0 and 1 for a list of outcomes ('pass', 'flaky', 'fail')
+
+        Passes that needed a retry always count. Failures only count when the
+        step also passed within the window; a step that always fails is broken,
+        not flaky.
+        """
+        if not outcomes:
+            return 0.0
+        flaky = outcomes.count('flaky')
+        failed = outcomes.count('fail')
+        passed = outcomes.count('pass') + flaky
+        return (flaky + (failed if passed else 0)) / len(outcomes)
+
+    def record(self, step_key, passed, attempts):
+        """
+        Record one step outcome and persist the store
+
+        Returns:
+            float: Updated flakiness score of the step
+        """
+        outcome = 'fail' if not passed else ('flaky' if attempts > 1 else 'pass')
+
+        with self._lock:
+            entry = self.store['steps'].setdefault(step_key, {'runs': 0, 'outcomes': []})
+            entry['runs'] += 1
+            entry['outcomes'] = (entry['outcomes'] + [outcome])[-self.window:]
+            entry['score'] = round(self.flakiness_score(entry['outcomes']), 4)
+            entry['last_seen'] = datetime.now().isoformat(timespec='seconds')
+
+            if (self.auto_quarantine_score is not None and entry['score'] >= self.auto_quarantine_score
+                    and step_key not in self.store['quarantine']):
+                print(f"[QUARANTINE] {step_key} auto-quarantined (flakiness score {entry['score']:.2f})")
+                self.store['quarantine'].append(step_key)
+
+            self._save()
+            return entry['score']
+
+    def is_quarantined(self, step_key):
+        """Check whether a step ('NavbarTester.test_menu_opens') is quarantined"""
+        return step_key in self.store['quarantine']
+
+    def quarantine(self, step_key):
+        """Add a step to the quarantine list"""
+        with self._lock:
+            if step_key not in self.store['quarantine']:
+                self.store['quarantine'].append(step_key)
+                self._save()
+
+    def release(self, step_key):
+        """Remove a step from the quarantine list"""
+        with self._lock:
+            if step_key in self.store['quarantine']:
+                self.store['quarantine'].remove(step_key)
+                self._save()
+
+    def scores(self):
+        """Return {step_key: score} sorted from most to least flaky"""
+        return dict(sorted(
+            ((key, entry.get('score', 0.0)) for key, entry in self.store['steps'].items()),
+            key=lambda item: item[1], reverse=True
+        ))
+
+    def _save(self):
+        directory = os.path.dirname(self.store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.store_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.store, f, indent=2)
+        os.replace(tmp_path, self.store_path)
@@ -0,0 +1,385 @@
+"""
+HAR record-and-replay for deterministic, network-free reruns
+Record mode saves every response a run receives into a HAR-like JSON archive.
+Response bodies are fetched while the step runs (the DevTools log is polled in
+the background), because Chrome evicts the bodies of a page once the browser
+navigates away. Bodies that were still lost are counted and reported.
+Replay mode starts a local HTTPS server that answers for every host from the
+archive; Chrome is pointed at it with --host-resolver-rules, so a rerun never
+touches the live site.
+
+Usage:
+    python har_replay.py record --suite navbar --archive test_reports/navbar.har.json
+    python har_replay.py replay --suite navbar --archive test_reports/navbar.har.json
+
+Replay needs the openssl command line tool to create a self-signed certificate.
+Only https:// traffic is replayed (the store serves everything over HTTPS).
+"""
+
+import argparse
+import base64
+import json
+import os
+import ssl
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from devtools_events import enable_logging, read_events, subscribe
+from step_runner import StepHook
+
+
+# Headers that describe the original transfer, not the recorded (decoded) body
+SKIPPED_RESPONSE_HEADERS = {
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive',
+    'alt-svc', 'strict-transport-security',
+}
+
+
+def _har_headers(headers):
+    return [{'name': name, 'value': str(value)} for name, value in (headers or {}).items()]
+
+
+class HarRecorder(StepHook):
+    def __init__(self, archive_path, poll_interval=0.2):
+        """
+        Args:
+            archive_path (str): JSON file the archive is written to (after every step)
+            poll_interval (float): Seconds between reads of the DevTools log while a browser runs
+        """
+        self.archive_path = archive_path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        # requestId -> pending entry, per driver
+        self._pending = {}
+        # id(driver) -> lock serializing the poller and the end-of-step collection
+        self._collect_locks = {}
+        # id(driver) -> (poller thread, stop event)
+        self._pollers = {}
+        # (method, url) -> HAR entry; the latest response wins
+        self._entries = {}
+        # URLs whose body Chrome evicted before it could be fetched
+        self.dropped = []
+        self._reported = 0
+
+    def configure_options(self, tester, options):
+        enable_logging(options, performance=True)
+
+    def on_driver_created(self, tester, driver):
+        subscribe(driver, self)
+        driver.execute_cdp_cmd('Network.enable', {})
+        self._start_polling(driver)
+
+    def on_driver_release(self, tester, driver):
+        self._stop_polling(driver)
+        self._collect(driver)
+        with self._lock:
+            # Requests still in flight when the browser is released never finish
+            self._pending.pop(id(driver), None)
+            self._collect_locks.pop(id(driver), None)
+
+    def after_step(self, tester, step_name, result):
+        if getattr(tester, '_driver', None) is not None:
+            self._collect(tester._driver)
+        with self._lock:
+            dropped, self._reported = len(self.dropped) - self._reported, len(self.dropped)
+        if dropped:
+            result.setdefault('details', []).append((
+                'HAR recording', f"{dropped} response body(ies) evicted before they could be recorded; "
+                                 f"replay answers them with 404"))
+        self.save()
+
+    def _start_polling(self, driver):
+        """Fetch bodies as their responses finish, before a navigation evicts them"""
+        stop = threading.Event()
+
+        def poll():
+            while not stop.wait(self.poll_interval):
+                try:
+                    self._collect(driver)
+                except Exception:
+                    # The browser is gone
+                    return
+
+        thread = threading.Thread(target=poll, name='har-recorder', daemon=True)
+        with self._lock:
+            self._pollers[id(driver)] = (thread, stop)
+        thread.start()
+
+    def _stop_polling(self, driver):
+        with self._lock:
+            poller = self._pollers.pop(id(driver), None)
+        if poller:
+            poller[1].set()
+            poller[0].join(timeout=5)
+
+    def _collect(self, driver):
+        with self._lock:
+            collect_lock = self._collect_locks.setdefault(id(driver), threading.Lock())
+        with collect_lock:
+            self._collect_events(driver)
+
+    def _collect_events(self, driver):
+        with self._lock:
+            pending = self._pending.setdefault(id(driver), {})
+
+        for event in read_events(driver, self):
+            method = event.get('method')
+            params = event.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                if params.get('redirectResponse') and request_id in pending:
+                    # The previous hop of this request id ended in a redirect
+                    self._add_entry(pending.pop(request_id), params['redirectResponse'], None)
+                request = params.get('request', {})
+                if not request.get('url', '').startswith('https://'):
+                    continue
+                pending[request_id] = {
+                    'request': request,
+                    'wall_time': params.get('wallTime') or time.time(),
+                    'start': params.get('timestamp'),
+                    'response': None,
+                }
+            elif request_id not in pending:
+                continue
+            elif method == 'Network.responseReceived':
+                pending[request_id]['response'] = params.get('response', {})
+            elif method == 'Network.loadingFinished':
+                entry = pending.pop(request_id)
+                if entry['response'] is None:
+                    continue
+                try:
+                    body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                except Exception:
+                    # Chrome already evicted the body (e.g. after a navigation); replay will miss it
+                    url = entry['request'].get('url', '')
+                    with self._lock:
+                        self.dropped.append(url)
+                    print(f"[HAR] Response body no longer available: {url}")
+                    continue
+                elapsed = (params.get('timestamp', 0) - (entry['start'] or 0)) * 1000
+                self._add_entry(entry, entry['response'], body, elapsed)
+            elif method == 'Network.loadingFailed':
+                pending.pop(request_id, None)
+
+    def _add_entry(self, pending_entry, response, body, elapsed_ms=0.0):
+        request = pending_entry['request']
+        content = {'size': 0, 'mimeType': response.get('mimeType', '')}
+        if body is not None:
+            content['text'] = body.get('body', '')
+            if body.get('base64Encoded'):
+                content['encoding'] = 'base64'
+            content['size'] = len(content['text'])
+
+        entry = {
+            'startedDateTime': datetime.fromtimestamp(pending_entry['wall_time'], timezone.utc).isoformat(),
+            'time': round(max(elapsed_ms, 0.0), 2),
+            'request': {
+                'method': request.get('method', 'GET'),
+                'url': request.get('url'),
+                'headers': _har_headers(request.get('headers')),
+            },
+            'response': {
+                'status': response.get('status', 200),
+                'statusText': response.get('statusText', ''),
+                'headers': _har_headers(response.get('headers')),
+                'content': content,
+            },
+            'timings': {'send': 0, 'wait': round(max(elapsed_ms, 0.0), 2), 'receive': 0},
+        }
+        with self._lock:
+            self._entries[(entry['request']['method'], entry['request']['url'])] = entry
+
+    def save(self):
+        """Write the archive (HAR 1.2 layout) and return the number of entries"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry['startedDateTime'])
+            dropped = list(self.dropped)
+        archive = {'log': {
+            'version': '1.2',
+            'creator': {'name': 'soul-store-har-recorder', 'version': '1.0'},
+            'entries': entries,
+            # Custom field: responses without a recorded body (replay answers them with 404)
+            '_droppedBodies': dropped,
+        }}
+        directory = os.path.dirname(self.archive_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.archive_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(archive, f)
+        os.replace(tmp_path, self.archive_path)
+        return len(entries)
+
+
+def load_archive(archive_path):
+    """Index a HAR archive by (method, url) and by (method, url without query)"""
+    with open(archive_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)['log']['entries']
+
+    exact, without_query = {}, {}
+    for entry in entries:
+        method, url = entry['request']['method'], entry['request']['url']
+        exact[(method, url)] = entry
+        without_query.setdefault((method, url.split('?', 1)[0]), entry)
+    return exact, without_query
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _serve(self):
+        server = self.server
+        url = f"https://{self.headers.get('Host', '')}{self.path}"
+        entry = server.exact.get((self.command, url)) or server.without_query.get((self.command, url.split('?', 1)[0]))
+
+        content_length = int(self.headers.get('Content-Length') or 0)
+        if content_length:
+            self.rfile.read(content_length)
+
+        if entry is None:
+            server.misses += 1
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        server.hits += 1
+        response = entry['response']
+        content = response.get('content', {})
+        body = content.get('text', '')
+        body = base64.b64decode(body) if content.get('encoding') == 'base64' else body.encode('utf-8')
+
+        self.send_response(response['status'], response.get('statusText') or None)
+        for header in response.get('headers', []):
+            if header['name'].lower() not in SKIPPED_RESPONSE_HEADERS:
+                for value in header['value'].split('\n'):
+                    self.send_header(header['name'], value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_HEAD = do_OPTIONS = do_PUT = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    def __init__(self, archive_path, port=0, cert_dir='test_reports/.replay_cert'):
+        """
+        Local HTTPS server answering every host from a recorded archive
+
+        Args:
+            archive_path (str): Archive written by HarRecorder
+            port (int): Port to listen on (0 picks a free one)
+            cert_dir (str): Where the self-signed certificate is kept
+        """
+        self.archive_path = archive_path
+        self.port = port
+        self.cert_dir = cert_dir
+        self._server = None
+        self._thread = None
+
+    def _certificate(self):
+        cert_path = os.path.join(self.cert_dir, 'cert.pem')
+        key_path = os.path.join(self.cert_dir, 'key.pem')
+        if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+            os.makedirs(self.cert_dir, exist_ok=True)
+            try:
+                subprocess.run([
+                    'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '365',
+                    '-keyout', key_path, '-out', cert_path, '-subj', '/CN=soul-store-replay',
+                ], check=True, capture_output=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise RuntimeError(f"Could not create the replay certificate with openssl: {str(e)}")
+        return cert_path, key_path
+
+    def start(self):
+        """Start serving in a background thread and return the port"""
+        server = ThreadingHTTPServer(('127.0.0.1', self.port), _ReplayHandler)
+        server.daemon_threads = True
+        server.exact, server.without_query = load_archive(self.archive_path)
+        server.hits = server.misses = 0
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*self._certificate())
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+
+        self._server = server
+        self.port = server.server_address[1]
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[REPLAY] Serving {len(server.exact)} recorded responses on 127.0.0.1:{self.port}")
+        return self.port
+
+    def stop(self):
+        if self._server:
+            print(f"[REPLAY] {self._server.hits} hit(s), {self._server.misses} miss(es)")
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def hook(self):
+        """StepHook that points every browser at this server"""
+        return HarReplayer(self)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class HarReplayer(StepHook):
+    def __init__(self, server):
+        self.server = server
+
+    def configure_options(self, tester, options):
+        # Resolve every host to the replay server; its certificate is self-signed
+        options.add_argument(f"--host-resolver-rules=MAP * 127.0.0.1:{self.server.port}, EXCLUDE localhost")
+        options.add_argument('--ignore-certificate-errors')
+
+
+def main(argv=None):
+    from suites import SUITES, load_suite_class
+
+    parser = argparse.ArgumentParser(description='Record or replay a suite run from a HAR archive')
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('--suite', choices=['navbar'], default='navbar')
+    parser.add_argument('--archive', default='test_reports/navbar.har.json')
+    parser.add_argument('--url', help='Website URL (default: the suite URL)')
+    args = parser.parse_args(argv)
+
+    tester_cls = load_suite_class(args.suite)
+    url = args.url or SUITES[args.suite]['url']
+
+    if args.mode == 'record':
+        recorder = HarRecorder(args.archive)
+        tester = tester_cls(url, hooks=[recorder])
+        try:
+            result = tester.run_complete_navbar_test()
+        finally:
+            tester.close()
+        print(f"[RECORD] {recorder.save()} responses saved to {args.archive}")
+        if recorder.dropped:
+            print(f"[RECORD] {len(recorder.dropped)} response body(ies) could not be recorded; "
+                  f"replay answers those with 404 (see _droppedBodies in the archive)")
+        return 0 if result else 1
+
+    with ReplayServer(args.archive) as server:
+        tester = tester_cls(url, hooks=[server.hook()])
+        try:
+            result = tester.run_complete_navbar_test()
+        finally:
+            tester.close()
+    return 0 if result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
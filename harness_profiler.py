@@ -0,0 +1,307 @@
+"""
+Sampling profiler for the Python side of a test run
+Samples the stack of the thread running a tester's steps and attributes every
+sample to the current step ('harness' between steps, e.g. report generation).
+When the HTML report is written, per-step collapsed stacks and one combined
+flamegraph SVG are written next to it.
+
+By default only samples where the thread actually used CPU are counted
+(weighted by CPU microseconds), so time spent blocked on the browser does not
+hide WebDriverWait polling, element loops or report building.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from html import escape
+
+from step_runner import StepHook
+
+
+HARNESS_LABEL = 'harness'
+
+
+def _thread_cpu_clock(thread_id):
+    """Return a clock id for a thread's CPU time, or None where unsupported"""
+    try:
+        return time.pthread_getcpuclockid(thread_id)
+    except (AttributeError, OSError):
+        return None
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+def _stack(frame):
+    """Frames of a stack from the outermost call to the innermost"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return tuple(names)
+
+
+def write_collapsed(path, stacks):
+    """Write {stack tuple: weight} in the collapsed format used by flamegraph tools"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, weight in sorted(stacks.items()):
+            f.write(f"{';'.join(stack)} {weight}\n")
+
+
+def render_flamegraph(stacks, title, width=1200, row_height=18):
+    """
+    Render {stack tuple: weight} as a standalone SVG flamegraph
+
+    Args:
+        stacks (dict): Collapsed stacks, outermost frame first
+        title (str): Heading drawn above the graph
+        width (int): Image width in pixels
+        row_height (int): Height of one frame row in pixels
+
+    Returns:
+        str: SVG document
+    """
+    root = {'weight': 0, 'children': {}}
+    for stack, weight in stacks.items():
+        root['weight'] += weight
+        node = root
+        for name in stack:
+            node = node['children'].setdefault(name, {'weight': 0, 'children': {}})
+            node['weight'] += weight
+
+    def depth(node):
+        return 1 + max((depth(child) for child in node['children'].values()), default=0)
+
+    top = 30
+    height = top + depth(root) * row_height + 10
+    total = root['weight'] or 1
+    scale = (width - 20) / total
+    rects = []
+
+    def draw(name, node, x, level):
+        node_width = node['weight'] * scale
+        if node_width < 0.5:
+            return
+        y = height - 10 - (level + 1) * row_height
+        # Stable warm colours per function name
+        hue = sum(ord(char) for char in name) % 40 + 10
+        label = name if len(name) * 7 < node_width else name[:max(0, int(node_width / 7) - 2)] + '..'
+        rects.append(
+            f'<g><title>{escape(name)} ({node["weight"]}, {node["weight"] * 100 / total:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{node_width:.1f}" height="{row_height - 1}" '
+            f'fill="hsl({hue}, 90%, 60%)" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + row_height - 5}">{escape(label)}</text>' if node_width > 21 else '')
+            + '</g>'
+        )
+        child_x = x
+        for child_name, child in sorted(node['children'].items()):
+            draw(child_name, child, child_x, level + 1)
+            child_x += child['weight'] * scale
+
+    x = 10
+    for name, child in sorted(root['children'].items()):
+        draw(name, child, x, 0)
+        x += child['weight'] * scale
+
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="Verdana, sans-serif" font-size="11">
+<rect width="100%" height="100%" fill="#f8f9fa"/>
+<text x="{width / 2}" y="20" text-anchor="middle" font-size="15">{escape(title)}</text>
+{''.join(rects)}
+</svg>
+'''
+
+
+class HarnessProfiler(StepHook):
+    def __init__(self, interval=0.005, mode='cpu', top_functions=8):
+        """
+        Args:
+            interval (float): Seconds between samples
+            mode (str): 'cpu' counts CPU microseconds per sample, 'wall' counts every sample
+            top_functions (int): Hottest functions listed per step in the report
+        """
+        self.interval = interval
+        self.mode = mode
+        self.top_functions = top_functions
+        self._lock = threading.Lock()
+        # Per tester: profiled thread, CPU clock, current label and {label: {stack: weight}}
+        # (weak keys: testers that never write a report drop out when they are gone)
+        self._state = weakref.WeakKeyDictionary()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _ensure_sampler(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._sample_loop, name='harness-profiler', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the background sampler"""
+        self._stop.set()
+        thread = self._thread
+        if thread:
+            thread.join(timeout=2)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._state:
+                    # Every profiled tester is gone; before_step starts a new sampler
+                    self._thread = None
+                    return
+                for state in self._state.values():
+                    frame = frames.get(state['thread_id'])
+                    if frame is None:
+                        continue
+
+                    weight = 1
+                    if state['cpu_clock'] is not None:
+                        try:
+                            cpu_now = time.clock_gettime(state['cpu_clock'])
+                        except OSError:
+                            continue
+                        weight = int((cpu_now - state['cpu_last']) * 1_000_000)
+                        state['cpu_last'] = cpu_now
+                        if weight <= 0:
+                            # Blocked on the browser since the previous sample
+                            continue
+
+                    stacks = state['stacks'].setdefault(state['label'], {})
+                    stack = _stack(frame)
+                    stacks[stack] = stacks.get(stack, 0) + weight
+            del frames
+
+    def before_step(self, tester, step_name):
+        with self._lock:
+            state = self._state.get(tester)
+            if state is None:
+                thread_id = threading.get_ident()
+                cpu_clock = _thread_cpu_clock(thread_id) if self.mode == 'cpu' else None
+                state = self._state[tester] = {
+                    'thread_id': thread_id,
+                    'cpu_clock': cpu_clock,
+                    'cpu_last': time.clock_gettime(cpu_clock) if cpu_clock is not None else 0.0,
+                    'label': HARNESS_LABEL,
+                    'stacks': {},
+                    'order': [],
+                }
+            state['label'] = step_name
+            if step_name not in state['order']:
+                state['order'].append(step_name)
+        self._ensure_sampler()
+
+    def after_step(self, tester, step_name, result):
+        with self._lock:
+            state = self._state.get(tester)
+            if state is None:
+                return
+            state['label'] = HARNESS_LABEL
+            weight = sum(state['stacks'].get(step_name, {}).values())
+        unit = 'ms CPU' if state['cpu_clock'] is not None else 'samples'
+        value = weight / 1000 if state['cpu_clock'] is not None else weight
+        result.setdefault('details', []).append(('Harness profile', f'{value:.0f} {unit} in Python'))
+
+    def combine(self, target, testers):
+        """Add the stacks of testers to target (e.g. a report-only tester for parallel jobs)"""
+        with self._lock:
+            states = [self._state[tester] for tester in testers if tester in self._state]
+            if not states:
+                return
+            combined = self._state.setdefault(target, {
+                # No thread of its own: the sampler skips it
+                'thread_id': None,
+                'cpu_clock': next((state['cpu_clock'] for state in states if state['cpu_clock'] is not None), None),
+                'cpu_last': 0.0,
+                'label': HARNESS_LABEL,
+                'stacks': {},
+                'order': [],
+            })
+            for state in states:
+                for label, stacks in state['stacks'].items():
+                    merged = combined['stacks'].setdefault(label, {})
+                    for stack, weight in stacks.items():
+                        merged[stack] = merged.get(stack, 0) + weight
+                for label in state['order']:
+                    if label not in combined['order']:
+                        combined['order'].append(label)
+
+    def _hot_functions(self, stacks):
+        # Self time: weight of the innermost frame of each stack
+        totals = {}
+        for stack, weight in stacks.items():
+            totals[stack[-1]] = totals.get(stack[-1], 0) + weight
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:self.top_functions]
+
+    def report_section(self, tester):
+        with self._lock:
+            state = self._state.get(tester)
+            if state is None:
+                return None
+            per_label = {label: dict(stacks) for label, stacks in state['stacks'].items()}
+            order = [label for label in state['order'] if label in per_label]
+            cpu_mode = state['cpu_clock'] is not None
+
+        unit = 'ms CPU' if cpu_mode else 'samples'
+        divisor = 1000 if cpu_mode else 1
+        rows = ''
+        for label in order + ([HARNESS_LABEL] if HARNESS_LABEL in per_label else []):
+            stacks = per_label[label]
+            hot = ', '.join(f"{escape(name)} {weight / divisor:.0f}" for name, weight in self._hot_functions(stacks))
+            rows += f'''
+                <tr>
+                    <td>{escape(label)}</td>
+                    <td>{sum(stacks.values()) / divisor:.0f}</td>
+                    <td>{hot}</td>
+                </tr>'''
+        return ('🔥 Harness Profile', f'''
+            <p class="report-note">Python-side {unit} per step; the flamegraph and collapsed stacks are written next to this report.</p>
+            <table class="report-table">
+                <tr><th>Step</th><th>{unit}</th><th>Hottest functions (self)</th></tr>{rows}
+            </table>''')
+
+    def write(self, tester, base_path):
+        """
+        Write <base_path>_profile/<step>.folded files and <base_path>_flamegraph.svg
+
+        Returns:
+            str: Path of the flamegraph SVG, or None if nothing was sampled
+        """
+        with self._lock:
+            state = self._state.get(tester)
+            per_label = {label: dict(stacks) for label, stacks in state['stacks'].items()} if state else {}
+        if not per_label:
+            return None
+
+        profile_dir = f"{base_path}_profile"
+        os.makedirs(profile_dir, exist_ok=True)
+        combined = {}
+        for label, stacks in per_label.items():
+            write_collapsed(os.path.join(profile_dir, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', label)}.folded"), stacks)
+            for stack, weight in stacks.items():
+                combined[(label,) + stack] = combined.get((label,) + stack, 0) + weight
+        write_collapsed(os.path.join(profile_dir, 'combined.folded'), combined)
+
+        svg_path = f"{base_path}_flamegraph.svg"
+        title = f"{type(tester).__name__} harness profile ({'CPU' if self.mode == 'cpu' else 'wall'} samples)"
+        with open(svg_path, 'w', encoding='utf-8') as f:
+            f.write(render_flamegraph(combined, title))
+        return svg_path
+
+    def on_report_written(self, tester, report_path):
+        svg_path = self.write(tester, os.path.splitext(report_path)[0])
+        with self._lock:
+            self._state.pop(tester, None)
+            idle = not self._state
+        if idle:
+            self.stop()
+        if svg_path:
+            print(f"[PROFILE] Harness flamegraph written: {svg_path}")
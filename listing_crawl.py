@@ -0,0 +1,273 @@
+"""
+Category listing crawl with infinite-scroll throughput
+Opens each category listing (/men, /women, /sneakers), then scrolls (or
+follows "load more"/next-page controls) through the product grid. Each batch
+records how long new products took to render, how many products the page
+holds and the page's JS heap and DOM size, so slow or leaky listings show up.
+
+Usage:
+    python listing_crawl.py
+    python listing_crawl.py --categories /men,/sneakers --max-products 300 --profile mobile
+"""
+
+import argparse
+import statistics
+import time
+from html import escape
+from urllib.parse import urljoin
+
+from step_runner import StepHook, PASSING_STATUSES
+
+
+DEFAULT_CATEGORIES = ['/men', '/women', '/sneakers']
+
+# Links to product pages; unique hrefs are counted as products
+PRODUCT_LINK_SELECTOR = "a[href*='/product/']"
+
+# Controls that load the next batch when scrolling alone does not
+NEXT_PAGE_SELECTORS = (
+    "button[class*='load-more'], button[class*='loadMore'], a[class*='load-more'], "
+    "a[rel='next'], .pagination .next a, li.next a"
+)
+
+# Product count and DOM size in one round trip
+PAGE_STATE_JS = """
+const links = document.querySelectorAll(arguments[0]);
+return {
+    products: new Set(Array.from(links, a => a.href)).size,
+    dom_nodes: document.getElementsByTagName('*').length,
+};
+"""
+
+
+def js_heap_mb(driver):
+    """
+    Used JS heap of the page in MB, or None where DevTools is not available
+
+    Read through DevTools: performance.memory is bucketed and cached for
+    minutes unless Chrome runs with --enable-precise-memory-info.
+    """
+    try:
+        return driver.execute_cdp_cmd('Runtime.getHeapUsage', {})['usedSize'] / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def page_state(driver, heap=False):
+    """Product count and DOM size (and the JS heap with heap=True, which costs a DevTools call)"""
+    state = driver.execute_script(PAGE_STATE_JS, PRODUCT_LINK_SELECTOR)
+    state['heap_mb'] = js_heap_mb(driver) if heap else None
+    return state
+
+
+def _load_next_batch(driver, before, batch_timeout):
+    """
+    Scroll to the end of the grid (then try a next-page control) until more products render
+
+    Returns:
+        tuple: (seconds until new products appeared or None, method used)
+    """
+    from selenium.webdriver.common.by import By
+
+    start = time.perf_counter()
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    if _wait_for_more(driver, before, batch_timeout):
+        return time.perf_counter() - start, 'scroll'
+
+    controls = [control for control in driver.find_elements(By.CSS_SELECTOR, NEXT_PAGE_SELECTORS)
+                if control.is_displayed()]
+    if not controls:
+        return None, 'end'
+    start = time.perf_counter()
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", controls[0])
+    if _wait_for_more(driver, before, batch_timeout):
+        return time.perf_counter() - start, 'next page'
+    return None, 'end'
+
+
+def _wait_for_more(driver, before, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if page_state(driver)['products'] > before:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def crawl_listing(driver, listing_url, max_batches=20, max_products=500, batch_timeout=8.0):
+    """
+    Crawl one listing page
+
+    Returns:
+        dict: initial load time, batches ([{batch, seconds, method, products, heap_mb, dom_nodes}]) and totals
+    """
+    load_start = time.perf_counter()
+    driver.get(listing_url)
+    initial_wait = _wait_for_more(driver, 0, batch_timeout)
+    load_s = time.perf_counter() - load_start
+
+    state = page_state(driver, heap=True)
+    first_state = dict(state)
+    batches = []
+    if initial_wait:
+        while len(batches) < max_batches and state['products'] < max_products:
+            seconds, method = _load_next_batch(driver, state['products'], batch_timeout)
+            if seconds is None:
+                break
+            # Let the batch finish rendering before reading the totals
+            time.sleep(0.3)
+            previous = state['products']
+            state = page_state(driver, heap=True)
+            batches.append({
+                'batch': len(batches) + 1,
+                'seconds': round(seconds, 3),
+                'method': method,
+                'new_products': state['products'] - previous,
+                'products': state['products'],
+                'heap_mb': round(state['heap_mb'], 1) if state['heap_mb'] is not None else None,
+                'dom_nodes': state['dom_nodes'],
+            })
+            print(f"[CRAWL] Batch {len(batches)}: +{state['products'] - previous} products "
+                  f"in {seconds:.2f}s ({method})")
+
+    heap_growth = None
+    if first_state['heap_mb'] is not None and state['heap_mb'] is not None:
+        heap_growth = state['heap_mb'] - first_state['heap_mb']
+    return {
+        'load_s': round(load_s, 3),
+        'initial_products': first_state['products'],
+        'products': state['products'],
+        'batches': batches,
+        'heap_start_mb': first_state['heap_mb'],
+        'heap_growth_mb': heap_growth,
+        'dom_growth': state['dom_nodes'] - first_state['dom_nodes'],
+    }
+
+
+class ListingSummary(StepHook):
+    """Adds the per-batch table of every crawled listing to the report"""
+
+    def __init__(self, crawls):
+        self.crawls = crawls
+
+    def report_section(self, tester):
+        rows = ''
+        for category, crawl in self.crawls.items():
+            for batch in crawl['batches']:
+                rows += f'''
+                <tr>
+                    <td>{escape(category)}</td>
+                    <td>{batch['batch']}</td>
+                    <td>{batch['method']}</td>
+                    <td>{batch['seconds']:.2f}</td>
+                    <td>{batch['new_products']}</td>
+                    <td>{batch['products']}</td>
+                    <td>{'-' if batch['heap_mb'] is None else f"{batch['heap_mb']:.1f}"}</td>
+                    <td>{batch['dom_nodes']}</td>
+                </tr>'''
+        if not rows:
+            return None
+        return ('📜 Listing Crawl Batches', f'''
+            <p class="report-note">Time from scrolling (or clicking the next-page control) until new products rendered, with the page's JS heap and DOM size after each batch.</p>
+            <table class="report-table">
+                <tr><th>Listing</th><th>Batch</th><th>Loaded by</th><th>Time (s)</th><th>New</th><th>Total products</th><th>JS heap (MB)</th><th>DOM nodes</th></tr>{rows}
+            </table>''')
+
+
+def run_listing_crawl(tester_cls, website_url, categories=None, device_profile=None,
+                      max_batches=20, max_products=500, batch_timeout=8.0):
+    """
+    Crawl every category listing in its own browser and write a report
+
+    Returns:
+        tuple: (overall_result: bool, crawls: dict, report_filename: str)
+    """
+    from perf_budget import step_metrics
+
+    categories = categories or DEFAULT_CATEGORIES
+    tester = tester_cls(website_url, device_profile=device_profile)
+    tester.start_time = time.time()
+    crawls = {}
+
+    print("=" * 60)
+    print("STARTING LISTING CRAWL")
+    print(f"Categories: {', '.join(categories)}")
+    print("=" * 60)
+
+    for category in categories:
+        step_start = time.time()
+        listing_url = urljoin(website_url, category)
+        print(f"\n[CRAWL] {listing_url}")
+        driver = None
+        try:
+            driver = tester._create_driver()
+            crawl = crawl_listing(driver, listing_url, max_batches, max_products, batch_timeout)
+        except Exception as e:
+            tester.test_results.append({
+                'step': f'Listing Crawl: {category}',
+                'status': 'FAILED',
+                'message': f'Error crawling {listing_url}: {str(e)}',
+                'duration': f'{time.time() - step_start:.2f}s',
+                'group': 'Listing crawl',
+            })
+            print(f"[ERROR] Crawl of {category} failed: {str(e)}")
+            continue
+        finally:
+            if driver is not None:
+                tester._release_driver(driver)
+
+        crawls[category] = crawl
+        batch_times = [batch['seconds'] for batch in crawl['batches']]
+        median_batch = statistics.median(batch_times) if batch_times else None
+        message = (f"{crawl['products']} products ({crawl['initial_products']} initially) in "
+                   f"{len(crawl['batches'])} batch(es)")
+        if median_batch is not None:
+            message += f"; median batch {median_batch:.2f}s"
+        if crawl['heap_growth_mb'] is not None:
+            message += f"; JS heap {crawl['heap_growth_mb']:+.1f} MB"
+
+        details = [('Initial load', f"{crawl['load_s']:.2f}s"), ('DOM growth', f"{crawl['dom_growth']:+d} nodes")]
+        if crawl['heap_growth_mb'] is not None and crawl['products'] > crawl['initial_products']:
+            per_100 = crawl['heap_growth_mb'] * 100 / (crawl['products'] - crawl['initial_products'])
+            details.append(('Heap per 100 products', f'{per_100:+.2f} MB'))
+
+        tester.test_results.append({
+            'step': f'Listing Crawl: {category}',
+            'status': 'PASSED' if crawl['products'] else 'FAILED',
+            'message': message if crawl['products'] else f'No products found on {listing_url}',
+            'duration': f'{time.time() - step_start:.2f}s',
+            'details': details,
+            'metrics': step_metrics(listing_load_s=crawl['load_s'], batch_median_s=median_batch),
+            'group': 'Listing crawl',
+        })
+
+    tester.end_time = time.time()
+    tester.hooks.append(ListingSummary(crawls))
+    overall_result = bool(tester.test_results) and all(
+        result['status'] in PASSING_STATUSES for result in tester.test_results)
+    report_filename = tester.generate_html_report(overall_result)
+    return overall_result, crawls, report_filename
+
+
+def main(argv=None):
+    from suites import SUITES, load_suite_class
+    from viewport_matrix import DEVICE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Crawl category listings and measure scroll throughput')
+    parser.add_argument('--categories', help=f"Comma-separated listing paths (default: {','.join(DEFAULT_CATEGORIES)})")
+    parser.add_argument('--url', default=SUITES['navbar']['url'])
+    parser.add_argument('--profile', choices=list(DEVICE_PROFILES), help='Device profile')
+    parser.add_argument('--max-batches', type=int, default=20)
+    parser.add_argument('--max-products', type=int, default=500)
+    parser.add_argument('--batch-timeout', type=float, default=8.0, help='Seconds to wait for each batch')
+    args = parser.parse_args(argv)
+
+    categories = [category.strip() for category in args.categories.split(',')] if args.categories else None
+    overall_result, _, _ = run_listing_crawl(load_suite_class('navbar'), args.url, categories,
+                                             device_profile=args.profile, max_batches=args.max_batches,
+                                             max_products=args.max_products, batch_timeout=args.batch_timeout)
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,314 @@
+"""
+Live run progress over server-sent events
+A small local HTTP server that publishes every step start and finish (with
+status and timing) as server-sent events on /events, plus a minimal page on /
+showing throughput, in-flight steps and rolling latency per step. Add the
+server's hook to a tester (or use --live-port on soul_store_cli.py / soak.py)
+to watch a long load or soak run while it happens.
+
+Usage:
+    python soul_store_cli.py navbar --repeat 50 --concurrency 3 --live-port 8765
+    python soak.py --hours 4 --live-port 8765
+    # then open http://127.0.0.1:8765/
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from step_runner import StepHook, PASSING_STATUSES
+
+
+# Finish events replayed to a page that connects mid-run
+RECENT_EVENTS = 500
+# Events buffered per client; a client that falls further behind misses events instead of slowing the run
+CLIENT_BUFFER = 1000
+KEEPALIVE_SECONDS = 15
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>Live Run Progress</title>
+<style>
+    body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 24px; color: #333; background: #f5f7fa; }
+    h1 { font-size: 22px; }
+    h2 { font-size: 16px; margin-top: 24px; }
+    .cards { display: flex; gap: 12px; flex-wrap: wrap; }
+    .card { background: #fff; border-radius: 8px; padding: 12px 18px; box-shadow: 0 1px 3px rgba(0,0,0,.1); min-width: 120px; }
+    .card .value { font-size: 24px; font-weight: 600; }
+    table { border-collapse: collapse; background: #fff; width: 100%; font-size: 13px; }
+    th, td { padding: 6px 10px; border-bottom: 1px solid #eee; text-align: left; }
+    .PASSED, .QUARANTINED { color: #2e7d32; } .SKIPPED { color: #6c757d; } .FAILED { color: #c62828; }
+    #status { font-size: 12px; color: #888; }
+</style>
+</head>
+<body>
+<h1>Live Run Progress <span id="status">connecting...</span></h1>
+<div class="cards">
+    <div class="card">Finished<div class="value" id="finished">0</div></div>
+    <div class="card">Failed<div class="value" id="failed">0</div></div>
+    <div class="card">Steps / min (last 60s)<div class="value" id="throughput">0</div></div>
+    <div class="card">In flight<div class="value" id="inflight-count">0</div></div>
+</div>
+<h2>In-flight steps</h2>
+<table><thead><tr><th>Step</th><th>Tester</th><th>Worker</th><th>Running for</th></tr></thead><tbody id="inflight"></tbody></table>
+<h2>Rolling latency (last 50 per step)</h2>
+<table><thead><tr><th>Step</th><th>Runs</th><th>Failed</th><th>Last (s)</th><th>p50 (s)</th><th>p95 (s)</th></tr></thead><tbody id="latency"></tbody></table>
+<h2>Recent steps</h2>
+<table><thead><tr><th>Finished</th><th>Step</th><th>Status</th><th>Duration (s)</th></tr></thead><tbody id="recent"></tbody></table>
+<script>
+const inflight = new Map(), steps = new Map(), finishes = [];
+let finished = 0, failed = 0;
+const text = value => String(value).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})[c]);
+const pct = (values, f) => { const s = [...values].sort((a, b) => a - b); return s[Math.min(s.length - 1, Math.round(f * (s.length - 1)))]; };
+const fmt = v => v === null || v === undefined ? '-' : v.toFixed(2);
+
+function apply(event) {
+    if (event.type === 'start') {
+        inflight.set(event.key, event);
+    } else if (event.type === 'finish') {
+        inflight.delete(event.key);
+        finished += 1;
+        const ok = ['PASSED', 'QUARANTINED', 'SKIPPED'].includes(event.status);
+        if (!ok) failed += 1;
+        const entry = steps.get(event.step) || {runs: 0, failed: 0, last: null, window: []};
+        entry.runs += 1;
+        if (!ok) entry.failed += 1;
+        if (event.duration_s !== null) {
+            entry.last = event.duration_s;
+            entry.window.push(event.duration_s);
+            if (entry.window.length > 50) entry.window.shift();
+        }
+        steps.set(event.step, entry);
+        finishes.push(event);
+        if (finishes.length > 500) finishes.shift();
+    }
+}
+
+function render() {
+    const now = Date.now() / 1000;
+    document.getElementById('finished').textContent = finished;
+    document.getElementById('failed').textContent = failed;
+    document.getElementById('throughput').textContent = finishes.filter(e => now - e.time <= 60).length;
+    document.getElementById('inflight-count').textContent = inflight.size;
+    document.getElementById('inflight').innerHTML = [...inflight.values()].map(e =>
+        `<tr><td>${text(e.step)}</td><td>${text(e.tester)}</td><td>${text(e.worker)}</td><td>${(now - e.time).toFixed(1)}s</td></tr>`).join('');
+    document.getElementById('latency').innerHTML = [...steps.entries()].map(([step, s]) =>
+        `<tr><td>${text(step)}</td><td>${s.runs}</td><td>${s.failed}</td><td>${fmt(s.last)}</td>` +
+        `<td>${s.window.length ? fmt(pct(s.window, .5)) : '-'}</td><td>${s.window.length ? fmt(pct(s.window, .95)) : '-'}</td></tr>`).join('');
+    document.getElementById('recent').innerHTML = finishes.slice(-20).reverse().map(e =>
+        `<tr><td>${new Date(e.time * 1000).toLocaleTimeString()}</td><td>${text(e.step)}</td>` +
+        `<td class="${text(e.status)}">${text(e.status)}</td><td>${fmt(e.duration_s)}</td></tr>`).join('');
+}
+
+const source = new EventSource('/events');
+source.addEventListener('snapshot', message => {
+    const snapshot = JSON.parse(message.data);
+    inflight.clear(); steps.clear(); finishes.length = 0; finished = failed = 0;
+    snapshot.recent.forEach(apply);
+    snapshot.inflight.forEach(apply);
+    finished = snapshot.finished; failed = snapshot.failed;
+    render();
+});
+['start', 'finish'].forEach(type => source.addEventListener(type, message => { apply(JSON.parse(message.data)); render(); }));
+source.onopen = () => document.getElementById('status').textContent = 'live';
+source.onerror = () => document.getElementById('status').textContent = 'disconnected, retrying...';
+setInterval(render, 1000);
+</script>
+</body>
+</html>
+"""
+
+
+def _seconds(duration):
+    try:
+        return float(str(duration).rstrip('s'))
+    except ValueError:
+        return None
+
+
+class _ProgressHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server.progress
+        path = self.path.split('?', 1)[0]
+        if path == '/events':
+            self._stream(server)
+        elif path == '/state':
+            self._send(200, 'application/json', json.dumps(server.snapshot()).encode('utf-8'))
+        elif path == '/':
+            self._send(200, 'text/html; charset=utf-8', PAGE.encode('utf-8'))
+        else:
+            self._send(404, 'text/plain', b'Not found')
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, server):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        client = server.subscribe()
+        try:
+            self._write_event('snapshot', server.snapshot())
+            while True:
+                try:
+                    event = client.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    return
+                self._write_event(event['type'], event)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            server.unsubscribe(client)
+
+    def _write_event(self, name, data):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ProgressServer:
+    def __init__(self, port=8765, host='127.0.0.1'):
+        """
+        Local server streaming step events to the live page
+
+        Args:
+            port (int): Port to listen on (0 picks a free one)
+            host (str): Interface to bind (local only by default)
+        """
+        self.port = port
+        self.host = host
+        self._server = None
+        self._lock = threading.Lock()
+        self._clients = []
+        self._inflight = {}
+        self._recent = deque(maxlen=RECENT_EVENTS)
+        self.finished = 0
+        self.failed = 0
+
+    def start(self):
+        """Start serving in a background thread and return the port"""
+        server = ThreadingHTTPServer((self.host, self.port), _ProgressHandler)
+        server.daemon_threads = True
+        server.progress = self
+        self._server = server
+        self.port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[LIVE] Run progress at http://{self.host}:{self.port}/")
+        return self.port
+
+    def stop(self):
+        if self._server:
+            with self._lock:
+                for client in self._clients:
+                    # A slow client's buffer may be full: drop its oldest event to make room for the sentinel
+                    while True:
+                        try:
+                            client.put_nowait(None)
+                            break
+                        except queue.Full:
+                            try:
+                                client.get_nowait()
+                            except queue.Empty:
+                                pass
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def subscribe(self):
+        client = queue.Queue(maxsize=CLIENT_BUFFER)
+        with self._lock:
+            self._clients.append(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def snapshot(self):
+        """Current in-flight steps and the most recent finishes"""
+        with self._lock:
+            return {
+                'inflight': list(self._inflight.values()),
+                'recent': list(self._recent),
+                'finished': self.finished,
+                'failed': self.failed,
+                'time': time.time(),
+            }
+
+    def publish(self, event):
+        with self._lock:
+            if event['type'] == 'start':
+                self._inflight[event['key']] = event
+            else:
+                self._inflight.pop(event['key'], None)
+                self._recent.append(event)
+                self.finished += 1
+                if event['status'] not in PASSING_STATUSES:
+                    self.failed += 1
+            for client in self._clients:
+                try:
+                    client.put_nowait(event)
+                except queue.Full:
+                    pass
+
+    def hook(self):
+        """StepHook that publishes the steps of a tester to this server"""
+        return ProgressPublisher(self)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ProgressPublisher(StepHook):
+    def __init__(self, server):
+        self.server = server
+        self._started = {}
+
+    def before_step(self, tester, step_name):
+        key = f"{id(tester)}:{step_name}"
+        event = {
+            'type': 'start',
+            'key': key,
+            'step': step_name,
+            'tester': type(tester).__name__,
+            'worker': threading.current_thread().name,
+            'time': time.time(),
+        }
+        self._started[key] = event['time']
+        self.server.publish(event)
+
+    def after_step(self, tester, step_name, result):
+        key = f"{id(tester)}:{step_name}"
+        started = self._started.pop(key, None)
+        self.server.publish({
+            'type': 'finish',
+            'key': key,
+            'step': result['step'],
+            'tester': type(tester).__name__,
+            'status': result['status'],
+            'attempts': result.get('attempts', 1),
+            'duration_s': _seconds(result.get('duration')),
+            'elapsed_s': round(time.time() - started, 3) if started else None,
+            'time': time.time(),
+        })
@@ -0,0 +1,235 @@
+"""
+Data-driven login runs streamed from a credentials file
+Reads number/OTP records one at a time from a CSV or JSON-lines file, runs the
+login flow for each on a pool of workers and appends every record's result to
+a JSON-lines file as soon as it completes. Nothing is collected in memory
+beyond running totals, so the input can be of any size. Rerunning with the
+same output file resumes after the records that already completed.
+
+CSV files have a number and an optional otp column (with or without a header
+row); JSONL files have one {"number": ..., "otp": ...} object per line.
+
+Usage:
+    python login_records.py accounts.csv --concurrency 4
+    python login_records.py accounts.jsonl --output test_reports/accounts_results.jsonl
+    python login_records.py accounts.csv --restart
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from driver_pool import DriverPool
+from step_runner import PASSING_STATUSES
+
+
+def iter_records(path):
+    """
+    Yield (record number, {'number', 'otp'}) from a CSV or JSONL file, one line at a time
+
+    Record numbers count data records from 1, so they stay stable across runs.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson', '.json')):
+            index = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                index += 1
+                record = json.loads(line)
+                yield index, {'number': str(record['number']), 'otp': str(record.get('otp') or '')}
+            return
+
+        rows = csv.reader(f)
+        columns = {'number': 0, 'otp': 1}
+        index = 0
+        for row in rows:
+            if not row or not ''.join(row).strip():
+                continue
+            if index == 0 and not any(cell.strip().lstrip('+').isdigit() for cell in row):
+                # Header row: find the columns by name
+                header = [cell.strip().lower() for cell in row]
+                columns = {'number': header.index('number'), 'otp': header.index('otp') if 'otp' in header else None}
+                continue
+            index += 1
+            otp_column = columns['otp']
+            yield index, {
+                'number': row[columns['number']].strip(),
+                'otp': row[otp_column].strip() if otp_column is not None and otp_column < len(row) else '',
+            }
+
+
+def load_progress(output_path):
+    """
+    Read the record numbers already in the output file
+
+    Returns:
+        tuple: (watermark, done) - every record up to the watermark completed;
+            done holds the completed record numbers above it (out-of-order finishes)
+    """
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['record'])
+                except (ValueError, KeyError):
+                    # A line cut short by an interrupted run; that record runs again
+                    continue
+    watermark = 0
+    while watermark + 1 in done:
+        watermark += 1
+    return watermark, {number for number in done if number > watermark}
+
+
+def login_record(website_url, record, wait_before_otp=0, options=None):
+    """
+    Run the login flow for one record on its own tester
+
+    Returns:
+        list: The step results
+    """
+    from distributed import make_job, run_job
+
+    type_otp = bool(record['otp'])
+    job = make_job('login', [
+        ['test_login_with_number', [record['number']]],
+        ['test_otp_entry', [record['otp'], 0 if type_otp else wait_before_otp, type_otp]],
+        ['check_login_success', []],
+    ], website_url, options=dict(options or {}, html_report=False))
+    return run_job(job)
+
+
+def run_login_records(input_path, output_path=None, website_url=None, concurrency=2, wait_before_otp=0,
+                      restart=False, pool=None, hooks=None):
+    """
+    Stream the records of input_path through a worker pool
+
+    Args:
+        input_path (str): CSV or JSONL credentials file
+        output_path (str): JSON-lines results file (default: next to the reports, named after the input)
+        website_url (str): Login URL (default: the login suite URL)
+        concurrency (int): Logins running at the same time
+        wait_before_otp (int): Seconds to wait for manual entry on records without an OTP
+        restart (bool): Discard the existing results instead of resuming
+        pool (DriverPool): Browser pool (default: DriverPool sized for the concurrency)
+        hooks (list): StepHook instances passed to every tester
+
+    Returns:
+        dict: Totals of this run (ran, passed, failed, skipped) and the output path
+    """
+    from suites import SUITES
+
+    website_url = website_url or SUITES['login']['url']
+    if output_path is None:
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = f"test_reports/login_records_{stem}.jsonl"
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    if restart and os.path.exists(output_path):
+        os.remove(output_path)
+
+    watermark, done = load_progress(output_path)
+    pool = pool or DriverPool(max_idle=max(2, concurrency))
+    options = {'driver_pool': pool, 'hooks': hooks or []}
+    totals = {'ran': 0, 'passed': 0, 'failed': 0, 'skipped': 0, 'output': output_path}
+
+    print("=" * 60)
+    print("STARTING DATA-DRIVEN LOGIN RUN")
+    print(f"Records: {input_path}, concurrency: {concurrency}")
+    if watermark or done:
+        print(f"Resuming after record {watermark} ({len(done)} later record(s) also done)")
+    print("=" * 60)
+
+    def run_one(index, record):
+        start = time.time()
+        try:
+            results = login_record(website_url, record, wait_before_otp, options)
+        except Exception as e:
+            results = [{'step': 'Login flow', 'status': 'FAILED', 'message': f'Could not run: {str(e)}',
+                        'duration': '0.00s'}]
+        return {
+            'record': index,
+            'number': record['number'],
+            'passed': bool(results) and all(
+                result['status'] in PASSING_STATUSES for result in results),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'duration': round(time.time() - start, 2),
+            'steps': [{key: result.get(key) for key in ('step', 'status', 'message', 'duration', 'metrics')
+                       if key in result} for result in results],
+        }
+
+    with open(output_path, 'a', encoding='utf-8') as output, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+
+        def write(outcome):
+            # One line per record, flushed right away so an interruption loses nothing finished
+            output.write(json.dumps(outcome) + '\n')
+            output.flush()
+            totals['ran'] += 1
+            totals['passed' if outcome['passed'] else 'failed'] += 1
+            print(f"[LOGIN] Record {outcome['record']} ({outcome['number']}): "
+                  f"{'PASSED' if outcome['passed'] else 'FAILED'} in {outcome['duration']:.1f}s")
+
+        if output.tell():
+            with open(output_path, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b'\n':
+                    # Close the line an interrupted run left unfinished
+                    output.write('\n')
+
+        pending = set()
+        try:
+            for index, record in iter_records(input_path):
+                if index <= watermark or index in done:
+                    totals['skipped'] += 1
+                    continue
+                # Only a couple of records per worker are read ahead of the running ones
+                if len(pending) >= 2 * max(1, concurrency):
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future.result())
+                pending.add(executor.submit(run_one, index, record))
+            for future in wait(pending).done:
+                write(future.result())
+        except KeyboardInterrupt:
+            print("\n[LOGIN] Interrupted; finishing the running records (rerun to resume)")
+            for future in pending:
+                future.cancel()
+            for future in wait(pending).done:
+                if not future.cancelled():
+                    write(future.result())
+        finally:
+            pool.close()
+
+    print("=" * 60)
+    print(f"LOGIN RECORDS: {totals['passed']} passed, {totals['failed']} failed, "
+          f"{totals['skipped']} already done")
+    print(f"Results: {output_path}")
+    print("=" * 60)
+    return totals
+
+
+def main(argv=None):
+    from suites import SUITES
+
+    parser = argparse.ArgumentParser(description='Run the login flow for every record of a CSV/JSONL file')
+    parser.add_argument('input', help='CSV (number[,otp]) or JSONL ({"number", "otp"}) credentials file')
+    parser.add_argument('--output', help='JSON-lines results file (also the resume point)')
+    parser.add_argument('--url', default=SUITES['login']['url'])
+    parser.add_argument('--concurrency', type=int, default=2, help='Logins running at the same time')
+    parser.add_argument('--wait-before-otp', type=int, default=0,
+                        help='Seconds to wait for manual OTP entry on records without an OTP')
+    parser.add_argument('--restart', action='store_true', help='Discard earlier results instead of resuming')
+    args = parser.parse_args(argv)
+
+    totals = run_login_records(args.input, args.output, args.url, args.concurrency, args.wait_before_otp,
+                               restart=args.restart)
+    return 0 if not totals['failed'] else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
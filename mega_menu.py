@@ -0,0 +1,365 @@
+"""
+Mega-menu hover crawl
+Hovers every top-level item of ul.top_nav, times (in the page) how long its
+dropdown takes to become visible and collects the submenu links into a
+navigation tree. The tree of the last passing crawl is cached and every run is
+diffed against it, so slow, missing or changed menus show up in the report.
+
+Usage:
+    python mega_menu.py
+    python mega_menu.py --max-open-ms 800 --cache test_reports/nav_tree.json
+"""
+
+import argparse
+import json
+import os
+import time
+from html import escape
+
+from step_runner import StepHook, PASSING_STATUSES
+
+
+# Dropdown containers that may be rendered outside the hovered <li>
+MEGA_MENU_SELECTORS = (
+    "[class*='mega'], [class*='dropdown'], [class*='submenu'], [class*='sub-menu'], [class*='subMenu']"
+)
+
+DEFAULT_CACHE_PATH = 'test_reports/nav_tree.json'
+
+# Starts a requestAnimationFrame loop that stamps the hover and the first frame
+# in which new submenu links are visible
+INSTALL_PROBE_JS = """
+const item = arguments[0];
+const selectors = arguments[1];
+if (window.__megaMenu) { window.__megaMenu.done = true; }
+const topLink = item.querySelector('a');
+const visible = el => {
+    const rect = el.getBoundingClientRect();
+    const style = getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+};
+const submenuLinks = () => {
+    const links = new Set(Array.from(item.querySelectorAll('a')).filter(a => a !== topLink));
+    for (const container of document.querySelectorAll(selectors)) {
+        if (!item.contains(container) && !container.contains(item) && visible(container)) {
+            container.querySelectorAll('a').forEach(a => links.add(a));
+        }
+    }
+    return Array.from(links).filter(visible);
+};
+// Links that were already showing do not count as this item's dropdown
+const before = new Set(submenuLinks());
+const state = {hovered: null, visible: null, done: false, links: () => submenuLinks().filter(a => !before.has(a))};
+item.addEventListener('mouseover', () => { if (state.hovered === null) state.hovered = performance.now(); }, true);
+const check = () => {
+    if (state.done) return;
+    if (state.hovered !== null && state.links().length) {
+        state.visible = performance.now();
+        state.done = true;
+        return;
+    }
+    requestAnimationFrame(check);
+};
+requestAnimationFrame(check);
+window.__megaMenu = state;
+"""
+
+READ_PROBE_JS = "const s = window.__megaMenu; return [s.hovered, s.visible, s.done];"
+
+READ_LINKS_JS = """
+const s = window.__megaMenu;
+s.done = true;
+return s.links().map(a => [(a.innerText || a.textContent).trim(), a.getAttribute('href') || '']);
+"""
+
+
+def _move_pointer_away(driver):
+    """Park the pointer at the bottom-left of the viewport so open dropdowns close"""
+    from selenium.webdriver.common.action_chains import ActionChains
+
+    height = driver.execute_script("return window.innerHeight;")
+    actions = ActionChains(driver)
+    actions.w3c_actions.pointer_action.move_to_location(1, max(1, height - 2))
+    actions.perform()
+
+
+def hover_item(driver, item, timeout=3.0, settle=0.3):
+    """
+    Hover one top-level menu item and collect its dropdown
+
+    Returns:
+        tuple: (open latency in ms or None if nothing opened, [(text, href)] of the submenu links)
+    """
+    from selenium.webdriver.common.action_chains import ActionChains
+
+    driver.execute_script(INSTALL_PROBE_JS, item, MEGA_MENU_SELECTORS)
+    ActionChains(driver).move_to_element(item).perform()
+
+    deadline = time.time() + timeout
+    hovered = opened = None
+    while time.time() < deadline:
+        hovered, opened, done = driver.execute_script(READ_PROBE_JS)
+        if done:
+            break
+        time.sleep(0.05)
+
+    if opened is None:
+        driver.execute_script(READ_LINKS_JS)
+        return None, []
+    # Let the rest of the menu render before reading its links
+    time.sleep(settle)
+    links = list(dict.fromkeys(tuple(link) for link in driver.execute_script(READ_LINKS_JS) if link[0] or link[1]))
+    return round(opened - hovered, 1), links
+
+
+def crawl_menu(driver, website_url, timeout=3.0):
+    """
+    Hover every ul.top_nav item in turn
+
+    Returns:
+        dict: {label: {'href', 'open_ms', 'links': [{'text', 'href'}]}} in menu order
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get(website_url)
+    top_nav = WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, "ul.top_nav")))
+
+    tree = {}
+    for item in top_nav.find_elements(By.CSS_SELECTOR, ":scope > li"):
+        anchors = item.find_elements(By.CSS_SELECTOR, "a")
+        label = (anchors[0].text if anchors else item.text).strip()
+        if not label or not item.is_displayed():
+            continue
+        _move_pointer_away(driver)
+        time.sleep(0.3)
+        open_ms, links = hover_item(driver, item, timeout)
+        tree[label] = {
+            'href': anchors[0].get_attribute('href') if anchors else None,
+            'open_ms': open_ms,
+            'links': [{'text': text, 'href': href} for text, href in links],
+        }
+        opened = f'{open_ms:.0f} ms' if open_ms is not None else 'did not open'
+        print(f"[MENU] {label}: {opened}, {len(links)} link(s)")
+    return tree
+
+
+def _link_key(link):
+    return link['href'] or link['text']
+
+
+def diff_trees(previous, current, slow_factor=2.0, slow_min_ms=250):
+    """
+    Compare two navigation trees
+
+    Returns:
+        dict: removed_menus, added_menus and, per menu in both trees, added/removed
+            links, the previous open latency and whether it became slow or stopped opening
+    """
+    previous = previous or {}
+    diff = {
+        'had_previous': bool(previous),
+        'removed_menus': [label for label in previous if label not in current],
+        'added_menus': [label for label in current if label not in previous],
+        'menus': {},
+    }
+    for label, menu in current.items():
+        before = previous.get(label)
+        if before is None:
+            continue
+        old_links = {_link_key(link): link for link in before['links']}
+        new_links = {_link_key(link): link for link in menu['links']}
+        old_ms, new_ms = before.get('open_ms'), menu['open_ms']
+        diff['menus'][label] = {
+            'added': [link for key, link in new_links.items() if key not in old_links],
+            'removed': [link for key, link in old_links.items() if key not in new_links],
+            'previous_ms': old_ms,
+            'slower': (old_ms is not None and new_ms is not None
+                       and new_ms > max(old_ms * slow_factor, old_ms + slow_min_ms)),
+            'stopped_opening': old_ms is not None and new_ms is None,
+        }
+    return diff
+
+
+def load_tree(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['tree']
+
+
+def save_tree(path, tree):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'saved': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tree': tree}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def menu_results(tree, diff, max_open_ms=1000):
+    """One result per top-level menu (plus one per menu that disappeared)"""
+    from perf_budget import step_metrics
+
+    results = []
+    for label, menu in tree.items():
+        changes = diff['menus'].get(label)
+        details = [('Links', str(len(menu['links'])))]
+        status, problems = 'PASSED', []
+
+        if menu['open_ms'] is None:
+            if changes and changes['stopped_opening']:
+                status = 'FAILED'
+                problems.append(f"dropdown no longer opens (opened in {changes['previous_ms']:.0f} ms last time)")
+            message = 'No dropdown opened on hover'
+        else:
+            message = f"Dropdown opened in {menu['open_ms']:.0f} ms with {len(menu['links'])} link(s)"
+            if menu['open_ms'] > max_open_ms:
+                status = 'FAILED'
+                problems.append(f"opened in {menu['open_ms']:.0f} ms (limit {max_open_ms:.0f} ms)")
+
+        if changes:
+            if changes['previous_ms'] is not None:
+                details.append(('Previous open time', f"{changes['previous_ms']:.0f} ms"))
+            if changes['slower']:
+                problems.append(f"much slower than last time ({changes['previous_ms']:.0f} ms)")
+            if changes['added']:
+                details.append(('Added links', ', '.join(link['text'] or link['href'] for link in changes['added'])))
+            if changes['removed']:
+                details.append(('Removed links', ', '.join(link['text'] or link['href'] for link in changes['removed'])))
+        elif diff['had_previous']:
+            details.append(('Change', 'New top-level menu'))
+
+        results.append({
+            'step': f'Mega Menu: {label}',
+            'status': status,
+            'message': message + (f" - {'; '.join(problems)}" if problems else ''),
+            'duration': f"{(menu['open_ms'] or 0) / 1000:.2f}s",
+            'details': details,
+            'metrics': step_metrics(menu_open_s=menu['open_ms'] / 1000 if menu['open_ms'] is not None else None),
+            'group': 'Mega menu',
+        })
+
+    for label in diff['removed_menus']:
+        results.append({
+            'step': f'Mega Menu: {label}',
+            'status': 'FAILED',
+            'message': 'Menu item is no longer in ul.top_nav',
+            'duration': '0.00s',
+            'group': 'Mega menu',
+        })
+    return results
+
+
+class MegaMenuSummary(StepHook):
+    """Adds the navigation tree and its changes since the cached crawl to the report"""
+
+    def __init__(self, tree, diff):
+        self.tree = tree
+        self.diff = diff
+
+    def report_section(self, tester):
+        rows = ''
+        for label, menu in self.tree.items():
+            changes = self.diff['menus'].get(label)
+            if changes:
+                change = f"+{len(changes['added'])} / -{len(changes['removed'])}"
+            else:
+                change = 'new' if label in self.diff['added_menus'] else '-'
+            links = ', '.join(escape(link['text'] or link['href']) for link in menu['links'])
+            rows += f'''
+                <tr>
+                    <td>{escape(label)}</td>
+                    <td>{'-' if menu['open_ms'] is None else f"{menu['open_ms']:.0f}"}</td>
+                    <td>{len(menu['links'])}</td>
+                    <td>{change}</td>
+                    <td>{links or '-'}</td>
+                </tr>'''
+        for label in self.diff['removed_menus']:
+            rows += f'''
+                <tr>
+                    <td>{escape(label)}</td><td>-</td><td>-</td><td>removed</td><td>-</td>
+                </tr>'''
+        return ('🧭 Navigation Tree', f'''
+            <p class="report-note">Hover to first frame with the dropdown visible, measured in the page. Changes are against the tree of the last passing crawl.</p>
+            <table class="report-table">
+                <tr><th>Menu</th><th>Open (ms)</th><th>Links</th><th>Links +/-</th><th>Submenu links</th></tr>{rows}
+            </table>''')
+
+
+def run_menu_crawl(tester_cls, website_url, cache_path=DEFAULT_CACHE_PATH, device_profile=None,
+                   timeout=3.0, max_open_ms=1000, update_cache=False):
+    """
+    Crawl the mega menu, diff it with the cached tree and write a report
+
+    The cache is replaced after a passing crawl (or always with update_cache).
+
+    Returns:
+        tuple: (overall_result: bool, tree: dict, diff: dict, report_filename: str)
+    """
+    tester = tester_cls(website_url, device_profile=device_profile)
+    tester.start_time = time.time()
+    tree, diff = {}, diff_trees(None, {})
+
+    print("=" * 60)
+    print("STARTING MEGA-MENU CRAWL")
+    print(f"Website: {website_url}")
+    print("=" * 60)
+
+    try:
+        tree = crawl_menu(tester.driver, website_url, timeout)
+        diff = diff_trees(load_tree(cache_path), tree)
+        tester.test_results.extend(menu_results(tree, diff, max_open_ms))
+        if not tree:
+            tester.test_results.append({
+                'step': 'Mega Menu: crawl',
+                'status': 'FAILED',
+                'message': 'No top-level items found in ul.top_nav',
+                'duration': f'{time.time() - tester.start_time:.2f}s',
+                'group': 'Mega menu',
+            })
+    except Exception as e:
+        tester.test_results.append({
+            'step': 'Mega Menu: crawl',
+            'status': 'FAILED',
+            'message': f'Error crawling the navigation menu: {str(e)}',
+            'duration': f'{time.time() - tester.start_time:.2f}s',
+            'group': 'Mega menu',
+        })
+        print(f"[ERROR] Mega-menu crawl failed: {str(e)}")
+    finally:
+        tester.close()
+
+    tester.end_time = time.time()
+    overall_result = bool(tester.test_results) and all(
+        result['status'] in PASSING_STATUSES for result in tester.test_results)
+    if tree and (overall_result or update_cache):
+        save_tree(cache_path, tree)
+        print(f"[MENU] Navigation tree cached: {cache_path}")
+    tester.hooks.append(MegaMenuSummary(tree, diff))
+    report_filename = tester.generate_html_report(overall_result)
+    return overall_result, tree, diff, report_filename
+
+
+def main(argv=None):
+    from suites import SUITES, load_suite_class
+    from viewport_matrix import DEVICE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Hover every top navigation item and diff the navigation tree')
+    parser.add_argument('--url', default=SUITES['navbar']['url'])
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Navigation tree of the last passing crawl')
+    parser.add_argument('--profile', choices=list(DEVICE_PROFILES), help='Device profile (needs a hover-capable layout)')
+    parser.add_argument('--timeout', type=float, default=3.0, help='Seconds to wait for each dropdown')
+    parser.add_argument('--max-open-ms', type=float, default=1000, help='Fail menus that take longer to open')
+    parser.add_argument('--update-cache', action='store_true', help='Cache this crawl even if it fails')
+    args = parser.parse_args(argv)
+
+    overall_result, _, _, _ = run_menu_crawl(load_suite_class('navbar'), args.url, args.cache, args.profile,
+                                             args.timeout, args.max_open_ms, args.update_cache)
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
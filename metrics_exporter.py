@@ -0,0 +1,280 @@
+"""
+Prometheus metrics for synthetic monitoring
+Collects step duration histograms, pass/fail counters, per-step browser
+resource gauges (from ResourceMonitor, when it runs) and the outcome of each
+run, and renders them in the Prometheus text exposition format. The metrics
+can be scraped from a small local /metrics endpoint and/or written to a
+textfile for node_exporter's textfile collector after every run.
+
+Usage:
+    python soul_store_cli.py navbar login --number 9999999999 --metrics-port 9464
+    python soul_store_cli.py navbar --metrics-textfile /var/lib/node_exporter/soulstore.prom
+    python "the_soul_store_navbar (1).py" --metrics
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from step_runner import StepHook, PASSING_STATUSES
+
+
+PREFIX = 'soulstore'
+# Step durations range from sub-second checks to 30s+ page loads on a fresh browser
+DURATION_BUCKETS = (0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ResourceMonitor result['resources'] key -> (gauge name, multiplier, help)
+RESOURCE_GAUGES = {
+    'cpu_s': ('step_browser_cpu_seconds', 1, 'Browser CPU time used by the last run of the step'),
+    'peak_rss_mb': ('step_browser_peak_rss_bytes', 1024 * 1024, 'Peak browser RSS during the last run of the step'),
+    'peak_threads': ('step_browser_peak_threads', 1, 'Peak browser thread count during the last run of the step'),
+    'processes': ('step_browser_processes', 1, 'Browser processes during the last run of the step'),
+}
+
+
+def _seconds(duration):
+    try:
+        return float(str(duration).rstrip('s'))
+    except ValueError:
+        return None
+
+
+def _suite_name(tester):
+    """Suite name of a tester ('navbar', 'login', ...), or its class name"""
+    from suites import SUITES
+
+    class_name = type(tester).__name__
+    for name, suite in SUITES.items():
+        if suite['class'] == class_name:
+            return name
+    return class_name
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class StepMetrics(StepHook):
+    def __init__(self, textfile=None, buckets=DURATION_BUCKETS):
+        """
+        Args:
+            textfile (str): Rewrite this file after every finished run (node_exporter textfile collector)
+            buckets (tuple): Upper bounds of the step duration histogram in seconds
+        """
+        self.textfile = textfile
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # (suite, step) -> {'counts': [per bucket], 'sum', 'count'}
+        self._histograms = {}
+        # (suite, step, status) -> count
+        self._results = {}
+        # (suite, step) -> last successful finish time
+        self._last_success = {}
+        # (gauge name, suite, step) -> value
+        self._resources = {}
+        # (suite, check) -> {'success', 'timestamp', 'duration'}; check is '' outside the scheduler
+        self._runs = {}
+        self._run_counts = {}
+
+    def after_step(self, tester, step_name, result):
+        suite = _suite_name(tester)
+        key = (suite, step_name)
+        duration = _seconds(result.get('duration'))
+        now = result.get('timestamp') or time.time()
+        with self._lock:
+            status_key = (suite, step_name, result['status'])
+            self._results[status_key] = self._results.get(status_key, 0) + 1
+            if result['status'] in PASSING_STATUSES and result['status'] != 'SKIPPED':
+                self._last_success[key] = now
+            # Skipped steps did not run; a 0s observation would hide real latency
+            if duration is not None and result['status'] != 'SKIPPED':
+                histogram = self._histograms.setdefault(
+                    key, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+                for index, bound in enumerate(self.buckets):
+                    if duration <= bound:
+                        histogram['counts'][index] += 1
+                histogram['sum'] += duration
+                histogram['count'] += 1
+            for field, value in (result.get('resources') or {}).items():
+                if field in RESOURCE_GAUGES:
+                    name, multiplier, _ = RESOURCE_GAUGES[field]
+                    self._resources[(name, suite, step_name)] = value * multiplier
+
+    def record_run(self, suite, success, duration=None, finished=None, check=None):
+        """
+        Record the outcome of a whole run (and rewrite the textfile if one is set)
+
+        Args:
+            suite (str): Suite that ran ('navbar', 'search', 'login')
+            success (bool): Whether every step passed
+            duration (float): Run duration in seconds
+            finished (float): Unix time the run finished (default: now)
+            check (str): Scheduler check name, exported as a separate 'check' label
+        """
+        run_key = (suite, check or '')
+        with self._lock:
+            self._runs[run_key] = {
+                'success': 1 if success else 0,
+                'timestamp': finished or time.time(),
+                'duration': duration,
+            }
+            count_key = run_key + ('passed' if success else 'failed',)
+            self._run_counts[count_key] = self._run_counts.get(count_key, 0) + 1
+        if self.textfile:
+            self.write_textfile()
+
+    def on_report_written(self, tester, report_path):
+        success = bool(tester.test_results) and all(
+            result['status'] in PASSING_STATUSES for result in tester.test_results)
+        duration = tester.end_time - tester.start_time if tester.start_time and tester.end_time else None
+        self.record_run(_suite_name(tester), success, duration, tester.end_time)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            results = sorted(self._results.items())
+            last_success = sorted(self._last_success.items())
+            resources = sorted(self._resources.items())
+            runs = sorted(self._runs.items())
+            run_counts = sorted(self._run_counts.items())
+
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        family('step_duration_seconds', 'histogram', 'Step duration including retries')
+        for (suite, step), histogram in histograms:
+            labels = [('suite', suite), ('step', step)]
+            for bound, count in zip(self.buckets + (float('inf'),), histogram['counts'] + [histogram['count']]):
+                lines.append(f"{PREFIX}_step_duration_seconds_bucket"
+                             f"{_labels(labels + [('le', _number(float(bound)))])} {count}")
+            lines.append(f"{PREFIX}_step_duration_seconds_sum{_labels(labels)} {_number(round(histogram['sum'], 3))}")
+            lines.append(f"{PREFIX}_step_duration_seconds_count{_labels(labels)} {histogram['count']}")
+
+        family('step_results_total', 'counter', 'Finished steps by status')
+        for (suite, step, status), count in results:
+            lines.append(f"{PREFIX}_step_results_total"
+                         f"{_labels([('suite', suite), ('step', step), ('status', status)])} {count}")
+
+        family('step_last_success_timestamp_seconds', 'gauge', 'Unix time the step last passed')
+        for (suite, step), timestamp in last_success:
+            lines.append(f"{PREFIX}_step_last_success_timestamp_seconds"
+                         f"{_labels([('suite', suite), ('step', step)])} {_number(round(timestamp, 3))}")
+
+        for field, (name, _, help_text) in RESOURCE_GAUGES.items():
+            rows = [(suite, step, value) for (gauge, suite, step), value in resources if gauge == name]
+            if not rows:
+                continue
+            family(name, 'gauge', help_text)
+            for suite, step, value in rows:
+                lines.append(f"{PREFIX}_{name}{_labels([('suite', suite), ('step', step)])} {_number(value)}")
+
+        def run_labels(suite, check):
+            return [('suite', suite)] + ([('check', check)] if check else [])
+
+        family('runs_total', 'counter', 'Finished runs by result')
+        for (suite, check, outcome), count in run_counts:
+            lines.append(f"{PREFIX}_runs_total{_labels(run_labels(suite, check) + [('result', outcome)])} {count}")
+
+        family('run_success', 'gauge', '1 if every step of the last run passed')
+        for (suite, check), run in runs:
+            lines.append(f"{PREFIX}_run_success{_labels(run_labels(suite, check))} {run['success']}")
+        family('run_last_timestamp_seconds', 'gauge', 'Unix time the last run finished')
+        for (suite, check), run in runs:
+            lines.append(f"{PREFIX}_run_last_timestamp_seconds{_labels(run_labels(suite, check))} "
+                         f"{_number(round(run['timestamp'], 3))}")
+        family('run_duration_seconds', 'gauge', 'Duration of the last run')
+        for (suite, check), run in runs:
+            if run['duration'] is not None:
+                lines.append(f"{PREFIX}_run_duration_seconds{_labels(run_labels(suite, check))} "
+                             f"{_number(round(run['duration'], 3))}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path=None):
+        """Write the metrics atomically, so the textfile collector never reads half a file"""
+        path = path or self.textfile
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+        return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] == '/metrics':
+            body = self.server.metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+        else:
+            body = b'Not found'
+            self.send_response(404)
+            self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    def __init__(self, metrics, port=9464, host='127.0.0.1'):
+        """
+        Local Prometheus scrape endpoint on /metrics
+
+        Args:
+            metrics (StepMetrics): Metrics to serve
+            port (int): Port to listen on (0 picks a free one)
+            host (str): Interface to bind (local only by default)
+        """
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self._server = None
+
+    def start(self):
+        """Start serving in a background thread and return the port"""
+        server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        server.daemon_threads = True
+        server.metrics = self.metrics
+        self._server = server
+        self.port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[METRICS] Prometheus metrics at http://{self.host}:{self.port}/metrics")
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
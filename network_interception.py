@@ -0,0 +1,218 @@
+"""
+Network request interception via the Chrome DevTools protocol
+Records every request a step makes (size, timing, origin), applies configurable
+block lists with Network.setBlockedURLs and adds a per-origin cost breakdown to
+the report, separating first-party latency from analytics and ad traffic.
+"""
+
+import threading
+import weakref
+from html import escape
+from urllib.parse import urlsplit
+
+from devtools_events import enable_logging, read_events, subscribe
+from step_runner import StepHook
+
+
+# URL patterns for Network.setBlockedURLs ('*' is a wildcard)
+BLOCK_GROUPS = {
+    'analytics': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*clarity.ms*', '*hotjar.com*',
+        '*mixpanel.com*', '*segment.io*', '*analytics.tiktok.com*', '*bat.bing.com*',
+    ],
+    'ads': [
+        '*doubleclick.net*', '*googlesyndication.com*', '*googleadservices.com*',
+        '*connect.facebook.net*', '*criteo.com*', '*adsrvr.org*', '*taboola.com*',
+    ],
+    'images': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*'],
+    'fonts': ['*.woff*', '*.ttf*', '*.otf*'],
+}
+
+FIRST_PARTY_DOMAINS = ('thesouledstore.com',)
+
+
+def _host_matches(host, domains):
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def _group_domains(group):
+    return [pattern.strip('*').lstrip('.') for pattern in BLOCK_GROUPS[group]]
+
+
+class NetworkInterceptor(StepHook):
+    def __init__(self, block_groups=None, block_patterns=None, first_party_domains=FIRST_PARTY_DOMAINS):
+        """
+        Args:
+            block_groups (list): Names from BLOCK_GROUPS to block (e.g. ['analytics', 'ads'])
+            block_patterns (list): Extra URL patterns to block
+            first_party_domains (tuple): Domains counted as the store itself
+        """
+        self.block_groups = list(block_groups or [])
+        self.blocked_urls = [pattern for group in self.block_groups for pattern in BLOCK_GROUPS[group]]
+        self.blocked_urls += list(block_patterns or [])
+        self.first_party_domains = first_party_domains
+        self._lock = threading.Lock()
+        # requestId -> request record, per tester and step (weak keys: finished testers drop out)
+        self._requests = weakref.WeakKeyDictionary()
+        # origin -> totals over the whole run, per tester
+        self._origins = weakref.WeakKeyDictionary()
+
+    def classify(self, host):
+        """Return 'first-party', 'analytics', 'ads' or 'third-party' for a host"""
+        if _host_matches(host, self.first_party_domains):
+            return 'first-party'
+        for group in ('analytics', 'ads'):
+            if _host_matches(host, _group_domains(group)):
+                return group
+        return 'third-party'
+
+    def configure_options(self, tester, options):
+        enable_logging(options, performance=True)
+
+    def on_driver_created(self, tester, driver):
+        subscribe(driver, self)
+        driver.execute_cdp_cmd('Network.enable', {})
+        if self.blocked_urls:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+
+    def before_step(self, tester, step_name):
+        with self._lock:
+            self._requests[tester] = {}
+            self._origins.setdefault(tester, {})
+
+    def on_driver_release(self, tester, driver):
+        self._collect(tester, driver)
+
+    def _collect(self, tester, driver):
+        with self._lock:
+            requests = self._requests.get(tester)
+        if requests is None:
+            return
+
+        for event in read_events(driver, self):
+            method = event.get('method')
+            params = event.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                url = params.get('request', {}).get('url', '')
+                if url.startswith('data:'):
+                    continue
+                parts = urlsplit(url)
+                requests[request_id] = {
+                    'url': url,
+                    'origin': f"{parts.scheme}://{parts.netloc}",
+                    'host': parts.hostname or '',
+                    'type': params.get('type', 'Other'),
+                    'start': params.get('timestamp'),
+                    'end': None,
+                    'bytes': 0,
+                    'status': None,
+                    'blocked': False,
+                    'failed': False,
+                    'from_cache': False,
+                }
+            elif request_id not in requests:
+                continue
+            elif method == 'Network.responseReceived':
+                response = params.get('response', {})
+                requests[request_id]['status'] = response.get('status')
+                requests[request_id]['from_cache'] = bool(response.get('fromDiskCache') or response.get('fromPrefetchCache'))
+            elif method == 'Network.loadingFinished':
+                requests[request_id]['end'] = params.get('timestamp')
+                requests[request_id]['bytes'] = params.get('encodedDataLength', 0)
+            elif method == 'Network.loadingFailed':
+                requests[request_id]['end'] = params.get('timestamp')
+                requests[request_id]['blocked'] = bool(params.get('blockedReason'))
+                requests[request_id]['failed'] = not requests[request_id]['blocked']
+
+    def after_step(self, tester, step_name, result):
+        if getattr(tester, '_driver', None) is not None:
+            self._collect(tester, tester._driver)
+
+        with self._lock:
+            requests = self._requests.pop(tester, None)
+            origins = self._origins.setdefault(tester, {})
+        if requests is None:
+            return
+
+        by_class = {}
+        for request in requests.values():
+            duration = (request['end'] - request['start']) if request['end'] and request['start'] else 0.0
+            request_class = self.classify(request['host'])
+
+            origin = origins.setdefault(request['origin'], {
+                'class': request_class, 'requests': 0, 'blocked': 0, 'failed': 0, 'from_cache': 0,
+                'bytes': 0, 'time': 0.0,
+            })
+            origin['requests'] += 1
+            origin['blocked'] += request['blocked']
+            origin['from_cache'] += request['from_cache']
+            origin['failed'] += request['failed']
+            origin['bytes'] += request['bytes']
+            origin['time'] += duration
+
+            totals = by_class.setdefault(request_class, {'requests': 0, 'bytes': 0, 'time': 0.0, 'blocked': 0})
+            totals['requests'] += 1
+            totals['bytes'] += request['bytes']
+            totals['time'] += duration
+            totals['blocked'] += request['blocked']
+
+        result['network'] = {
+            'requests': len(requests),
+            'bytes': sum(request['bytes'] for request in requests.values()),
+            'blocked': sum(request['blocked'] for request in requests.values()),
+            'from_cache': sum(request['from_cache'] for request in requests.values()),
+            'by_class': by_class,
+        }
+        result.setdefault('details', []).append((
+            'Network',
+            f"{result['network']['requests']} request(s), {result['network']['bytes'] / 1024:.0f} KB, "
+            f"{result['network']['blocked']} blocked, {result['network']['from_cache']} from cache - " + ', '.join(
+                f"{name}: {totals['requests']} req / {totals['bytes'] / 1024:.0f} KB"
+                for name, totals in sorted(by_class.items())
+            )
+        ))
+
+    def combine(self, target, testers):
+        """Add the origin totals of testers to target (e.g. a report-only tester for parallel jobs)"""
+        with self._lock:
+            combined = self._origins.setdefault(target, {})
+            for tester in testers:
+                for origin, totals in self._origins.get(tester, {}).items():
+                    entry = combined.setdefault(origin, {
+                        'class': totals['class'], 'requests': 0, 'blocked': 0, 'failed': 0, 'from_cache': 0,
+                        'bytes': 0, 'time': 0.0,
+                    })
+                    for field in ('requests', 'blocked', 'failed', 'from_cache', 'bytes', 'time'):
+                        entry[field] += totals[field]
+
+    def origin_breakdown(self, tester):
+        """Return [(origin, totals)] for the run, most expensive first"""
+        with self._lock:
+            origins = dict(self._origins.get(tester, {}))
+        return sorted(origins.items(), key=lambda item: (item[1]['bytes'], item[1]['time']), reverse=True)
+
+    def report_section(self, tester):
+        breakdown = self.origin_breakdown(tester)
+        if not breakdown:
+            return None
+
+        rows = ''.join(f'''
+                <tr>
+                    <td>{escape(origin)}</td>
+                    <td>{totals['class']}</td>
+                    <td>{totals['requests']}</td>
+                    <td>{totals['blocked']}</td>
+                    <td>{totals['failed']}</td>
+                    <td>{totals['from_cache']}</td>
+                    <td>{totals['bytes'] / 1024:.1f}</td>
+                    <td>{totals['time']:.2f}</td>
+                </tr>''' for origin, totals in breakdown)
+        blocking = ', '.join(self.block_groups + [p for p in self.blocked_urls
+                                                  if not any(p in BLOCK_GROUPS[g] for g in self.block_groups)])
+        return ('🌐 Network Cost by Origin', f'''
+            <p class="report-note">Blocked: {escape(blocking) if blocking else 'nothing'}</p>
+            <table class="report-table">
+                <tr><th>Origin</th><th>Class</th><th>Requests</th><th>Blocked</th><th>Failed</th><th>From cache</th><th>KB</th><th>Request time (s)</th></tr>{rows}
+            </table>''')
@@ -0,0 +1,280 @@
+"""
+Performance budgets and regression gate per step
+Checks every step's duration and its own timing metrics (result['metrics'],
+e.g. navigation_s, time_to_results_s) against declarative budgets from
+perf_budgets.json, and compares them with a rolling baseline of earlier passing
+runs. Budget breaches fail the step; statistically significant slowdowns are
+flagged as regressions (and fail the run with fail_on_regression=True).
+
+A single sample is compared with a robust z-score (median/MAD of the baseline).
+With 5 or more samples in the current run (repeated or soak runs), a one-sided
+Mann-Whitney U test is used instead.
+"""
+
+import json
+import math
+import os
+import statistics
+import threading
+import time
+import weakref
+from html import escape
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from step_runner import StepHook
+
+
+DEFAULT_BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_budgets.json')
+
+
+def time_until(driver, condition, timeout=10, poll_frequency=0.1):
+    """
+    Seconds until a WebDriverWait condition is met
+
+    On timeout the seconds waited are returned, so the metric is still recorded
+    (as a lower bound) and a budget below the timeout is breached.
+
+    Args:
+        driver (WebDriver): Browser to poll
+        condition (callable): expected_conditions entry or any callable taking the driver
+        timeout (float): Seconds to wait at most
+        poll_frequency (float): Seconds between polls
+    """
+    start = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+    except TimeoutException:
+        pass
+    return time.perf_counter() - start
+
+
+def step_metrics(**values):
+    """Build result['metrics'] from keyword timings, dropping the ones not measured"""
+    return {name: round(value, 3) for name, value in values.items() if value is not None}
+
+
+def robust_z(value, baseline):
+    """Robust z-score of a value against baseline samples (0.6745 * (x - median) / MAD)"""
+    median = statistics.median(baseline)
+    mad = statistics.median(abs(sample - median) for sample in baseline)
+    if not mad:
+        # Identical baseline samples: treat 1% of the median as one unit of spread
+        mad = max(abs(median) * 0.01, 1e-6)
+    return 0.6745 * (value - median) / mad
+
+
+def mann_whitney_greater(current, baseline):
+    """
+    One-sided Mann-Whitney U test that current samples are larger than baseline samples
+
+    Returns:
+        tuple: (U statistic of current, p-value from the tie-corrected normal approximation)
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+
+    # Average ranks for ties
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _seconds(duration):
+    try:
+        return float(str(duration).rstrip('s'))
+    except ValueError:
+        return None
+
+
+class PerformanceGate(StepHook):
+    def __init__(self, budgets_path=DEFAULT_BUDGETS_PATH, baseline_path='test_reports/perf_baseline.json',
+                 window=30, min_baseline=5, z_threshold=3.5, alpha=0.01, min_effect=0.1,
+                 fail_on_regression=False):
+        """
+        Args:
+            budgets_path (str): JSON budgets: {"default": {metric: limit}, "steps": {step_key: {metric: limit}}}
+                (default: perf_budgets.json next to this module, whatever the working directory)
+            baseline_path (str): JSON store of recent passing values per step and metric
+            window (int): Values kept per step and metric in the baseline
+            min_baseline (int): Baseline values needed before regressions are judged
+            z_threshold (float): Robust z-score above which a single sample is a regression
+            alpha (float): Significance level of the Mann-Whitney test
+            min_effect (float): Ignore slowdowns smaller than this fraction of the baseline median
+            fail_on_regression (bool): Let regressions fail the run, not only flag it
+        """
+        self.baseline_path = baseline_path
+        self.window = window
+        self.min_baseline = min_baseline
+        self.z_threshold = z_threshold
+        self.alpha = alpha
+        self.min_effect = min_effect
+        self.fail_on_regression = fail_on_regression
+        self._lock = threading.Lock()
+
+        self.budgets = {'default': {}, 'steps': {}}
+        if budgets_path and os.path.exists(budgets_path):
+            with open(budgets_path, 'r', encoding='utf-8') as f:
+                self.budgets.update(json.load(f))
+
+        self.store = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                self.store = json.load(f)
+        # Comparisons use the baseline as it was when the run started
+        self._baseline = {key: {metric: list(values) for metric, values in metrics.items()}
+                          for key, metrics in self.store.items()}
+        # Per tester: {(step_key, metric): [values]} and {(step_key, metric): row}
+        # (weak keys: a finished tester's rows never reach a later tester)
+        self._samples = weakref.WeakKeyDictionary()
+        self._rows = weakref.WeakKeyDictionary()
+
+    def budget_for(self, step_key):
+        """Merged {metric: limit} for a step ('NavbarTester.test_men_navigation')"""
+        budget = dict(self.budgets.get('default', {}))
+        budget.update(self.budgets.get('steps', {}).get(step_key, {}))
+        return budget
+
+    def _judge(self, step_key, metric, samples):
+        """Return (is_regression, test description, baseline median) for the current samples"""
+        baseline = self._baseline.get(step_key, {}).get(metric, [])
+        if len(baseline) < self.min_baseline:
+            return False, f'baseline {len(baseline)}/{self.min_baseline}', None
+
+        median = statistics.median(baseline)
+        current = statistics.median(samples)
+        large_enough = current > median * (1 + self.min_effect)
+        if len(samples) >= 5:
+            _, p_value = mann_whitney_greater(samples, baseline)
+            return p_value < self.alpha and large_enough, f'Mann-Whitney p={p_value:.3f}', median
+        z = robust_z(samples[-1], baseline)
+        return z > self.z_threshold and large_enough, f'robust z={z:.1f}', median
+
+    def after_step(self, tester, step_name, result):
+        step_key = f"{type(tester).__name__}.{step_name}"
+        values = dict(result.get('metrics', {}))
+        duration = _seconds(result.get('duration'))
+        if duration is not None:
+            values['duration_s'] = duration
+        budget = self.budget_for(step_key)
+
+        breaches = []
+        details = result.setdefault('details', [])
+        with self._lock:
+            samples = self._samples.setdefault(tester, {})
+            rows = self._rows.setdefault(tester, {})
+            for metric, value in sorted(values.items()):
+                metric_samples = samples.setdefault((step_key, metric), [])
+                metric_samples.append(value)
+
+                limit = budget.get(metric)
+                over_budget = limit is not None and value > limit
+                regression, test, median = self._judge(step_key, metric, metric_samples)
+
+                if over_budget:
+                    breaches.append(f"{metric} {value:.2f}s > {limit:.2f}s")
+                    verdict = 'OVER BUDGET'
+                elif regression:
+                    verdict = 'REGRESSION'
+                    details.append(('Performance regression', f"{metric} {value:.2f}s vs baseline median {median:.2f}s ({test})"))
+                    print(f"[PERF] {step_name}: {metric} regressed to {value:.2f}s (baseline median {median:.2f}s, {test})")
+                else:
+                    verdict = 'OK'
+
+                rows[(step_key, metric)] = {
+                    'step': result.get('step', step_name),
+                    'metric': metric,
+                    'value': value,
+                    'budget': limit,
+                    'median': median,
+                    'test': test,
+                    'verdict': verdict,
+                }
+
+                # Only clean, passing values extend the rolling baseline
+                if verdict == 'OK' and result['status'] == 'PASSED':
+                    entry = self.store.setdefault(step_key, {})
+                    entry[metric] = (entry.get(metric, []) + [value])[-self.window:]
+
+            self._save()
+
+        if breaches:
+            details.append(('Over budget', '; '.join(breaches)))
+            print(f"[PERF] {step_name} over budget: {'; '.join(breaches)}")
+            # Quarantined and skipped steps keep their status; the breach is in the details
+            if result['status'] == 'PASSED':
+                result['status'] = 'FAILED'
+                result['message'] = f"{result['message']} (over performance budget)"
+
+    def combine(self, target, testers):
+        """Add the rows of testers to target (e.g. a report-only tester for parallel jobs)"""
+        with self._lock:
+            rows = self._rows.setdefault(target, {})
+            for index, tester in enumerate(testers):
+                for key, row in self._rows.get(tester, {}).items():
+                    rows[(index,) + key] = row
+
+    def verdict(self, tester):
+        """Return 'OVER BUDGET', 'REGRESSION' or 'OK' for a tester's run"""
+        with self._lock:
+            verdicts = {row['verdict'] for row in self._rows.get(tester, {}).values()}
+        for verdict in ('OVER BUDGET', 'REGRESSION'):
+            if verdict in verdicts:
+                return verdict
+        return 'OK'
+
+    def passed(self, tester):
+        """Whether the gate lets the run pass (use for the exit code)"""
+        verdict = self.verdict(tester)
+        return verdict == 'OK' or (verdict == 'REGRESSION' and not self.fail_on_regression)
+
+    def report_section(self, tester):
+        with self._lock:
+            rows = list(self._rows.get(tester, {}).values())
+        if not rows:
+            return None
+
+        table_rows = ''.join(f'''
+                <tr>
+                    <td>{escape(row['step'])}</td>
+                    <td>{row['metric']}</td>
+                    <td>{row['value']:.2f}</td>
+                    <td>{'-' if row['budget'] is None else f"{row['budget']:.2f}"}</td>
+                    <td>{'-' if row['median'] is None else f"{row['median']:.2f}"}</td>
+                    <td>{escape(row['test'])}</td>
+                    <td>{row['verdict']}</td>
+                </tr>''' for row in rows)
+        gate = 'PASSED' if self.passed(tester) else 'FAILED'
+        return ('📏 Performance Gate', f'''
+            <p class="report-note">Gate {gate}: {self.verdict(tester)}. Budgets are hard limits; regressions are judged against the last {self.window} passing values.</p>
+            <table class="report-table">
+                <tr><th>Step</th><th>Metric</th><th>Value (s)</th><th>Budget (s)</th><th>Baseline median (s)</th><th>Test</th><th>Verdict</th></tr>{table_rows}
+            </table>''')
+
+    def _save(self):
+        directory = os.path.dirname(self.baseline_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.baseline_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.store, f, indent=2)
+        os.replace(tmp_path, self.baseline_path)
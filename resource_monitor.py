@@ -0,0 +1,190 @@
+"""
+Browser process resource monitor
+Samples the chromedriver and Chrome process tree of every browser a step uses
+in a background thread and records CPU time, peak RSS and thread count per step.
+
+Requires: pip install psutil
+"""
+
+import threading
+import time
+import weakref
+from html import escape
+
+import psutil
+
+from step_runner import StepHook
+
+
+def driver_processes(driver):
+    """Return the chromedriver process and every browser process below it"""
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        return [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return []
+
+
+def driver_rss_mb(driver):
+    """Current resident memory of a driver's whole process tree in MB"""
+    total = 0
+    for process in driver_processes(driver):
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+class ResourceMonitor(StepHook):
+    def __init__(self, interval=0.25):
+        """
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Per tester: tracked drivers, the step being measured and finished rows
+        # (weak keys: finished testers drop out)
+        self._state = weakref.WeakKeyDictionary()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _tester_state(self, tester):
+        return self._state.setdefault(tester, {'drivers': {}, 'step': None, 'rows': []})
+
+    def _ensure_sampler(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name='resource-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background sampler"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                states = list(self._state.values())
+            for state in states:
+                self._sample(state)
+
+    def _sample(self, state, drivers=None):
+        with self._lock:
+            step = state['step']
+            drivers = drivers if drivers is not None else list(state['drivers'].values())
+        if step is None:
+            return
+
+        rss_total = 0
+        threads_total = 0
+        readings = {}
+        for driver in drivers:
+            for process in driver_processes(driver):
+                try:
+                    with process.oneshot():
+                        cpu = process.cpu_times()
+                        readings[process.pid] = (cpu.user + cpu.system, process.create_time())
+                        rss_total += process.memory_info().rss
+                        threads_total += process.num_threads()
+                except psutil.Error:
+                    continue
+
+        with self._lock:
+            for pid, (cpu_total, created) in readings.items():
+                if pid not in step['cpu_base']:
+                    # Processes started during the step count from zero
+                    step['cpu_base'][pid] = cpu_total if created < step['start'] else 0.0
+                step['cpu_last'][pid] = cpu_total
+            step['peak_rss'] = max(step['peak_rss'], rss_total)
+            step['peak_threads'] = max(step['peak_threads'], threads_total)
+            step['max_processes'] = max(step['max_processes'], len(readings))
+
+    def on_driver_created(self, tester, driver):
+        with self._lock:
+            state = self._tester_state(tester)
+            state['drivers'][id(driver)] = driver
+        self._sample(state, [driver])
+
+    def on_driver_release(self, tester, driver):
+        with self._lock:
+            state = self._tester_state(tester)
+        # Last reading before the processes exit
+        self._sample(state, [driver])
+        with self._lock:
+            state['drivers'].pop(id(driver), None)
+
+    def before_step(self, tester, step_name):
+        with self._lock:
+            state = self._tester_state(tester)
+            state['step'] = {
+                'start': time.time(),
+                'cpu_base': {},
+                'cpu_last': {},
+                'peak_rss': 0,
+                'peak_threads': 0,
+                'max_processes': 0,
+            }
+        self._sample(state)
+        self._ensure_sampler()
+
+    def after_step(self, tester, step_name, result):
+        with self._lock:
+            state = self._tester_state(tester)
+        self._sample(state)
+
+        with self._lock:
+            step = state['step']
+            state['step'] = None
+        if step is None:
+            return
+
+        cpu_seconds = sum(max(0.0, last - step['cpu_base'].get(pid, last)) for pid, last in step['cpu_last'].items())
+        resources = {
+            'cpu_s': round(cpu_seconds, 3),
+            'peak_rss_mb': round(step['peak_rss'] / (1024 * 1024), 1),
+            'peak_threads': step['peak_threads'],
+            'processes': step['max_processes'],
+        }
+        result['resources'] = resources
+        result.setdefault('details', []).append((
+            'Browser resources',
+            f"CPU {resources['cpu_s']:.2f}s, peak RSS {resources['peak_rss_mb']:.0f} MB, "
+            f"{resources['peak_threads']} threads in {resources['processes']} processes"
+        ))
+        with self._lock:
+            state['rows'].append((result.get('step', step_name), resources))
+
+    def combine(self, target, testers):
+        """Add the step rows of testers to target (e.g. a report-only tester for parallel jobs)"""
+        with self._lock:
+            rows = self._tester_state(target)['rows']
+            for tester in testers:
+                state = self._state.get(tester)
+                if state:
+                    rows.extend(state['rows'])
+
+    def report_section(self, tester):
+        with self._lock:
+            rows = list(self._tester_state(tester)['rows'])
+        if not rows:
+            return None
+
+        peak = max(rows, key=lambda row: row[1]['peak_rss_mb'])
+        total_cpu = sum(resources['cpu_s'] for _, resources in rows)
+        table_rows = ''.join(f'''
+                <tr>
+                    <td>{escape(step)}</td>
+                    <td>{resources['cpu_s']:.2f}</td>
+                    <td>{resources['peak_rss_mb']:.0f}</td>
+                    <td>{resources['peak_threads']}</td>
+                    <td>{resources['processes']}</td>
+                </tr>''' for step, resources in rows)
+        return ('🖥 Browser Resource Usage', f'''
+            <p class="report-note">Total browser CPU {total_cpu:.2f}s; highest peak RSS {peak[1]['peak_rss_mb']:.0f} MB in {escape(peak[0])}</p>
+            <table class="report-table">
+                <tr><th>Step</th><th>CPU (s)</th><th>Peak RSS (MB)</th><th>Peak threads</th><th>Processes</th></tr>{table_rows}
+            </table>''')
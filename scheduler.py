@@ -0,0 +1,410 @@
+"""
+Scheduler daemon for recurring synthetic checks
+Runs configured checks (the navbar suite, a search, the login flow) at fixed
+intervals with jitter, so they do not all start at once. A global browser
+limit caps how many Chrome instances run at the same time; a check that is
+still running (or waiting for browsers) when it is due again is skipped or
+queued once, as configured. Browsers come from one DriverPool per suite and
+stay warm between runs; idle pooled browsers count against the browser limit,
+so other pools' idle browsers are quit before a run could go past it.
+
+Every finished run is appended to a JSON-lines log. Add --metrics-port or
+--metrics-textfile to expose the results to Prometheus.
+
+The schedule is a JSON file:
+    {
+      "browser_limit": 2,
+      "checks": [
+        {"name": "navbar", "suite": "navbar", "interval": 900},
+        {"name": "search", "suite": "search", "query": "Shirts", "interval": 300, "overlap": "queue"},
+        {"name": "login", "suite": "login", "number": "9999999999", "interval": 1800, "jitter": 0.2}
+      ]
+    }
+Check fields: name, suite (navbar, search or login), interval (seconds),
+jitter (fraction of the interval, default 0.1), overlap (skip or queue,
+default skip), url, steps (navbar step names), query (search), number and
+otp (login).
+
+Usage:
+    python scheduler.py --config schedule.json
+    python scheduler.py --config schedule.json --metrics-port 9464 --live-port 8765
+    python scheduler.py --config schedule.json --once
+    python scheduler.py --config schedule.json --incremental
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from driver_pool import DriverPool
+from step_runner import PASSING_STATUSES
+
+
+DEFAULT_JITTER = 0.1
+OVERLAP_MODES = ('skip', 'queue')
+
+DEFAULT_SCHEDULE = {
+    'browser_limit': 2,
+    'checks': [
+        {'name': 'navbar', 'suite': 'navbar', 'interval': 900},
+        {'name': 'search', 'suite': 'search', 'query': 'Shirts', 'interval': 300},
+    ],
+}
+
+
+def check_steps(check):
+    """
+    (suite, [[step, args]]) that a check runs
+
+    'search' runs test_search_functionality on the navbar suite; 'login' types
+    the OTP when one is given, otherwise it stops at the OTP screen.
+    """
+    from suites import suite_steps, with_load_step
+
+    suite = check['suite']
+    if suite == 'search':
+        return 'navbar', [['test_search_functionality', [check.get('query', 'Shirts')]]]
+    if suite == 'login':
+        steps = [['test_login_with_number', [check['number']]]]
+        if check.get('otp'):
+            steps += [['test_otp_entry', [check['otp'], 0, True]], ['check_login_success', []]]
+        return 'login', steps
+    # Shared-browser steps only work after the step that loads the page
+    steps, _ = with_load_step(suite, check.get('steps') or suite_steps(suite))
+    return suite, [[step, ['Shirts'] if step == 'test_search_functionality' else []] for step in steps]
+
+
+def browsers_needed(suite, steps):
+    """
+    Browsers a check holds at its peak
+
+    Navbar steps 1-6 keep the main browser open while steps 7-14 each open
+    (and release) one more, so a check mixing both needs two.
+    """
+    from suites import SUITES
+
+    names = {step for step, _ in steps}
+    uses_main = bool(names & set(SUITES[suite]['main_steps']))
+    uses_fresh = bool(names & set(SUITES[suite]['fresh_steps']))
+    return 2 if uses_main and uses_fresh else 1
+
+
+def load_schedule(path=None):
+    """Read and validate a schedule file (the built-in schedule without a path)"""
+    if path is None:
+        schedule = json.loads(json.dumps(DEFAULT_SCHEDULE))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            schedule = json.load(f)
+
+    names = set()
+    for check in schedule.get('checks', []):
+        name = check.get('name') or check.get('suite')
+        check['name'] = name
+        if name in names:
+            raise ValueError(f"Duplicate check name '{name}'")
+        names.add(name)
+        if check.get('suite') not in ('navbar', 'search', 'login'):
+            raise ValueError(f"Check '{name}': suite must be navbar, search or login")
+        if check['suite'] == 'login' and not check.get('number'):
+            raise ValueError(f"Check '{name}': the login suite needs a number")
+        if not check.get('interval') or check['interval'] <= 0:
+            raise ValueError(f"Check '{name}': interval must be a positive number of seconds")
+        if check.setdefault('overlap', 'skip') not in OVERLAP_MODES:
+            raise ValueError(f"Check '{name}': overlap must be skip or queue")
+        check.setdefault('jitter', DEFAULT_JITTER)
+    if not names:
+        raise ValueError("The schedule has no checks")
+    schedule.setdefault('browser_limit', 2)
+    return schedule
+
+
+class BrowserSlots:
+    """Counting limit on running browsers; a run takes all the browsers it needs at once"""
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, count, stop=None):
+        """Wait for count free browsers; returns False if stop is set first"""
+        count = min(count, self.limit)
+        with self._condition:
+            while self.in_use + count > self.limit:
+                if stop is not None and stop.is_set():
+                    return False
+                self._condition.wait(timeout=1)
+            self.in_use += count
+        return True
+
+    def release(self, count):
+        count = min(count, self.limit)
+        with self._condition:
+            self.in_use -= count
+            self._condition.notify_all()
+
+
+class Scheduler:
+    def __init__(self, schedule, hooks=None, metrics=None, log_path=None, seed=None):
+        """
+        Args:
+            schedule (dict): Validated schedule (see load_schedule)
+            hooks (list): StepHook instances passed to every tester
+            metrics (StepMetrics): Records the outcome of every run
+            log_path (str): JSON-lines file of finished runs
+            seed (int): Seed for the jitter (tests)
+        """
+        self.checks = schedule['checks']
+        self.slots = BrowserSlots(schedule['browser_limit'])
+        self.hooks = hooks or []
+        self.metrics = metrics
+        self.log_path = log_path or 'test_reports/scheduler_runs.jsonl'
+        self._random = random.Random(seed)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Pooled browsers keep their tester configuration, so each suite has its own pool
+        self._pools = {}
+        self._room_lock = threading.Lock()
+        # check name -> {'next', 'running', 'queued', 'runs', 'skipped', 'passed'}
+        self.state = {}
+        self._threads = []
+
+    def _pool(self, suite):
+        with self._lock:
+            if suite not in self._pools:
+                self._pools[suite] = DriverPool(max_idle=self.slots.limit)
+            return self._pools[suite]
+
+    def _make_room(self, suite, needed):
+        """
+        Quit idle pooled browsers so running plus idle browsers stay within the limit
+
+        Called after the run's browsers were acquired. The run reuses up to needed
+        idle browsers of its own pool, so other pools are trimmed first.
+        """
+        with self._room_lock:
+            with self._lock:
+                pools = dict(self._pools)
+            own = pools.pop(suite, None)
+            own_spare = max(0, own.idle_count() - needed) if own else 0
+            excess = (self.slots.in_use + own_spare
+                      + sum(pool.idle_count() for pool in pools.values()) - self.slots.limit)
+            for pool in pools.values():
+                if excess <= 0:
+                    return
+                excess -= pool.trim(excess)
+            if excess > 0 and own:
+                own.trim(min(excess, own_spare))
+
+    def _next_time(self, check, after):
+        spread = check['interval'] * check['jitter']
+        return after + check['interval'] + self._random.uniform(-spread, spread)
+
+    def _log(self, record):
+        os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+        with self._lock, open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def run_check(self, check):
+        """Run one check now (waiting for browsers) and return its record"""
+        from distributed import make_job, run_job
+
+        suite, steps = check_steps(check)
+        needed = browsers_needed(suite, steps)
+        queued_at = time.time()
+        if not self.slots.acquire(needed, self._stop):
+            return None
+        started = time.time()
+        try:
+            self._make_room(suite, min(needed, self.slots.limit))
+            job = make_job(suite, steps, check.get('url'), options={
+                'driver_pool': self._pool(suite),
+                'hooks': self.hooks,
+                'html_report': False,
+            }, label=check['name'])
+            try:
+                results = run_job(job)
+            except Exception as e:
+                results = [{'step': check['name'], 'status': 'FAILED', 'message': f'Could not run: {str(e)}',
+                            'duration': '0.00s'}]
+        finally:
+            self.slots.release(needed)
+
+        duration = time.time() - started
+        passed = bool(results) and all(result['status'] in PASSING_STATUSES for result in results)
+        record = {
+            'check': check['name'],
+            'suite': suite,
+            'passed': passed,
+            'started': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+            'waited_for_browsers': round(started - queued_at, 2),
+            'duration': round(duration, 2),
+            'steps': [{key: result.get(key) for key in ('step', 'status', 'message', 'duration')}
+                      for result in results],
+        }
+        self._log(record)
+        if self.metrics:
+            self.metrics.record_run(suite, passed, duration, check=check['name'])
+        failed = [result['step'] for result in results if result['status'] not in PASSING_STATUSES]
+        print(f"[SCHEDULER] {check['name']}: {'PASSED' if passed else 'FAILED'} in {duration:.1f}s"
+              + (f" (failed: {', '.join(failed)})" if failed else ''))
+        return record
+
+    def _worker(self, check):
+        state = self.state[check['name']]
+        while True:
+            record = self.run_check(check)
+            with self._lock:
+                if record is not None:
+                    state['runs'] += 1
+                    state['passed'] = record['passed']
+                if state['queued'] and not self._stop.is_set():
+                    # An overlapping start was queued; run it right away
+                    state['queued'] = False
+                    continue
+                state['running'] = False
+                return
+
+    def _start(self, check):
+        state = self.state[check['name']]
+        with self._lock:
+            if state['running']:
+                if check['overlap'] == 'queue' and not state['queued']:
+                    state['queued'] = True
+                    print(f"[SCHEDULER] {check['name']} is still running; queued the next run")
+                else:
+                    state['skipped'] += 1
+                    print(f"[SCHEDULER] {check['name']} is still running; skipped this run")
+                return
+            state['running'] = True
+        thread = threading.Thread(target=self._worker, args=(check,), name=f"check-{check['name']}")
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+
+    def run(self, once=False):
+        """
+        Run the checks until stop() (or Ctrl+C)
+
+        Args:
+            once (bool): Start every check once, wait for them and return
+        """
+        now = time.time()
+        for check in self.checks:
+            # First runs are spread over the first jitter window instead of all starting now
+            self.state[check['name']] = {
+                'next': now + self._random.uniform(0, check['interval'] * check['jitter']),
+                'running': False,
+                'queued': False,
+                'runs': 0,
+                'skipped': 0,
+                'passed': None,
+            }
+
+        print("=" * 60)
+        print("STARTING SCHEDULER")
+        for check in self.checks:
+            suite, steps = check_steps(check)
+            print(f"  {check['name']:<12} every {check['interval']}s ±{check['jitter']:.0%}, "
+                  f"{len(steps)} step(s), {browsers_needed(suite, steps)} browser(s), overlap: {check['overlap']}")
+        print(f"Browser limit: {self.slots.limit}; run log: {self.log_path}")
+        print("=" * 60)
+
+        try:
+            if once:
+                for check in self.checks:
+                    self._start(check)
+            else:
+                while not self._stop.is_set():
+                    now = time.time()
+                    for check in self.checks:
+                        state = self.state[check['name']]
+                        if now >= state['next']:
+                            # Schedule from the planned time, so a late start does not shift later runs
+                            state['next'] = max(self._next_time(check, state['next']), now)
+                            self._start(check)
+                    next_due = min(state['next'] for state in self.state.values())
+                    self._stop.wait(max(0.0, min(next_due - time.time(), 60)))
+        except KeyboardInterrupt:
+            print("\n[SCHEDULER] Stopping; waiting for running checks")
+        finally:
+            if not once:
+                self._stop.set()
+            for thread in self._threads:
+                thread.join()
+            self.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        """Quit the warm browsers of every pool"""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run Soul Store checks on a schedule')
+    parser.add_argument('--config', help='Schedule JSON file (default: navbar every 15 min, search every 5 min)')
+    parser.add_argument('--browser-limit', type=int, help='Override the schedule\'s browser_limit')
+    parser.add_argument('--once', action='store_true', help='Run every check once and exit')
+    parser.add_argument('--log', help='JSON-lines run log (default: test_reports/scheduler_runs.jsonl)')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-textfile', help='Rewrite Prometheus metrics to this file after every run')
+    parser.add_argument('--live-port', type=int, help='Stream step progress to http://127.0.0.1:PORT/')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip structural steps whose DOM fingerprint matches the last passing run')
+    parser.add_argument('--shared-cache', action='store_true',
+                        help='Give browsers a shared, size-bounded disk cache instead of an empty profile')
+    args = parser.parse_args(argv)
+
+    try:
+        schedule = load_schedule(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.browser_limit:
+        schedule['browser_limit'] = args.browser_limit
+
+    hooks = []
+    if args.incremental:
+        from dom_fingerprint import DomFingerprints
+        hooks.append(DomFingerprints())
+    if args.shared_cache:
+        from browser_cache import SharedBrowserCache
+        # Idle pooled browsers keep their slot; running and idle browsers together stay within browser_limit
+        hooks.append(SharedBrowserCache(slots=schedule['browser_limit']))
+    metrics = metrics_server = progress_server = None
+    if args.metrics_port is not None or args.metrics_textfile:
+        from metrics_exporter import StepMetrics, MetricsServer
+        metrics = StepMetrics(textfile=args.metrics_textfile)
+        hooks.append(metrics)
+        if args.metrics_port is not None:
+            metrics_server = MetricsServer(metrics, args.metrics_port)
+            metrics_server.start()
+    if args.live_port is not None:
+        from live_progress import ProgressServer
+        progress_server = ProgressServer(args.live_port)
+        progress_server.start()
+        hooks.append(progress_server.hook())
+
+    scheduler = Scheduler(schedule, hooks=hooks, metrics=metrics, log_path=args.log)
+    try:
+        scheduler.run(once=args.once)
+    finally:
+        if metrics_server:
+            metrics_server.stop()
+        if progress_server:
+            progress_server.stop()
+    if args.once:
+        return 0 if all(state['passed'] for state in scheduler.state.values()) else 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
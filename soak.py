@@ -0,0 +1,296 @@
+"""
+Endurance (soak) mode
+Runs the navbar or login flow in a loop for hours as a synthetic monitor.
+Browsers come from a DriverPool, so they are reused up to a lifetime and
+recycled when their memory grows too much. Every iteration is appended to a
+JSON-lines log as it finishes. The final report shows each step's latency drift
+(first vs last iterations, least-squares slope) and browser memory slope.
+
+Usage:
+    python soak.py --suite navbar --hours 4 --interval 60
+    python soak.py --suite login --iterations 200 --number 9999999999 --otp 123456
+    python soak.py --hours 4 --live-port 8765
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from html import escape
+
+from driver_pool import DriverPool
+from failure_triage import FailureClusters, FailureTriage
+from step_runner import StepHook, PASSING_STATUSES
+
+
+def _seconds(duration):
+    """Parse a step duration string such as '1.23s'"""
+    try:
+        return float(str(duration).rstrip('s'))
+    except ValueError:
+        return None
+
+
+def linear_slope(points):
+    """Least-squares slope of [(x, y)] points, or None with fewer than 3 points"""
+    if len(points) < 3:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def latency_drift(samples, window=0.2):
+    """
+    Summarize how a step's duration moved over the run
+
+    Args:
+        samples (list): [(elapsed_seconds, duration_seconds)] in run order
+        window (float): Fraction of iterations compared at the start and end
+
+    Returns:
+        dict: count, mean, p95, first/last window means, drift percent and slope (s/hour)
+    """
+    durations = [duration for _, duration in samples]
+    size = max(1, int(len(samples) * window))
+    first = statistics.fmean(durations[:size])
+    last = statistics.fmean(durations[-size:])
+    slope = linear_slope(samples)
+    return {
+        'count': len(samples),
+        'mean': statistics.fmean(durations),
+        'p95': _percentile(durations, 0.95),
+        'first': first,
+        'last': last,
+        'drift_pct': (last - first) * 100 / first if first else 0.0,
+        'slope_per_hour': slope * 3600 if slope is not None else None,
+    }
+
+
+def memory_slopes(memory_samples):
+    """Memory slope in MB/hour for every browser lifetime with at least 3 samples"""
+    by_lifetime = {}
+    for sampled_at, lifetime, rss in memory_samples:
+        by_lifetime.setdefault(lifetime, []).append((sampled_at, rss))
+    slopes = {}
+    for lifetime, points in by_lifetime.items():
+        slope = linear_slope(points)
+        if slope is not None:
+            slopes[lifetime] = slope * 3600
+    return slopes
+
+
+class SoakSummary(StepHook):
+    """Adds the drift and memory tables to the report tester of a soak run"""
+
+    def __init__(self, drift, slopes, pool_stats, iterations):
+        self.drift = drift
+        self.slopes = slopes
+        self.pool_stats = pool_stats
+        self.iterations = iterations
+
+    def report_section(self, tester):
+        rows = ''.join(f'''
+                <tr>
+                    <td>{escape(step)}</td>
+                    <td>{stats['count']}</td>
+                    <td>{stats['mean']:.2f}</td>
+                    <td>{stats['p95']:.2f}</td>
+                    <td>{stats['first']:.2f}</td>
+                    <td>{stats['last']:.2f}</td>
+                    <td>{stats['drift_pct']:+.1f}%</td>
+                    <td>{'-' if stats['slope_per_hour'] is None else f"{stats['slope_per_hour']:+.2f}"}</td>
+                </tr>''' for step, stats in self.drift.items())
+
+        recycled = ', '.join(f"{reason}: {count}" for reason, count in sorted(self.pool_stats['recycled'].items()))
+        memory = 'not measured (needs psutil and 3+ releases of one browser)'
+        if self.slopes:
+            memory = (f"median {statistics.median(self.slopes.values()):+.1f} MB/hour, "
+                      f"max {max(self.slopes.values()):+.1f} MB/hour over {len(self.slopes)} browser lifetime(s)")
+        return ('⏱ Soak Summary', f'''
+            <p class="report-note">{self.iterations} iteration(s); browsers started {self.pool_stats['created']}, reused {self.pool_stats['reused']}, recycled {escape(recycled or 'never')}</p>
+            <p class="report-note">Browser memory slope: {memory}</p>
+            <table class="report-table">
+                <tr><th>Step</th><th>Runs</th><th>Mean (s)</th><th>p95 (s)</th><th>First 20% (s)</th><th>Last 20% (s)</th><th>Drift</th><th>Slope (s/hour)</th></tr>{rows}
+            </table>''')
+
+
+def run_soak(suite='navbar', website_url=None, hours=None, iterations=None, interval=0.0,
+             pool=None, number=None, otp=None, log_path=None, hooks=None):
+    """
+    Loop a suite until the time or iteration budget is used up (or Ctrl+C)
+
+    Args:
+        suite (str): 'navbar' or 'login'
+        website_url (str): URL to test (default: the suite URL)
+        hours (float): Stop after this many hours
+        iterations (int): Stop after this many iterations
+        interval (float): Seconds between iteration starts
+        pool (DriverPool): Browser pool (default: DriverPool())
+        number (str): Login number (login suite)
+        otp (str): Login OTP (login suite)
+        log_path (str): JSON-lines file for per-iteration results
+        hooks (list): StepHook instances for the looping tester (e.g. live progress)
+
+    Returns:
+        tuple: (overall_result: bool, report_filename: str)
+    """
+    from suites import SUITES, load_suite_class
+
+    if hours is None and iterations is None:
+        raise ValueError("Give hours and/or iterations for a soak run")
+
+    tester_cls = load_suite_class(suite)
+    website_url = website_url or SUITES[suite]['url']
+    pool = pool or DriverPool()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_path = log_path or f"test_reports/soak_{suite}_{timestamp}.jsonl"
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+
+    tester = tester_cls(website_url, driver_pool=pool, hooks=hooks, html_report=False)
+    start_time = time.time()
+    deadline = start_time + hours * 3600 if hours is not None else None
+    step_samples = {}
+    step_failures = {}
+    # Failure messages are clustered as they arrive instead of being kept per iteration
+    failure_clusters = FailureClusters()
+    iteration = 0
+
+    print("=" * 60)
+    print(f"STARTING SOAK RUN ({suite})")
+    print(f"Budget: {f'{hours}h ' if hours is not None else ''}{f'{iterations} iterations' if iterations else ''}")
+    print("=" * 60)
+
+    try:
+        while (iterations is None or iteration < iterations) and (deadline is None or time.time() < deadline):
+            iteration += 1
+            iteration_start = time.time()
+            tester.test_results = []
+            try:
+                if suite == 'login':
+                    passed = tester.run_complete_login_test(number=number, otp=otp, type_otp=True)
+                else:
+                    passed = tester.run_complete_navbar_test()
+            except Exception as e:
+                print(f"[ERROR] Soak iteration {iteration} failed to run: {str(e)}")
+                passed = False
+            finally:
+                tester.close()
+
+            elapsed = iteration_start - start_time
+            steps = {}
+            for result in tester.test_results:
+                seconds = _seconds(result.get('duration'))
+                if seconds is None:
+                    continue
+                steps[result['step']] = seconds
+                step_samples.setdefault(result['step'], []).append((elapsed, seconds))
+                if result['status'] not in PASSING_STATUSES:
+                    step_failures[result['step']] = step_failures.get(result['step'], 0) + 1
+                    failure_clusters.add(result)
+
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'iteration': iteration,
+                    'started': datetime.fromtimestamp(iteration_start).isoformat(timespec='seconds'),
+                    'passed': bool(passed),
+                    'duration': round(time.time() - iteration_start, 2),
+                    'steps': steps,
+                    'rss_mb': round(pool.memory_samples[-1][2], 1) if pool.memory_samples else None,
+                }) + '\n')
+            print(f"[SOAK] Iteration {iteration}: {'PASSED' if passed else 'FAILED'} "
+                  f"in {time.time() - iteration_start:.1f}s")
+
+            pause = interval - (time.time() - iteration_start)
+            if pause > 0 and (deadline is None or time.time() + pause < deadline):
+                time.sleep(pause)
+    except KeyboardInterrupt:
+        print("\n[SOAK] Interrupted; writing the report for the completed iterations")
+    finally:
+        pool.close()
+
+    drift = {step: latency_drift(samples) for step, samples in step_samples.items()}
+    slopes = memory_slopes(pool.memory_samples)
+
+    # The report tester never starts a browser; it renders one row per step
+    report_tester = tester_cls(website_url, hooks=[SoakSummary(drift, slopes, pool.stats, iteration),
+                                                    FailureTriage(failure_clusters)])
+    report_tester.start_time = start_time
+    report_tester.end_time = time.time()
+    for step, stats in drift.items():
+        failures = step_failures.get(step, 0)
+        report_tester.test_results.append({
+            'step': step,
+            'status': 'FAILED' if failures else 'PASSED',
+            'message': (f"{stats['count'] - failures}/{stats['count']} runs passed; "
+                        f"mean {stats['mean']:.2f}s, drift {stats['drift_pct']:+.1f}%"),
+            'duration': f"{stats['mean']:.2f}s",
+            'details': [
+                ('p95', f"{stats['p95']:.2f}s"),
+                ('First vs last 20%', f"{stats['first']:.2f}s -> {stats['last']:.2f}s"),
+            ],
+        })
+
+    overall_result = bool(report_tester.test_results) and all(
+        result['status'] in PASSING_STATUSES for result in report_tester.test_results)
+    print("=" * 60)
+    print(f"SOAK RESULT: {'PASSED' if overall_result else 'FAILED'} after {iteration} iteration(s)")
+    if slopes:
+        print(f"Browser memory slope: max {max(slopes.values()):+.1f} MB/hour")
+    print(f"Iteration log: {log_path}")
+    print("=" * 60)
+
+    report_filename = report_tester.generate_html_report(overall_result)
+    return overall_result, report_filename
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Loop a Soul Store suite as a synthetic monitor')
+    parser.add_argument('--suite', choices=['navbar', 'login'], default='navbar')
+    parser.add_argument('--url', help='Website URL (default: the suite URL)')
+    parser.add_argument('--hours', type=float, help='Stop after this many hours')
+    parser.add_argument('--iterations', type=int, help='Stop after this many iterations')
+    parser.add_argument('--interval', type=float, default=0.0, help='Seconds between iteration starts')
+    parser.add_argument('--max-uses', type=int, default=25, help='Recycle a browser after this many uses')
+    parser.add_argument('--max-age', type=float, default=1800, help='Recycle a browser after this many seconds')
+    parser.add_argument('--rss-growth-mb', type=float, default=300, help='Recycle a browser after this much memory growth')
+    parser.add_argument('--number', help='Login number (login suite)')
+    parser.add_argument('--otp', help='Login OTP (login suite)')
+    parser.add_argument('--live-port', type=int, help='Stream step progress to http://127.0.0.1:PORT/')
+    args = parser.parse_args(argv)
+
+    if args.hours is None and args.iterations is None:
+        parser.error('give --hours and/or --iterations')
+    if args.suite == 'login' and not (args.number and args.otp):
+        parser.error('the login suite needs --number and --otp')
+
+    pool = DriverPool(max_uses=args.max_uses, max_age=args.max_age, rss_growth_mb=args.rss_growth_mb)
+    hooks = []
+    progress_server = None
+    if args.live_port is not None:
+        from live_progress import ProgressServer
+        progress_server = ProgressServer(args.live_port)
+        progress_server.start()
+        hooks.append(progress_server.hook())
+    try:
+        overall_result, _ = run_soak(args.suite, args.url, hours=args.hours, iterations=args.iterations,
+                                     interval=args.interval, pool=pool, number=args.number, otp=args.otp,
+                                     hooks=hooks)
+    finally:
+        if progress_server:
+            progress_server.stop()
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
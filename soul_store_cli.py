@@ -0,0 +1,432 @@
+"""
+Command-line runner for the Soul Store suites
+Selects suites and steps, repeats them, runs independent steps concurrently
+and writes HTML, JSON and/or JUnit XML results. Selenium and the tester
+modules are only imported when steps actually run, so --list and --dry-run
+return immediately.
+
+Usage:
+    python soul_store_cli.py --list
+    python soul_store_cli.py navbar
+    python soul_store_cli.py navbar --steps test_men_navigation,test_search_functionality --repeat 5 --concurrency 3
+    python soul_store_cli.py navbar --steps 1-6 --profile mobile --format html,junit
+    python soul_store_cli.py navbar --incremental
+    python soul_store_cli.py navbar --repeat 5 --concurrency 2 --shared-cache
+    python soul_store_cli.py navbar --repeat 3 --format html,otlp
+    python soul_store_cli.py login --number 9999999999 --otp 123456 --wait-before-otp 20
+    python soul_store_cli.py navbar login --number 9999999999 --otp 123456 --dry-run
+    python soul_store_cli.py navbar --repeat 50 --concurrency 3 --live-port 8765
+    python soul_store_cli.py navbar --collect resources --metrics-textfile test_reports/soulstore.prom
+    python soul_store_cli.py navbar --budgets --profile-harness
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from step_runner import StepHook
+from suites import SUITES, suite_steps, with_load_step
+
+
+FORMATS = ('html', 'json', 'junit', 'otlp')
+COLLECTORS = ('console', 'network', 'resources')
+
+
+def parse_step_selection(suite_name, selection):
+    """
+    Resolve a --steps value to step names in run order
+
+    Accepts step names (with or without the test_ prefix), 1-based step
+    numbers and ranges such as 1-6, separated by commas.
+
+    Raises:
+        ValueError: Unknown step, number outside 1..len(steps), reversed or
+            malformed range, or a selection that names no step
+    """
+    steps = suite_steps(suite_name)
+    if selection is None:
+        return steps
+
+    chosen = set()
+    for token in selection.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        if '-' in token and token.replace('-', '').isdigit():
+            parts = token.split('-')
+            if len(parts) != 2 or not all(parts):
+                raise ValueError(f"Invalid step range '{token}'")
+            first, last = int(parts[0]), int(parts[1])
+            if first > last:
+                raise ValueError(f"Step range '{token}' is reversed (did you mean {last}-{first}?)")
+            for number in (first, last):
+                if not 1 <= number <= len(steps):
+                    raise ValueError(f"Step {number} is out of range for suite '{suite_name}' (1-{len(steps)})")
+            numbers = range(first, last + 1)
+        elif token.isdigit():
+            numbers = [int(token)]
+        else:
+            name = token if token in steps else f"test_{token}"
+            if name not in steps:
+                raise ValueError(f"Unknown step '{token}' in suite '{suite_name}'")
+            chosen.add(name)
+            continue
+        for number in numbers:
+            if not 1 <= number <= len(steps):
+                raise ValueError(f"Step {number} is out of range for suite '{suite_name}' (1-{len(steps)})")
+            chosen.add(steps[number - 1])
+    if not chosen:
+        raise ValueError(f"No steps selected by '{selection}'")
+    return [step for step in steps if step in chosen]
+
+
+def step_args(suite_name, step, args):
+    """Arguments passed to a step, taken from the command line"""
+    if suite_name == 'navbar' and step == 'test_search_functionality':
+        return [args.search_query]
+    if step == 'test_login_with_number':
+        return [args.number]
+    if step == 'test_otp_entry':
+        # A given OTP is typed; without one the step waits for manual entry
+        return [args.otp, args.wait_before_otp, bool(args.otp)]
+    return []
+
+
+def build_jobs(suite_name, steps, args):
+    """
+    One job for the selected shared-browser steps, one job per fresh-browser step
+
+    Returns:
+        list: Job dicts (see distributed.make_job) for every repetition
+    """
+    from distributed import make_job
+
+    suite = SUITES[suite_name]
+    main_steps = [step for step in steps if step in suite['main_steps']]
+    fresh_steps = [step for step in steps if step in suite['fresh_steps']]
+    options = {'device_profile': args.profile} if args.profile else {}
+
+    jobs = []
+    for run in range(1, args.repeat + 1):
+        run_jobs = []
+        if main_steps:
+            run_jobs.append(make_job(suite_name, [[step, step_args(suite_name, step, args)] for step in main_steps],
+                                     args.url, options=options, label=f"{suite_name}: main browser steps"))
+        for step in fresh_steps:
+            run_jobs.append(make_job(suite_name, [[step, step_args(suite_name, step, args)]],
+                                     args.url, options=options, label=f"{suite_name}: {step}"))
+        for job in run_jobs:
+            job['run'] = run
+        jobs.extend(run_jobs)
+    return jobs
+
+
+class _JobTesters(StepHook):
+    """Keeps the testers of a suite's jobs, so the combined report can show the report hooks' data"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.testers = []
+
+    def before_step(self, tester, step_name):
+        with self._lock:
+            if not any(known is tester for known in self.testers):
+                self.testers.append(tester)
+
+    def take(self):
+        """Return the testers seen so far and start over (one suite at a time)"""
+        with self._lock:
+            testers, self.testers = self.testers, []
+        return testers
+
+
+def _make_hooks(names):
+    hooks = []
+    if 'console' in names:
+        from console_errors import ConsoleErrorCollector
+        hooks.append(ConsoleErrorCollector())
+    if 'network' in names:
+        from network_interception import NetworkInterceptor
+        hooks.append(NetworkInterceptor())
+    if 'resources' in names:
+        from resource_monitor import ResourceMonitor
+        hooks.append(ResourceMonitor())
+    return hooks
+
+
+def run_jobs(jobs, concurrency, retries, hooks):
+    """Run jobs in this process (concurrency browsers at a time); results keep the job order"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from distributed import run_job
+    from step_runner import RetryPolicy
+
+    def run_one(job):
+        job = dict(job, options=dict(job['options'], hooks=hooks,
+                                     retry_policy=RetryPolicy(max_attempts=retries + 1)))
+        print(f"\n[RUN] {job['label']} (run {job['run']})")
+        try:
+            results = run_job(job)
+        except Exception as e:
+            print(f"[ERROR] {job['label']} failed to run: {str(e)}")
+            results = [{
+                'step': job['label'],
+                'status': 'FAILED',
+                'message': f'Could not run job: {str(e)}',
+                'duration': '0.00s',
+            }]
+        for result in results:
+            result['run'] = job['run']
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return [result for results in executor.map(run_one, jobs) for result in results]
+
+
+def write_json(path, suite_name, results, overall_result, start_time, end_time):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'suite': suite_name,
+            'passed': overall_result,
+            'started': datetime.fromtimestamp(start_time).isoformat(timespec='seconds'),
+            'duration': round(end_time - start_time, 2),
+            # Tuples (details) become lists; anything else non-JSON becomes a string
+            'results': results,
+        }, f, indent=2, default=str)
+
+
+def write_junit(path, suite_name, results, start_time, end_time):
+    import xml.etree.ElementTree as ET
+
+    from step_runner import PASSING_STATUSES
+
+    failures = sum(1 for result in results if result['status'] not in PASSING_STATUSES)
+    testsuite = ET.Element('testsuite', {
+        'name': suite_name,
+        'tests': str(len(results)),
+        'failures': str(failures),
+        'skipped': str(sum(1 for result in results if result['status'] == 'SKIPPED')),
+        'timestamp': datetime.fromtimestamp(start_time).isoformat(timespec='seconds'),
+        'time': f"{end_time - start_time:.2f}",
+    })
+    for result in results:
+        testcase = ET.SubElement(testsuite, 'testcase', {
+            'classname': f"{suite_name}.run{result.get('run', 1)}",
+            'name': result['step'],
+            'time': str(result['duration']).rstrip('s'),
+        })
+        if result['status'] not in PASSING_STATUSES:
+            ET.SubElement(testcase, 'failure', {'message': result['message']}).text = result['message']
+        elif result['status'] == 'SKIPPED':
+            ET.SubElement(testcase, 'skipped', {'message': result['message']})
+        elif result['status'] != 'PASSED':
+            ET.SubElement(testcase, 'system-out').text = f"{result['status']}: {result['message']}"
+    ET.ElementTree(testsuite).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def write_outputs(suite_name, url, results, formats, start_time, repeat, trace_exporter=None,
+                  report_hooks=(), job_testers=()):
+    """
+    Write the selected output formats for one suite and return the overall result
+
+    Args:
+        report_hooks (list): Hooks (collectors, performance gate, harness profiler) whose data
+            and report sections are combined across job_testers into the HTML report
+        job_testers (list): Testers that ran the suite's jobs
+    """
+    from step_runner import PASSING_STATUSES
+
+    end_time = time.time()
+    overall_result = bool(results) and all(result['status'] in PASSING_STATUSES for result in results)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs('test_reports', exist_ok=True)
+
+    if repeat > 1:
+        for result in results:
+            result.setdefault('group', f"Run {result['run']}")
+
+    if 'html' in formats:
+        from suites import load_suite_class
+
+        # Report-only tester: the driver is created lazily, so no browser starts here
+        report_tester = load_suite_class(suite_name)(url, hooks=list(report_hooks))
+        for hook in report_hooks:
+            if hasattr(hook, 'combine'):
+                hook.combine(report_tester, job_testers)
+        report_tester.start_time = start_time
+        report_tester.end_time = end_time
+        report_tester.test_results = results
+        report_tester.generate_html_report(overall_result)
+    if 'json' in formats:
+        path = f"test_reports/{suite_name}_results_{timestamp}.json"
+        write_json(path, suite_name, results, overall_result, start_time, end_time)
+        print(f"[REPORT] JSON results written: {path}")
+    if 'junit' in formats:
+        path = f"test_reports/{suite_name}_junit_{timestamp}.xml"
+        write_junit(path, suite_name, results, start_time, end_time)
+        print(f"[REPORT] JUnit XML written: {path}")
+    if 'otlp' in formats and trace_exporter:
+        path = f"test_reports/{suite_name}_trace_{timestamp}.json"
+        count = trace_exporter.write(path)
+        print(f"[REPORT] OTLP trace written ({count} spans): {path}")
+    return overall_result
+
+
+def list_suites():
+    for suite_name, suite in SUITES.items():
+        print(f"{suite_name} ({suite['class']}, {suite['url']})")
+        for number, step in enumerate(suite_steps(suite_name), 1):
+            kind = 'shared browser' if step in suite['main_steps'] else 'own browser'
+            print(f"  {number:>2}. {step:<32} [{kind}]")
+
+
+def main(argv=None):
+    from viewport_matrix import DEVICE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Run Soul Store test suites')
+    parser.add_argument('suites', nargs='*', metavar='SUITE',
+                        help=f"Suites to run ({', '.join(SUITES)}; default: navbar)")
+    parser.add_argument('--list', action='store_true', help='List suites and steps, then exit')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would run without starting a browser')
+    parser.add_argument('--steps', help='Step names, numbers or ranges (e.g. 1-6,test_cart_icon); single suite only')
+    parser.add_argument('--repeat', type=int, default=1, help='Run the selected steps this many times')
+    parser.add_argument('--concurrency', type=int, default=1, help='Browsers running at the same time')
+    parser.add_argument('--retries', type=int, default=0, help='Retries per failed step')
+    parser.add_argument('--profile', choices=list(DEVICE_PROFILES), help='Device profile (navbar only)')
+    parser.add_argument('--format', default='html', help=f"Comma-separated outputs: {', '.join(FORMATS)}")
+    parser.add_argument('--collect', default='', help=f"Comma-separated collectors: {', '.join(COLLECTORS)}")
+    parser.add_argument('--live-port', type=int, help='Stream step progress to http://127.0.0.1:PORT/')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-textfile', help='Write Prometheus metrics to this file after every suite')
+    parser.add_argument('--budgets', nargs='?', const='', metavar='PATH',
+                        help='Check steps against performance budgets (default file: perf_budgets.json); '
+                             'a failed gate fails the run')
+    parser.add_argument('--profile-harness', action='store_true',
+                        help='Profile the Python side of each step (flamegraph next to the HTML report)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip structural steps whose DOM fingerprint matches the last passing run')
+    parser.add_argument('--shared-cache', action='store_true',
+                        help='Give browsers a shared, size-bounded disk cache instead of an empty profile')
+    parser.add_argument('--url', help='Website URL (default: the suite URL)')
+    parser.add_argument('--search-query', default='Shirts', help='Query for test_search_functionality')
+    parser.add_argument('--number', help='Login number (login suite)')
+    parser.add_argument('--otp', default='', help='Login OTP (login suite)')
+    parser.add_argument('--wait-before-otp', type=int, default=0, help='Seconds to wait for manual OTP entry')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        list_suites()
+        return 0
+
+    suite_names = list(dict.fromkeys(args.suites or ['navbar']))
+    for name in suite_names:
+        if name not in SUITES:
+            parser.error(f"unknown suite '{name}' (choose from {', '.join(SUITES)})")
+    formats = [name for name in args.format.split(',') if name]
+    collectors = [name for name in args.collect.split(',') if name]
+    for name in formats:
+        if name not in FORMATS:
+            parser.error(f"unknown format '{name}' (choose from {', '.join(FORMATS)})")
+    for name in collectors:
+        if name not in COLLECTORS:
+            parser.error(f"unknown collector '{name}' (choose from {', '.join(COLLECTORS)})")
+    if args.steps and len(suite_names) > 1:
+        parser.error('--steps can only be used with a single suite')
+    if args.profile and suite_names != ['navbar']:
+        parser.error('--profile is only supported by the navbar suite')
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    plan = []
+    for suite_name in suite_names:
+        try:
+            steps = parse_step_selection(suite_name, args.steps)
+        except ValueError as e:
+            parser.error(str(e))
+        steps, added = with_load_step(suite_name, steps)
+        if added:
+            print(f"[INFO] {suite_name}: added {added}, which loads the page the selected "
+                  f"shared-browser steps run on")
+        if suite_name == 'login' and 'test_login_with_number' in steps and not args.number:
+            parser.error('the login suite needs --number')
+        plan.append((suite_name, build_jobs(suite_name, steps, args)))
+
+    if args.dry_run:
+        for suite_name, jobs in plan:
+            print(f"{suite_name}: {len(jobs)} job(s), concurrency {args.concurrency}, formats {', '.join(formats)}")
+            for job in jobs:
+                steps = ', '.join(step + (f"({', '.join(map(repr, step_arguments))})" if step_arguments else '')
+                                  for step, step_arguments in job['steps'])
+                print(f"  run {job['run']}: {steps}")
+        return 0
+
+    hooks = _make_hooks(collectors)
+    performance_gate = None
+    if args.budgets is not None:
+        from perf_budget import PerformanceGate
+        performance_gate = PerformanceGate(args.budgets) if args.budgets else PerformanceGate()
+        hooks.append(performance_gate)
+    if args.profile_harness:
+        from harness_profiler import HarnessProfiler
+        hooks.append(HarnessProfiler())
+    report_hooks = list(hooks)
+    job_testers = _JobTesters()
+    if report_hooks:
+        hooks.append(job_testers)
+    if args.incremental:
+        from dom_fingerprint import DomFingerprints
+        hooks.append(DomFingerprints())
+    if args.shared_cache:
+        from browser_cache import SharedBrowserCache
+        # Steps 1-6 keep their browser while a step 7-14 browser runs next to it
+        hooks.append(SharedBrowserCache(slots=2 * max(1, args.concurrency)))
+    trace_exporter = None
+    if 'otlp' in formats:
+        from trace_export import TraceExporter
+        trace_exporter = TraceExporter()
+        hooks.append(trace_exporter)
+    progress_server = None
+    if args.live_port is not None:
+        from live_progress import ProgressServer
+        progress_server = ProgressServer(args.live_port)
+        progress_server.start()
+        hooks.append(progress_server.hook())
+    metrics = metrics_server = None
+    if args.metrics_port is not None or args.metrics_textfile:
+        from metrics_exporter import StepMetrics, MetricsServer
+        metrics = StepMetrics(textfile=args.metrics_textfile)
+        hooks.append(metrics)
+        if args.metrics_port is not None:
+            metrics_server = MetricsServer(metrics, args.metrics_port)
+            metrics_server.start()
+
+    overall_result = True
+    try:
+        for suite_name, jobs in plan:
+            start_time = time.time()
+            results = run_jobs(jobs, args.concurrency, args.retries, hooks)
+            url = args.url or SUITES[suite_name]['url']
+            testers = job_testers.take()
+            suite_result = write_outputs(suite_name, url, results, formats, start_time, args.repeat,
+                                         trace_exporter, report_hooks, testers)
+            if performance_gate and not all(performance_gate.passed(tester) for tester in testers):
+                print(f"[PERF] {suite_name}: performance gate failed")
+                suite_result = False
+            print(f"[RESULT] {suite_name}: {'PASSED' if suite_result else 'FAILED'}")
+            if metrics:
+                metrics.record_run(suite_name, suite_result, time.time() - start_time)
+            overall_result = overall_result and suite_result
+    finally:
+        if progress_server:
+            progress_server.stop()
+        if metrics_server:
+            metrics_server.stop()
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Shared step runner for NavbarTester and LoginTester
+Runs a single test_* step with retries and backoff, records the outcome in the
+flake store and keeps quarantined steps from failing the suite. Also defines
+the StepHook extension point used by the per-step collectors.
+"""
+
+import random
+import time
+
+
+# Statuses that do not fail the overall run
+PASSING_STATUSES = ('PASSED', 'QUARANTINED', 'SKIPPED')
+
+
+class StepHook:
+    """
+    Base class for objects that observe a tester's steps and browsers
+
+    Hooks are passed to a tester with hooks=[...]. Every method is optional;
+    the tester calls them at these points:
+        configure_options  - before a Chrome instance is created (ChromeOptions can be changed)
+        on_driver_launch_failed - when creating a Chrome instance raised, with the exception
+                             (undo what configure_options reserved)
+        on_driver_created  - right after a Chrome instance is created (or taken from a DriverPool)
+        on_driver_release  - right before a Chrome instance is quit (or returned to a DriverPool)
+        before_step        - before a test_* step runs (once, not per retry)
+        skip_step          - before a test_* step runs; may return (title, reason) to record
+                             the step as SKIPPED instead of running it
+        after_step         - after the step's final attempt, with its result dict
+        report_section     - while the HTML report is built; may return (title, html)
+        on_report_written  - after the HTML report is saved, with its path
+    """
+
+    def configure_options(self, tester, options):
+        pass
+
+    def on_driver_launch_failed(self, tester, error):
+        pass
+
+    def on_driver_created(self, tester, driver):
+        pass
+
+    def on_driver_release(self, tester, driver):
+        pass
+
+    def before_step(self, tester, step_name):
+        pass
+
+    def skip_step(self, tester, step_name):
+        return None
+
+    def after_step(self, tester, step_name, result):
+        pass
+
+    def report_section(self, tester):
+        return None
+
+    def on_report_written(self, tester, report_path):
+        pass
+
+
+def render_hook_sections(tester):
+    """Collect the extra report sections of a tester's hooks as HTML"""
+    html = ''
+    for hook in getattr(tester, 'hooks', None) or []:
+        try:
+            section = hook.report_section(tester)
+        except Exception as e:
+            print(f"[WARNING] {type(hook).__name__}.report_section failed: {str(e)}")
+            continue
+        if section:
+            title, body = section
+            html += f'''
+        <div class="test-details">
+            <h2>{title}</h2>{body}
+        </div>
+        '''
+    return html
+
+
+def call_hooks(tester, method, *args):
+    """Call a hook method on every hook of the tester; hook errors never fail a step"""
+    for hook in getattr(tester, 'hooks', None) or []:
+        try:
+            getattr(hook, method)(tester, *args)
+        except Exception as e:
+            print(f"[WARNING] {type(hook).__name__}.{method} failed: {str(e)}")
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, backoff=1.0, backoff_factor=2.0, max_backoff=10.0, jitter=0.25):
+        """
+        Step-level retry settings
+
+        Args:
+            max_attempts (int): Total attempts per step (1 disables retries)
+            backoff (float): Seconds to wait before the first retry
+            backoff_factor (float): Multiplier applied to the wait after every retry
+            max_backoff (float): Upper bound for a single wait
+            jitter (float): Random +/- fraction applied to each wait
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """Seconds to wait after the given (1-based) failed attempt"""
+        delay = min(self.backoff * (self.backoff_factor ** (attempt - 1)), self.max_backoff)
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+def _skip_reason(tester, step_name):
+    """The first (title, reason) a hook returns from skip_step, or None"""
+    for hook in getattr(tester, 'hooks', None) or []:
+        try:
+            skip = hook.skip_step(tester, step_name)
+        except Exception as e:
+            print(f"[WARNING] {type(hook).__name__}.skip_step failed: {str(e)}")
+            continue
+        if skip:
+            return skip
+    return None
+
+
+def _outcome_passed(outcome):
+    # check_login_success returns (success, message); every other step returns a bool
+    if isinstance(outcome, tuple):
+        return bool(outcome[0])
+    return bool(outcome)
+
+
+def _with_passed(outcome, passed):
+    if isinstance(outcome, tuple):
+        return (passed,) + tuple(outcome[1:])
+    return passed
+
+
+def run_step(tester, step_fn, *args):
+    """
+    Run one step of a tester with retries
+
+    Results appended by failed attempts are discarded so the report only shows
+    the final attempt. A step listed in the flake store's quarantine still runs,
+    but its failure is recorded as QUARANTINED and does not stop the run. A step
+    a hook skips (skip_step) does not run; it is recorded as SKIPPED and counts as passed.
+    Flakiness is recorded after the after_step hooks, from the final status.
+
+    Args:
+        tester: NavbarTester or LoginTester instance
+        step_fn (callable): Bound test_* method of the tester
+        *args: Arguments passed to the step
+
+    Returns:
+        The step's own return value (bool, or tuple for check_login_success)
+    """
+    step_name = step_fn.__name__
+    step_key = f"{type(tester).__name__}.{step_name}"
+    policy = getattr(tester, 'retry_policy', None) or RetryPolicy(max_attempts=1)
+    flake_tracker = getattr(tester, 'flake_tracker', None)
+
+    call_hooks(tester, 'before_step', step_name)
+
+    skip = _skip_reason(tester, step_name)
+    if skip:
+        title, reason = skip
+        result = {
+            'step': title,
+            'status': 'SKIPPED',
+            'message': reason,
+            'duration': '0.00s',
+            'attempts': 0,
+            'timestamp': time.time(),
+        }
+        tester.test_results.append(result)
+        call_hooks(tester, 'after_step', step_name, result)
+        return True
+
+    attempt = 0
+    while True:
+        attempt += 1
+        results_before = len(tester.test_results)
+        outcome = step_fn(*args)
+        passed = _outcome_passed(outcome)
+
+        if passed or attempt >= policy.max_attempts:
+            break
+
+        delay = policy.delay(attempt)
+        print(f"[RETRY] {step_name} failed on attempt {attempt}/{policy.max_attempts}, "
+              f"retrying in {delay:.1f}s...")
+        del tester.test_results[results_before:]
+        time.sleep(delay)
+
+    step_results = tester.test_results[results_before:]
+    result = step_results[-1] if step_results else None
+
+    if result is None:
+        # Steps are expected to record their own result; make a silent failure visible
+        result = {
+            'step': step_name,
+            'status': 'PASSED' if passed else 'FAILED',
+            'message': 'Step finished without recording a result',
+            'duration': '0.00s',
+        }
+        tester.test_results.append(result)
+
+    result['attempts'] = attempt
+    # Lets failure triage report when a failure was first and last seen
+    result.setdefault('timestamp', time.time())
+    if attempt > 1:
+        result.setdefault('details', []).append(('Attempts', f'{attempt} (retried after failure)'))
+
+    if flake_tracker and not passed and flake_tracker.is_quarantined(step_key):
+        print(f"[QUARANTINE] {step_name} failed but is quarantined; continuing")
+        result['status'] = 'QUARANTINED'
+        result.setdefault('details', []).append(('Quarantine', 'Failure ignored; step is on the quarantine list'))
+        outcome = _with_passed(outcome, True)
+
+    call_hooks(tester, 'after_step', step_name, result)
+
+    if flake_tracker:
+        # Recorded from the final status, so a hook failing the step (e.g. over budget) counts as a failure
+        final_passed = passed and result['status'] != 'FAILED'
+        score = flake_tracker.record(step_key, final_passed, attempt)
+        if attempt > 1 or score > 0:
+            result.setdefault('details', []).append(('Flakiness score', f'{score:.2f}'))
+    return outcome
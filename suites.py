@@ -0,0 +1,111 @@
+"""
+Registry of the test suites in this repository
+Lists each suite's script, tester class, default URL and steps, and loads the
+tester class on demand. The scripts' file names are not valid module names,
+so they are imported from their paths.
+"""
+
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Keep the step lists in sync with run_complete_navbar_test / run_complete_login_test
+SUITES = {
+    'navbar': {
+        'file': 'the_soul_store_navbar (1).py',
+        'module': 'the_soul_store_navbar',
+        'class': 'NavbarTester',
+        'url': 'https://www.thesouledstore.com/',
+        # Steps 1-6 share the main browser and must run in order
+        'main_steps': [
+            'test_hamburger_menu_presence',
+            'test_hamburger_menu_clickable',
+            'test_menu_opens',
+            'test_navbar_structure',
+            'test_top_navigation_menu',
+            'test_menu_item_navigation',
+        ],
+        # Steps 7-14 open their own browser and can run anywhere
+        'fresh_steps': [
+            'test_men_navigation',
+            'test_women_navigation',
+            'test_sneakers_navigation',
+            'test_brand_icon',
+            'test_search_functionality',
+            'test_login_option',
+            'test_wishlist_icon',
+            'test_cart_icon',
+        ],
+    },
+    'login': {
+        'file': 'THE_SOUL_STORE_LOGIN (1).PY',
+        'module': 'the_soul_store_login',
+        'class': 'LoginTester',
+        'url': 'https://www.thesouledstore.com/login',
+        'main_steps': [
+            'test_login_with_number',
+            'test_otp_entry',
+            'check_login_success',
+        ],
+        'fresh_steps': [],
+    },
+}
+
+
+def suite_steps(suite_name):
+    """Return every step of a suite in run order"""
+    suite = SUITES[suite_name]
+    return suite['main_steps'] + suite['fresh_steps']
+
+
+def with_load_step(suite_name, steps):
+    """
+    Add a suite's first shared-browser step when later ones are selected without it
+
+    Only the first step loads the page (navbar: the store, login: the login
+    page); the other shared-browser steps run in the browser it left open.
+
+    Returns:
+        tuple: (steps in run order, name of the added step or None)
+    """
+    suite = SUITES[suite_name]
+    load_step = suite['main_steps'][0] if suite['main_steps'] else None
+    if load_step is None or load_step in steps or not set(steps) & set(suite['main_steps']):
+        return list(steps), None
+    chosen = set(steps) | {load_step}
+    return [step for step in suite_steps(suite_name) if step in chosen], load_step
+
+
+def load_suite_module(suite_name):
+    """Import a suite script (once) and return the module"""
+    if suite_name not in SUITES:
+        raise ValueError(f"Unknown suite '{suite_name}'. Available: {', '.join(SUITES)}")
+
+    suite = SUITES[suite_name]
+    if suite['module'] in sys.modules:
+        return sys.modules[suite['module']]
+
+    # Helper modules (step_runner, viewport_matrix, ...) live next to the scripts
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    path = os.path.join(REPO_DIR, suite['file'])
+    loader = importlib.machinery.SourceFileLoader(suite['module'], path)
+    spec = importlib.util.spec_from_loader(suite['module'], loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[suite['module']] = module
+    try:
+        loader.exec_module(module)
+    except Exception:
+        del sys.modules[suite['module']]
+        raise
+    return module
+
+
+def load_suite_class(suite_name):
+    """Return the tester class (NavbarTester / LoginTester) of a suite"""
+    return getattr(load_suite_module(suite_name), SUITES[suite_name]['class'])
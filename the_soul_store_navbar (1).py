@@ -8,19 +8,97 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import sys
 import time
 from datetime import datetime
+from html import escape
+
+from step_runner import run_step, call_hooks, render_hook_sections, RetryPolicy, PASSING_STATUSES
+from perf_budget import time_until, step_metrics
+from failure_triage import compact_results, render_failure_triage, short_message
 
 
 class NavbarTester:
-    def __init__(self, website_url):
-        """Initialize the WebDriver and navigate to the website"""
+    def __init__(self, website_url, visual_baseline_dir=None, device_profile=None,
+                 retry_policy=None, flake_tracker=None, hooks=None, driver_pool=None,
+                 html_report=True):
+        """
+        Initialize the tester; the main WebDriver is started on first use
+
+        Args:
+            website_url (str): Store URL to test
+            visual_baseline_dir (str): Enables the navbar visual regression check
+                against the baselines stored in this directory (needs numpy and pillow)
+            device_profile (str): Viewport/device emulation profile from
+                viewport_matrix.DEVICE_PROFILES (default: Chrome's own window size)
+            retry_policy (RetryPolicy): Step-level retries (default: no retries)
+            flake_tracker (FlakeTracker): Flakiness store and quarantine list
+            hooks (list): StepHook instances (e.g. ConsoleErrorCollector) notified
+                about every step and browser
+            driver_pool (DriverPool): Reuse browsers from this pool instead of
+                starting a new Chrome for every step
+            html_report (bool): Write the HTML report at the end of a run
+        """
         self.website_url = website_url
-        self.driver = webdriver.Chrome()  # Make sure ChromeDriver is installed
-        self.wait = WebDriverWait(self.driver, 10)
+        self.device_profile = device_profile
+        self.retry_policy = retry_policy
+        self.flake_tracker = flake_tracker
+        self.hooks = list(hooks or [])
+        self.driver_pool = driver_pool
+        self.html_report = html_report
+        self._driver = None
+        self._wait = None
         self.test_results = []
         self.start_time = None
         self.end_time = None
+        self.visual_checker = None
+        if visual_baseline_dir:
+            from visual_regression import NavbarVisualChecker
+            self.visual_checker = NavbarVisualChecker(baseline_dir=visual_baseline_dir)
+    
+    @property
+    def driver(self):
+        """Main WebDriver shared by steps 1-6, created on first access"""
+        if self._driver is None:
+            self._driver = self._create_driver()
+        return self._driver
+    
+    @property
+    def wait(self):
+        """WebDriverWait bound to the main WebDriver"""
+        if self._wait is None:
+            self._wait = WebDriverWait(self.driver, 10)
+        return self._wait
+    
+    def _create_driver(self):
+        """Return a Chrome WebDriver (from the driver pool if one is set) and notify the hooks"""
+        if self.driver_pool:
+            driver = self.driver_pool.acquire(self._launch_driver)
+        else:
+            driver = self._launch_driver()
+        call_hooks(self, 'on_driver_created', driver)
+        return driver
+    
+    def _launch_driver(self):
+        """Start a Chrome WebDriver configured for the current device profile and hooks"""
+        options = webdriver.ChromeOptions()
+        if self.device_profile:
+            from viewport_matrix import apply_device_profile
+            apply_device_profile(options, self.device_profile)
+        call_hooks(self, 'configure_options', options)
+        try:
+            return webdriver.Chrome(options=options)  # Make sure ChromeDriver is installed
+        except Exception as e:
+            call_hooks(self, 'on_driver_launch_failed', e)
+            raise
+    
+    def _release_driver(self, driver):
+        """Let the hooks collect from a WebDriver, then return it to the pool or quit it"""
+        call_hooks(self, 'on_driver_release', driver)
+        if self.driver_pool:
+            self.driver_pool.release(driver)
+        else:
+            driver.quit()
         
     def test_hamburger_menu_presence(self):
         """
@@ -73,6 +151,48 @@ class NavbarTester:
             print(f"[ERROR] Step 1 failed: {str(e)}")
             return False
     
+    def test_navbar_visual_regression(self):
+        """
+        Visual Check: Compare the navbar and brand icon regions with stored baselines
+        """
+        step_start = time.time()
+        try:
+            print("\n[VISUAL] Comparing navbar regions with baselines...")
+            
+            region_results = self.visual_checker.check(self.driver)
+            details = []
+            for region, outcome in region_results.items():
+                print(f"  - {region}: {outcome['status']} - {outcome['message']}")
+                details.append((region, f"{outcome['status']} - {outcome['message']}"))
+            
+            passed = all(outcome['status'] == 'PASSED' for outcome in region_results.values())
+            failed_regions = [region for region, outcome in region_results.items() if outcome['status'] != 'PASSED']
+            if passed:
+                message = f"{len(region_results)} navbar region(s) match their baselines"
+            else:
+                message = f"Visual differences found in: {', '.join(failed_regions)}"
+            
+            step_duration = time.time() - step_start
+            self.test_results.append({
+                'step': 'Visual Check: Navbar Region',
+                'status': 'PASSED' if passed else 'FAILED',
+                'message': message,
+                'duration': f'{step_duration:.2f}s',
+                'details': details
+            })
+            return passed
+            
+        except Exception as e:
+            step_duration = time.time() - step_start
+            self.test_results.append({
+                'step': 'Visual Check: Navbar Region',
+                'status': 'FAILED',
+                'message': f'Error comparing navbar regions: {str(e)}',
+                'duration': f'{step_duration:.2f}s'
+            })
+            print(f"[ERROR] Visual check failed: {str(e)}")
+            return False
+    
     def test_hamburger_menu_clickable(self):
         """
         Test Step 2: Check if hamburger menu is clickable
@@ -157,6 +277,16 @@ class NavbarTester:
                             'duration': f'{step_duration:.2f}s'
                         })
                         return True
+                    
+                    print("[WARNING] Navigation menu not visible and no menu items found")
+                    step_duration = time.time() - step_start
+                    self.test_results.append({
+                        'step': 'Step 3: Menu Opens Successfully',
+                        'status': 'FAILED',
+                        'message': 'Navigation menu not visible and no menu items found',
+                        'duration': f'{step_duration:.2f}s'
+                    })
+                    return False
                 except:
                     step_duration = time.time() - step_start
                     self.test_results.append({
@@ -273,8 +403,23 @@ class NavbarTester:
                     pass
             
             # Verify expected items are present
+            # Whole-label match: 'MEN' is a substring of 'WOMEN'
             expected_items = ['MEN', 'WOMEN', 'SNEAKERS']
-            found_items = [item for item in expected_items if any(item in label for label in menu_labels)]
+            found_items = [item for item in expected_items if any(label.upper() == item for label in menu_labels)]
+            missing_items = [item for item in expected_items if item not in found_items]
+            
+            if missing_items:
+                message = (f"Missing navigation items: {', '.join(missing_items)} "
+                           f"(found: {', '.join(menu_labels) or 'none'})")
+                print(f"[ERROR] {message}")
+                step_duration = time.time() - step_start
+                self.test_results.append({
+                    'step': 'Step 5: Top Navigation Menu',
+                    'status': 'FAILED',
+                    'message': message,
+                    'duration': f'{step_duration:.2f}s'
+                })
+                return False
             
             message = f"Found {len(menu_items)} navigation items: {', '.join(menu_labels)}"
             print(f"[SUCCESS] {message}")
@@ -378,7 +523,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for Men navigation test...")
             
             # Open new browser for navigation test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -394,8 +539,8 @@ class NavbarTester:
             print("[STEP 7] Clicking Men link...")
             men_link.click()
             
-            # Wait for navigation
-            time.sleep(3)
+            # Wait for navigation (timed for the performance budget)
+            navigation_s = time_until(driver, EC.url_contains('/men'))
             
             # Check if URL changed to /men
             current_url = driver.current_url
@@ -408,9 +553,10 @@ class NavbarTester:
                     'step': 'Step 7: Men Navigation',
                     'status': 'PASSED',
                     'message': f'Successfully redirected to Men page: {current_url}',
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(navigation_s=navigation_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 print(f"[FAILED] Did not navigate to Men page. Current URL: {current_url}")
@@ -419,9 +565,10 @@ class NavbarTester:
                     'step': 'Step 7: Men Navigation',
                     'status': 'FAILED',
                     'message': f'Navigation failed. Expected /men, got: {current_url}',
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(navigation_s=navigation_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return False
                 
         except Exception as e:
@@ -434,7 +581,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 7 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -449,7 +596,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for Women navigation test...")
             
             # Open new browser for navigation test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -465,8 +612,8 @@ class NavbarTester:
             print("[STEP 8] Clicking Women link...")
             women_link.click()
             
-            # Wait for navigation
-            time.sleep(3)
+            # Wait for navigation (timed for the performance budget)
+            navigation_s = time_until(driver, EC.url_contains('/women'))
             
             # Check if URL changed to /women
             current_url = driver.current_url
@@ -479,9 +626,10 @@ class NavbarTester:
                     'step': 'Step 8: Women Navigation',
                     'status': 'PASSED',
                     'message': f'Successfully redirected to Women page: {current_url}',
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(navigation_s=navigation_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 print(f"[FAILED] Did not navigate to Women page. Current URL: {current_url}")
@@ -490,9 +638,10 @@ class NavbarTester:
                     'step': 'Step 8: Women Navigation',
                     'status': 'FAILED',
                     'message': f'Navigation failed. Expected /women, got: {current_url}',
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(navigation_s=navigation_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return False
                 
         except Exception as e:
@@ -505,7 +654,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 8 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -520,7 +669,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for Sneakers navigation test...")
             
             # Open new browser for navigation test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -536,8 +685,8 @@ class NavbarTester:
             print("[STEP 9] Clicking Sneakers link...")
             sneakers_link.click()
             
-            # Wait for navigation
-            time.sleep(3)
+            # Wait for navigation (timed for the performance budget)
+            navigation_s = time_until(driver, EC.url_contains('/sneakers'))
             
             # Check if URL changed to /sneakers
             current_url = driver.current_url
@@ -550,9 +699,10 @@ class NavbarTester:
                     'step': 'Step 9: Sneakers Navigation',
                     'status': 'PASSED',
                     'message': f'Successfully redirected to Sneakers page: {current_url}',
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(navigation_s=navigation_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 print(f"[FAILED] Did not navigate to Sneakers page. Current URL: {current_url}")
@@ -561,9 +711,10 @@ class NavbarTester:
                     'step': 'Step 9: Sneakers Navigation',
                     'status': 'FAILED',
                     'message': f'Navigation failed. Expected /sneakers, got: {current_url}',
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(navigation_s=navigation_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return False
                 
         except Exception as e:
@@ -576,7 +727,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 9 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -591,7 +742,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for brand icon test...")
             
             # Open new browser for navigation test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -653,7 +804,7 @@ class NavbarTester:
                     'message': message,
                     'duration': f'{step_duration:.2f}s'
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 print(f"[WARNING] Brand icon click may not have navigated to home")
@@ -665,7 +816,7 @@ class NavbarTester:
                     'message': message,
                     'duration': f'{step_duration:.2f}s'
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
                 
         except Exception as e:
@@ -678,7 +829,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 10 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -696,7 +847,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for search test...")
             
             # Open new browser for search test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -732,6 +883,8 @@ class NavbarTester:
             
             print(f"[SUCCESS] Search query '{search_query}' typed")
             
+            url_before_search = driver.current_url
+            
             # Find and click the search button
             print("[STEP 11] Looking for search button...")
             try:
@@ -749,9 +902,12 @@ class NavbarTester:
                 print("[INFO] Trying alternative: pressing Enter key...")
                 search_input.submit()
             
-            # Wait for search results
+            # Wait for search results (timed for the performance budget)
             print("[STEP 11] Waiting for search results...")
-            time.sleep(3)
+            time_to_results_s = time_until(
+                driver,
+                lambda d: d.current_url != url_before_search and d.find_elements(By.CSS_SELECTOR, "[class*='product']")
+            )
             
             # Check if search results are displayed
             current_url = driver.current_url
@@ -769,9 +925,10 @@ class NavbarTester:
                         'step': 'Step 11: Search Functionality',
                         'status': 'PASSED',
                         'message': message,
-                        'duration': f'{step_duration:.2f}s'
+                        'duration': f'{step_duration:.2f}s',
+                        'metrics': step_metrics(time_to_results_s=time_to_results_s)
                     })
-                    driver.quit()
+                    self._release_driver(driver)
                     return True
                 else:
                     print("[WARNING] No product results found, but search may have executed")
@@ -787,9 +944,10 @@ class NavbarTester:
                     'step': 'Step 11: Search Functionality',
                     'status': 'PASSED',
                     'message': message,
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(time_to_results_s=time_to_results_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 print(f"[WARNING] Search execution unclear, but no errors occurred")
@@ -799,9 +957,10 @@ class NavbarTester:
                     'step': 'Step 11: Search Functionality',
                     'status': 'PASSED',
                     'message': message,
-                    'duration': f'{step_duration:.2f}s'
+                    'duration': f'{step_duration:.2f}s',
+                    'metrics': step_metrics(time_to_results_s=time_to_results_s)
                 })
-                driver.quit()
+                self._release_driver(driver)
                 return True
                 
         except Exception as e:
@@ -814,7 +973,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 11 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -829,7 +988,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for login test...")
             
             # Open new browser for login test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -924,7 +1083,7 @@ class NavbarTester:
                     'duration': f'{step_duration:.2f}s'
                 })
                 print(f"[SUCCESS] {message}")
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 message = f"Login/profile icon clicked but login interface unclear. URL: {current_url}"
@@ -936,7 +1095,7 @@ class NavbarTester:
                     'duration': f'{step_duration:.2f}s'
                 })
                 print(f"[WARNING] {message}")
-                driver.quit()
+                self._release_driver(driver)
                 return True
                 
         except Exception as e:
@@ -949,7 +1108,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 12 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -964,7 +1123,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for wishlist test...")
             
             # Open new browser for wishlist test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -1070,7 +1229,7 @@ class NavbarTester:
                     'duration': f'{step_duration:.2f}s'
                 })
                 print(f"[SUCCESS] {message}")
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 message = f"Wishlist icon clicked successfully. URL: {current_url}"
@@ -1082,7 +1241,7 @@ class NavbarTester:
                     'duration': f'{step_duration:.2f}s'
                 })
                 print(f"[SUCCESS] {message}")
-                driver.quit()
+                self._release_driver(driver)
                 return True
                 
         except Exception as e:
@@ -1095,7 +1254,7 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 13 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
@@ -1110,7 +1269,7 @@ class NavbarTester:
             print("[INFO] Opening new browser instance for cart test...")
             
             # Open new browser for cart test
-            driver = webdriver.Chrome()
+            driver = self._create_driver()
             wait = WebDriverWait(driver, 10)
             
             driver.get(self.website_url)
@@ -1223,7 +1382,7 @@ class NavbarTester:
                     'duration': f'{step_duration:.2f}s'
                 })
                 print(f"[SUCCESS] {message}")
-                driver.quit()
+                self._release_driver(driver)
                 return True
             else:
                 message = f"Cart icon clicked successfully. URL: {current_url}"
@@ -1235,7 +1394,7 @@ class NavbarTester:
                     'duration': f'{step_duration:.2f}s'
                 })
                 print(f"[SUCCESS] {message}")
-                driver.quit()
+                self._release_driver(driver)
                 return True
                 
         except Exception as e:
@@ -1248,11 +1407,46 @@ class NavbarTester:
             })
             print(f"[ERROR] Step 14 failed: {str(e)}")
             try:
-                driver.quit()
+                self._release_driver(driver)
             except:
                 pass
             return False
     
+    def _render_step(self, result):
+        """Render one step result as an HTML block for the report"""
+        details = ''.join(f'''
+                    <div class="test-step-detail"><span class="test-step-detail-label">{label}:</span> {escape(str(value))}</div>'''
+            for label, value in result.get('details', []))
+        # Failures show the readable part of the error, without Selenium's stack trace
+        message = result['message'] if result['status'] == 'PASSED' else escape(short_message(result['message']))
+        return f'''
+            <div class="test-step {result['status'].lower()}">
+                <div class="test-step-header">
+                    <span class="test-step-title">{result['step']}</span>
+                    <span class="status-badge {result['status'].lower()}">{result['status']}</span>
+                </div>
+                <div class="test-step-message">{message}</div>{details}
+                <div class="test-step-duration">⏱ Duration: {result['duration']}</div>
+            </div>
+            '''
+    
+    def _render_results(self, results):
+        """Render step results, grouped by profile when results carry a 'group'"""
+        groups = {}
+        for result in results:
+            groups.setdefault(result.get('group'), []).append(result)
+        
+        if list(groups) == [None]:
+            return ''.join(self._render_step(result) for result in results)
+        
+        html = ''
+        for group, results in groups.items():
+            passed = sum(1 for result in results if result['status'] == 'PASSED')
+            html += f'''
+            <h3 class="test-group-title">{group or 'Ungrouped'} ({passed}/{len(results)} passed)</h3>'''
+            html += ''.join(self._render_step(result) for result in results)
+        return html
+    
     def generate_html_report(self, overall_result):
         """
         Generate an HTML test report
@@ -1263,6 +1457,20 @@ class NavbarTester:
         total_duration = (self.end_time or 0) - (self.start_time or 0)
         passed_tests = sum(1 for result in self.test_results if result['status'] == 'PASSED')
         failed_tests = sum(1 for result in self.test_results if result['status'] == 'FAILED')
+        quarantined_tests = sum(1 for result in self.test_results if result['status'] == 'QUARANTINED')
+        quarantined_card = f'''
+            <div class="summary-card quarantined">
+                <h3>Quarantined</h3>
+                <div class="value">{quarantined_tests}</div>
+            </div>''' if quarantined_tests else ''
+        skipped_tests = sum(1 for result in self.test_results if result['status'] == 'SKIPPED')
+        skipped_card = f'''
+            <div class="summary-card skipped">
+                <h3>Skipped (unchanged)</h3>
+                <div class="value">{skipped_tests}</div>
+            </div>''' if skipped_tests else ''
+        # Large runs list a few examples per failure signature; the rest are counted in the triage table
+        shown_results, omitted = compact_results(self.test_results)
         
         html_content = f"""
 <!DOCTYPE html>
@@ -1336,6 +1544,12 @@ class NavbarTester:
         .summary-card.failed .value {{
             color: #dc3545;
         }}
+        .summary-card.quarantined .value {{
+            color: #fd7e14;
+        }}
+        .summary-card.skipped .value {{
+            color: #6c757d;
+        }}
         .summary-card.overall {{
             grid-column: 1 / -1;
         }}
@@ -1376,6 +1590,12 @@ class NavbarTester:
         .test-step.failed {{
             border-left-color: #dc3545;
         }}
+        .test-step.quarantined {{
+            border-left-color: #fd7e14;
+        }}
+        .test-step.skipped {{
+            border-left-color: #6c757d;
+        }}
         .test-step-header {{
             display: flex;
             justify-content: space-between;
@@ -1401,6 +1621,14 @@ class NavbarTester:
             background: #dc3545;
             color: white;
         }}
+        .status-badge.quarantined {{
+            background: #fd7e14;
+            color: white;
+        }}
+        .status-badge.skipped {{
+            background: #6c757d;
+            color: white;
+        }}
         .test-step-message {{
             color: #666;
             margin-bottom: 10px;
@@ -1410,6 +1638,37 @@ class NavbarTester:
             color: #999;
             font-size: 0.9em;
         }}
+        .test-step-detail {{
+            color: #666;
+            font-size: 0.9em;
+            margin-bottom: 5px;
+        }}
+        .test-step-detail-label {{
+            font-weight: bold;
+        }}
+        .report-table {{
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 0.9em;
+        }}
+        .report-table th, .report-table td {{
+            text-align: left;
+            padding: 8px;
+            border-bottom: 1px solid #eee;
+            word-break: break-all;
+        }}
+        .report-table th {{
+            color: #666;
+            background: #f8f9fa;
+        }}
+        .report-note {{
+            color: #666;
+            margin-bottom: 15px;
+        }}
+        .test-group-title {{
+            color: #764ba2;
+            margin: 25px 0 15px;
+        }}
         .footer {{
             background: #f8f9fa;
             padding: 20px;
@@ -1461,7 +1720,7 @@ class NavbarTester:
             <div class="summary-card failed">
                 <h3>Failed Tests</h3>
                 <div class="value">{failed_tests}</div>
-            </div>
+            </div>{quarantined_card}{skipped_card}
             <div class="summary-card">
                 <h3>Total Duration</h3>
                 <div class="value">{total_duration:.2f}s</div>
@@ -1489,17 +1748,10 @@ class NavbarTester:
         
         <div class="test-details">
             <h2>📋 Test Execution Details</h2>
-            {''.join([f'''
-            <div class="test-step {result['status'].lower()}">
-                <div class="test-step-header">
-                    <span class="test-step-title">{result['step']}</span>
-                    <span class="status-badge {result['status'].lower()}">{result['status']}</span>
-                </div>
-                <div class="test-step-message">{result['message']}</div>
-                <div class="test-step-duration">⏱ Duration: {result['duration']}</div>
-            </div>
-            ''' for result in self.test_results])}
+            {self._render_results(shown_results)}
         </div>
+        {render_failure_triage(self, omitted)}
+        {render_hook_sections(self)}
         
         <div class="footer">
             <p>Generated by Selenium Navbar Test Automation</p>
@@ -1522,8 +1774,19 @@ class NavbarTester:
             f.write(html_content)
         
         print(f"\n[REPORT] HTML report generated: {report_filename}")
+        call_hooks(self, 'on_report_written', report_filename)
         return report_filename
     
+    def _run_step(self, step_fn, *args):
+        """Run a step with the configured retries and quarantine handling"""
+        return run_step(self, step_fn, *args)
+    
+    def _finish_run(self, overall_result):
+        """Record the end time and generate the HTML report (unless disabled)"""
+        self.end_time = time.time()
+        if self.html_report:
+            self.generate_html_report(overall_result)
+    
     def run_complete_navbar_test(self):
         """
         Run the complete navbar test flow
@@ -1536,118 +1799,66 @@ class NavbarTester:
         print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*60)
         
-        # Step 1: Check hamburger menu presence
-        if not self.test_hamburger_menu_presence():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            self.close()
-            return False
+        # Steps 1-6 share the main browser instance
+        main_browser_steps = [
+            (self.test_hamburger_menu_presence, ()),   # Step 1
+            (self.test_hamburger_menu_clickable, ()),  # Step 2
+            (self.test_menu_opens, ()),                # Step 3
+            (self.test_navbar_structure, ()),          # Step 4
+            (self.test_top_navigation_menu, ()),       # Step 5
+            (self.test_menu_item_navigation, ()),      # Step 6
+        ]
         
-        # Step 2: Check if menu is clickable
-        if not self.test_hamburger_menu_clickable():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            self.close()
-            return False
+        # Visual check of the navbar before the hamburger menu is opened
+        if self.visual_checker:
+            main_browser_steps.insert(1, (self.test_navbar_visual_regression, ()))
         
-        # Step 3: Check if menu opens
-        if not self.test_menu_opens():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            self.close()
-            return False
-        
-        # Step 4: Check navbar structure
-        if not self.test_navbar_structure():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            self.close()
-            return False
-        
-        # Step 5: Check top navigation menu items
-        if not self.test_top_navigation_menu():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            self.close()
-            return False
-        
-        # Step 6: Check menu item navigation
-        if not self.test_menu_item_navigation():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            self.close()
-            return False
+        for step, args in main_browser_steps:
+            if not self._run_step(step, *args):
+                self._finish_run(False)
+                self.close()
+                return False
         
         # Close main browser before navigation tests
         print("\n[INFO] Closing main browser instance...")
         self.close()
         time.sleep(2)
         
-        # Step 7: Test Men navigation
-        if not self.test_men_navigation():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        # Step 8: Test Women navigation
-        if not self.test_women_navigation():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        # Step 9: Test Sneakers navigation
-        if not self.test_sneakers_navigation():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        # Step 10: Test brand icon
-        if not self.test_brand_icon():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        # Step 11: Test search functionality
-        if not self.test_search_functionality("Shirts"):
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        # Step 12: Test login/profile icon
-        if not self.test_login_option():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
+        # Steps 7-14 each open their own browser instance
+        fresh_browser_steps = [
+            (self.test_men_navigation, ()),                  # Step 7
+            (self.test_women_navigation, ()),                # Step 8
+            (self.test_sneakers_navigation, ()),             # Step 9
+            (self.test_brand_icon, ()),                      # Step 10
+            (self.test_search_functionality, ("Shirts",)),   # Step 11
+            (self.test_login_option, ()),                    # Step 12
+            (self.test_wishlist_icon, ()),                   # Step 13
+            (self.test_cart_icon, ()),                       # Step 14
+        ]
         
-        # Step 13: Test wishlist icon
-        if not self.test_wishlist_icon():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        # Step 14: Test cart icon
-        if not self.test_cart_icon():
-            self.end_time = time.time()
-            self.generate_html_report(False)
-            return False
-        
-        self.end_time = time.time()
+        for step, args in fresh_browser_steps:
+            if not self._run_step(step, *args):
+                self._finish_run(False)
+                return False
         
-        # Overall test result
-        overall_result = all(result['status'] == 'PASSED' for result in self.test_results)
+        # Overall test result (quarantined failures do not fail the run)
+        overall_result = all(result['status'] in PASSING_STATUSES for result in self.test_results)
         
         print("="*60)
         print(f"TEST RESULT: {'PASSED' if overall_result else 'FAILED'}")
         print("="*60)
         
-        # Generate HTML report
-        self.generate_html_report(overall_result)
+        self._finish_run(overall_result)
         
         return overall_result
     
     def close(self):
-        """Close the WebDriver"""
-        self.driver.quit()
+        """Close the main WebDriver if it was started"""
+        if self._driver is None:
+            return
+        self._release_driver(self._driver)
+        self._driver = None
+        self._wait = None
         print("\n[INFO] Browser closed")
 
 
@@ -1657,18 +1868,74 @@ if __name__ == "__main__":
     # Configuration
     WEBSITE_URL = "https://www.thesouledstore.com/"
     
+    # Viewport matrix mode: hamburger/navbar steps across all device profiles at once
+    if "--matrix" in sys.argv:
+        from viewport_matrix import run_viewport_matrix
+        matrix_result, _, _ = run_viewport_matrix(NavbarTester, WEBSITE_URL)
+        sys.exit(0 if matrix_result else 1)
+    
     # Create tester instance
-    tester = NavbarTester(WEBSITE_URL)
+    from flake_tracker import FlakeTracker
+    from perf_budget import PerformanceGate
+    
+    performance_gate = PerformanceGate()
+    hooks = [performance_gate]
+    
+    # Opt-in DevTools collectors: console errors, network cost per origin and browser resources
+    # (use NetworkInterceptor(block_groups=['analytics', 'ads']) for faster functional runs)
+    if "--collect" in sys.argv:
+        from console_errors import ConsoleErrorCollector
+        from network_interception import NetworkInterceptor
+        hooks += [ConsoleErrorCollector(), NetworkInterceptor()]
+        try:
+            from resource_monitor import ResourceMonitor
+            hooks.append(ResourceMonitor())
+        except ImportError:
+            print("[INFO] psutil not installed; browser resource monitoring disabled")
+    
+    # Opt-in sampling profile of the Python side, written next to the report
+    if "--profile-harness" in sys.argv:
+        from harness_profiler import HarnessProfiler
+        hooks.append(HarnessProfiler())
+    
+    # Opt-in OTLP/JSON trace of the run (run -> steps -> driver/navigation/waits/clicks)
+    if "--trace" in sys.argv:
+        from trace_export import TraceExporter
+        hooks.append(TraceExporter())
+    
+    # Opt-in shared, size-bounded disk cache: later browsers start with the store's assets cached
+    if "--shared-cache" in sys.argv:
+        from browser_cache import SharedBrowserCache
+        hooks.append(SharedBrowserCache())
+    
+    # Opt-in incremental run: structural steps are skipped while their DOM fingerprint is unchanged
+    if "--incremental" in sys.argv:
+        from dom_fingerprint import DomFingerprints
+        hooks.append(DomFingerprints())
     
+    # Opt-in Prometheus textfile (step histograms, pass/fail counters, browser gauges)
+    if "--metrics" in sys.argv:
+        from metrics_exporter import StepMetrics
+        hooks.append(StepMetrics(textfile='test_reports/soulstore_navbar.prom'))
+    
+    tester = NavbarTester(
+        WEBSITE_URL,
+        # Opt-in retries with backoff; by default every step runs once
+        retry_policy=RetryPolicy(max_attempts=3 if "--retries" in sys.argv else 1),
+        flake_tracker=FlakeTracker('test_reports/flake_store.json'),
+        hooks=hooks
+    )
+    
+    result = False
     try:
         # Run the navbar test
         result = tester.run_complete_navbar_test()
         
-        # Keep browser open for 5 seconds to see the result
-        time.sleep(5)
-        
     except Exception as e:
         print(f"[CRITICAL ERROR] {str(e)}")
         
     finally:
         tester.close()
+    
+    # Exit code reflects the steps and the performance gate
+    sys.exit(0 if result and performance_gate.passed(tester) else 1)
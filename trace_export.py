@@ -0,0 +1,255 @@
+"""
+Trace export of test runs in OpenTelemetry (OTLP/JSON) format
+Every run of a tester becomes a trace: the run is the root span, each test_*
+step a child span, and browser start, driver.get navigations, WebDriverWait
+waits and element clicks are grandchildren. WebDriver.get, WebElement.click
+and WebDriverWait.until are wrapped once per process; the wrappers only record
+spans on threads that are inside a traced step.
+
+The file written next to the HTML report (<report>_trace.json) is an OTLP
+ExportTraceServiceRequest in JSON, which OpenTelemetry collectors and most
+tracing backends can import.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+
+from step_runner import StepHook
+
+
+SERVICE_NAME = 'soul-store-ui-tests'
+SCOPE_NAME = 'soul_store.trace_export'
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_local = threading.local()
+_patch_lock = threading.Lock()
+_patched = False
+
+
+def _now_ns():
+    return time.time_ns()
+
+
+def _active_span():
+    """The innermost open span of this thread (inside a traced step), or None"""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+def _traced(name, kind=SPAN_KIND_CLIENT, attributes=None):
+    """Run the wrapped call inside a child span of the thread's active span"""
+    def wrap(original):
+        def wrapper(*args, **kwargs):
+            parent = _active_span()
+            if parent is None:
+                return original(*args, **kwargs)
+            exporter, parent_span = parent
+            span = exporter._start_span(name, parent_span, kind, attributes(*args, **kwargs) if attributes else {})
+            _local.stack.append((exporter, span))
+            try:
+                value = original(*args, **kwargs)
+            except BaseException as e:
+                # Selenium exceptions keep the bare message (without stack trace) in .msg
+                lines = str(getattr(e, 'msg', None) or e).strip().splitlines()
+                exporter._end_span(span, STATUS_ERROR, type(e).__name__ + (f": {lines[0]}" if lines else ''))
+                raise
+            finally:
+                _local.stack.pop()
+            exporter._end_span(span, STATUS_OK)
+            return value
+        wrapper.__wrapped__ = original
+        return wrapper
+    return wrap
+
+
+def _condition_name(method):
+    name = getattr(method, '__qualname__', None) or type(method).__name__
+    # expected_conditions return closures such as element_to_be_clickable.<locals>._predicate
+    return name.split('.<locals>')[0]
+
+
+def install_patches():
+    """Wrap WebDriver.get, WebElement.click and WebDriverWait.until (once per process)"""
+    global _patched
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    with _patch_lock:
+        if _patched:
+            return
+        WebDriver.get = _traced('navigation', attributes=lambda driver, url: {'url.full': url})(WebDriver.get)
+        WebElement.click = _traced('click', attributes=lambda element: {'webdriver.element_id': element.id})(
+            WebElement.click)
+        WebDriverWait.until = _traced('wait', SPAN_KIND_INTERNAL, attributes=lambda wait, method, message='': {
+            'wait.condition': _condition_name(method),
+            'wait.timeout_s': float(getattr(wait, '_timeout', 0)),
+        })(WebDriverWait.until)
+        _patched = True
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+class TraceExporter(StepHook):
+    def __init__(self, service_name=SERVICE_NAME):
+        """
+        Args:
+            service_name (str): service.name resource attribute of the exported traces
+        """
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        # (id(tester), run start) -> root span
+        self._roots = {}
+        self._spans = []
+        install_patches()
+
+    def _start_span(self, name, parent, kind=SPAN_KIND_INTERNAL, attributes=None, start_ns=None):
+        return {
+            'traceId': parent['traceId'] if parent else secrets.token_hex(16),
+            'spanId': secrets.token_hex(8),
+            'parentSpanId': parent['spanId'] if parent else '',
+            'name': name,
+            'kind': kind,
+            'startTimeUnixNano': start_ns or _now_ns(),
+            'attributes': dict(attributes or {}),
+        }
+
+    def _end_span(self, span, status_code, message='', end_ns=None):
+        span['endTimeUnixNano'] = end_ns or _now_ns()
+        span['status'] = {'code': status_code, 'message': message} if message else {'code': status_code}
+        with self._lock:
+            self._spans.append(span)
+
+    def _root(self, tester):
+        """Root span of the tester's current run (a new run starts a new trace)"""
+        key = (id(tester), tester.start_time)
+        with self._lock:
+            root = self._roots.get(key)
+            if root is None:
+                start_ns = int(tester.start_time * 1e9) if tester.start_time else _now_ns()
+                root = self._start_span(f"{type(tester).__name__} run", None, start_ns=start_ns, attributes={
+                    'test.suite': type(tester).__name__,
+                    'url.full': getattr(tester, 'website_url', ''),
+                })
+                root['_tester'] = tester
+                self._roots[key] = root
+        return root
+
+    def configure_options(self, tester, options):
+        # A browser is being launched (not taken from a pool); on_driver_created ends the span
+        parent = _active_span()
+        _local.driver_start = (_now_ns(), parent)
+
+    def on_driver_created(self, tester, driver):
+        start_ns, parent = getattr(_local, 'driver_start', (None, None))
+        _local.driver_start = (None, None)
+        active = _active_span()
+        if active is None or active[0] is not self:
+            return
+        name = 'driver.start' if start_ns and parent is active else 'driver.acquire'
+        span = self._start_span(name, active[1], SPAN_KIND_CLIENT, {'webdriver.session_id': driver.session_id},
+                                start_ns=start_ns if name == 'driver.start' else None)
+        self._end_span(span, STATUS_OK)
+
+    def before_step(self, tester, step_name):
+        root = self._root(tester)
+        span = self._start_span(step_name, root, attributes={'test.step': step_name})
+        if not hasattr(_local, 'stack'):
+            _local.stack = []
+        _local.stack.append((self, span))
+
+    def after_step(self, tester, step_name, result):
+        stack = getattr(_local, 'stack', [])
+        if not stack or stack[-1][0] is not self:
+            return
+        _, span = stack.pop()
+        span['attributes'].update({
+            'test.result': result['status'],
+            'test.attempts': result.get('attempts', 1),
+            'test.title': result['step'],
+        })
+        for metric, value in (result.get('metrics') or {}).items():
+            span['attributes'][f'test.metric.{metric}'] = float(value)
+        if result['status'] == 'FAILED':
+            self._end_span(span, STATUS_ERROR, str(result.get('message', ''))[:500])
+        else:
+            self._end_span(span, STATUS_OK)
+
+    def _close_roots(self, tester=None):
+        """End the root spans (of one tester or all) and return them"""
+        closed = []
+        with self._lock:
+            for key, root in list(self._roots.items()):
+                if tester is not None and root['_tester'] is not tester:
+                    continue
+                del self._roots[key]
+                children = [span for span in self._spans if span['traceId'] == root['traceId']]
+                end = root['_tester'].end_time
+                end_ns = int(end * 1e9) if end else max((span['endTimeUnixNano'] for span in children), default=_now_ns())
+                failed = any(span['parentSpanId'] == root['spanId'] and span['status']['code'] == STATUS_ERROR
+                             for span in children)
+                root.pop('_tester')
+                root['endTimeUnixNano'] = end_ns
+                root['status'] = {'code': STATUS_ERROR if failed else STATUS_OK}
+                self._spans.append(root)
+                closed.append(root)
+        return closed
+
+    def export(self, tester=None):
+        """
+        OTLP/JSON ExportTraceServiceRequest with the finished runs (of one tester or all)
+
+        The exported spans are removed from the exporter.
+        """
+        trace_ids = {root['traceId'] for root in self._close_roots(tester)}
+        with self._lock:
+            if tester is None:
+                spans, self._spans = self._spans, []
+            else:
+                spans = [span for span in self._spans if span['traceId'] in trace_ids]
+                self._spans = [span for span in self._spans if span['traceId'] not in trace_ids]
+
+        otlp_spans = []
+        for span in sorted(spans, key=lambda span: span['startTimeUnixNano']):
+            otlp = {key: value for key, value in span.items() if key != 'attributes'}
+            otlp['startTimeUnixNano'] = str(span['startTimeUnixNano'])
+            otlp['endTimeUnixNano'] = str(span['endTimeUnixNano'])
+            otlp['attributes'] = [_attribute(key, value) for key, value in span['attributes'].items()]
+            otlp_spans.append(otlp)
+        return {'resourceSpans': [{
+            'resource': {'attributes': [_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': otlp_spans}],
+        }]}
+
+    def write(self, path, tester=None):
+        """Write the finished runs as OTLP/JSON and return the number of spans"""
+        request = self.export(tester)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(request, f)
+        return len(request['resourceSpans'][0]['scopeSpans'][0]['spans'])
+
+    def on_report_written(self, tester, report_path):
+        trace_path = f"{os.path.splitext(report_path)[0]}_trace.json"
+        count = self.write(trace_path, tester)
+        print(f"[TRACE] {count} span(s) written: {trace_path}")
@@ -0,0 +1,266 @@
+"""
+Search-as-you-type latency benchmark
+Types each query of a corpus into input#search one character at a time and
+measures, inside the page, the time from each keydown to the first update of
+the suggestion list (MutationObserver) and to the moment the list settles.
+The report shows latency distributions per prefix length.
+
+Usage:
+    python typeahead.py
+    python typeahead.py --queries shirts,hoodies,joggers --profile mobile
+    python typeahead.py --corpus queries.txt --timeout 3
+"""
+
+import argparse
+import time
+
+from step_runner import StepHook, PASSING_STATUSES
+
+
+# Containers that hold search suggestions; mutations elsewhere on the page are ignored
+SUGGESTION_SELECTORS = (
+    "[class*='suggest'], [class*='autocomplete'], [class*='search-result'], "
+    "[class*='searchResult'], [class*='search-list'], [role='listbox']"
+)
+
+DEFAULT_QUERIES = [
+    'shirts', 'hoodies', 'joggers', 'oversized t-shirts', 'marvel', 'harry potter', 'naruto', 'sneakers',
+]
+
+# Records keydown times and relevant mutation times on the page's own clock
+INSTALL_OBSERVER_JS = """
+const input = arguments[0];
+const selectors = arguments[1];
+if (window.__typeahead) { window.__typeahead.observer.disconnect(); }
+const state = {keys: [], mutations: [], observer: null};
+const inside = node => {
+    const element = node.nodeType === 1 ? node : node.parentElement;
+    return !!element && !!element.closest(selectors);
+};
+// Added nodes may also be a wrapper around a new suggestion container
+const containsList = node => inside(node) || (node.nodeType === 1 && !!node.querySelector(selectors));
+state.observer = new MutationObserver(records => {
+    const now = performance.now();
+    for (const record of records) {
+        if (inside(record.target) || Array.from(record.addedNodes).some(containsList)) {
+            state.mutations.push(now);
+            return;
+        }
+    }
+});
+state.observer.observe(document.body, {childList: true, subtree: true, characterData: true,
+                                       attributes: true, attributeFilter: ['class', 'style', 'hidden']});
+input.addEventListener('keydown', () => state.keys.push(performance.now()), true);
+window.__typeahead = state;
+"""
+
+READ_STATE_JS = "const s = window.__typeahead; return [s.keys.slice(), s.mutations.slice(), performance.now()];"
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def type_query(driver, search_input, query, timeout=2.0, settle=0.3):
+    """
+    Type a query one character at a time and time the suggestion updates
+
+    After every key the next one is only sent once the suggestions settled
+    (no relevant mutation for `settle` seconds) or `timeout` passed, so
+    debounced lookups are measured instead of being cancelled by the next key.
+
+    Returns:
+        list: One dict per keystroke: prefix, first_ms and settled_ms (None without an update)
+    """
+    keystrokes = []
+    for length in range(1, len(query) + 1):
+        search_input.send_keys(query[length - 1])
+        deadline = time.time() + timeout
+        after, key_time = [], None
+        while time.time() < deadline:
+            time.sleep(0.05)
+            keys, mutations, now = driver.execute_script(READ_STATE_JS)
+            if not keys:
+                continue
+            key_time = keys[-1]
+            after = [t for t in mutations if t >= key_time]
+            if after and now - after[-1] >= settle * 1000:
+                break
+
+        keystrokes.append({
+            'prefix': query[:length],
+            'first_ms': round(after[0] - key_time, 1) if after else None,
+            'settled_ms': round(after[-1] - key_time, 1) if after else None,
+        })
+    return keystrokes
+
+
+def clear_search(driver, search_input, settle=0.5):
+    """Empty the search field and let the suggestion list close"""
+    from selenium.webdriver.common.keys import Keys
+
+    search_input.send_keys(Keys.CONTROL, 'a')
+    search_input.send_keys(Keys.DELETE)
+    driver.execute_script("arguments[0].value = '';", search_input)
+    time.sleep(settle)
+
+
+class TypeaheadSummary(StepHook):
+    """Adds the per-prefix-length latency table to the typeahead report"""
+
+    def __init__(self, keystrokes):
+        self.keystrokes = keystrokes
+
+    def distribution(self):
+        """{prefix length: stats} over every query"""
+        by_length = {}
+        for keystroke in self.keystrokes:
+            by_length.setdefault(len(keystroke['prefix']), []).append(keystroke)
+        stats = {}
+        for length, entries in sorted(by_length.items()):
+            first = [entry['first_ms'] for entry in entries if entry['first_ms'] is not None]
+            settled = [entry['settled_ms'] for entry in entries if entry['settled_ms'] is not None]
+            stats[length] = {
+                'keystrokes': len(entries),
+                'no_update': len(entries) - len(first),
+                'p50': _percentile(first, 0.5) if first else None,
+                'p90': _percentile(first, 0.9) if first else None,
+                'max': max(first) if first else None,
+                'settled_p50': _percentile(settled, 0.5) if settled else None,
+            }
+        return stats
+
+    def report_section(self, tester):
+        def ms(value):
+            return '-' if value is None else f'{value:.0f}'
+
+        rows = ''.join(f'''
+                <tr>
+                    <td>{length}</td>
+                    <td>{stats['keystrokes']}</td>
+                    <td>{stats['no_update']}</td>
+                    <td>{ms(stats['p50'])}</td>
+                    <td>{ms(stats['p90'])}</td>
+                    <td>{ms(stats['max'])}</td>
+                    <td>{ms(stats['settled_p50'])}</td>
+                </tr>''' for length, stats in self.distribution().items())
+        return ('⌨ Typeahead Latency by Prefix Length', f'''
+            <p class="report-note">Keydown to first suggestion-list update (and to the list settling), measured in the page.</p>
+            <table class="report-table">
+                <tr><th>Prefix length</th><th>Keystrokes</th><th>No update</th><th>p50 (ms)</th><th>p90 (ms)</th><th>Max (ms)</th><th>Settled p50 (ms)</th></tr>{rows}
+            </table>''')
+
+
+def run_typeahead_benchmark(tester_cls, website_url, queries=None, device_profile=None, timeout=2.0):
+    """
+    Type every query of the corpus into the store's search field and write a report
+
+    Args:
+        tester_cls (type): NavbarTester (its driver setup, hooks and report are reused)
+        website_url (str): Store URL
+        queries (list): Query corpus (default: DEFAULT_QUERIES)
+        device_profile (str): Device profile from viewport_matrix.DEVICE_PROFILES
+        timeout (float): Seconds to wait for a suggestion update after each key
+
+    Returns:
+        tuple: (overall_result: bool, keystrokes: list, report_filename: str)
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    queries = queries or DEFAULT_QUERIES
+    all_keystrokes = []
+    tester = tester_cls(website_url, device_profile=device_profile)
+    tester.start_time = time.time()
+
+    print("=" * 60)
+    print("STARTING TYPEAHEAD BENCHMARK")
+    print(f"Queries: {len(queries)}")
+    print("=" * 60)
+
+    try:
+        tester.driver.get(website_url)
+        search_input = tester.wait.until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "input#search[type='search']"))
+        )
+        tester.driver.execute_script(INSTALL_OBSERVER_JS, search_input, SUGGESTION_SELECTORS)
+        search_input.click()
+
+        for query in queries:
+            query_start = time.time()
+            try:
+                keystrokes = type_query(tester.driver, search_input, query, timeout=timeout)
+            except Exception as e:
+                tester.test_results.append({
+                    'step': f"Typeahead: '{query}'",
+                    'status': 'FAILED',
+                    'message': f'Could not type query: {str(e)}',
+                    'duration': f'{time.time() - query_start:.2f}s',
+                    'group': 'Typeahead',
+                })
+                continue
+            finally:
+                clear_search(tester.driver, search_input)
+
+            all_keystrokes.extend(keystrokes)
+            latencies = [keystroke['first_ms'] for keystroke in keystrokes if keystroke['first_ms'] is not None]
+            print(f"[TYPEAHEAD] '{query}': {len(latencies)}/{len(keystrokes)} keystrokes updated the suggestions")
+            tester.test_results.append({
+                'step': f"Typeahead: '{query}'",
+                'status': 'PASSED' if latencies else 'FAILED',
+                'message': (f"{len(latencies)}/{len(keystrokes)} keystrokes updated the suggestions; "
+                            f"median {_percentile(latencies, 0.5):.0f} ms" if latencies else
+                            'No suggestion updates observed (check SUGGESTION_SELECTORS)'),
+                'duration': f'{time.time() - query_start:.2f}s',
+                'details': [('Per keystroke (ms)', ', '.join(
+                    f"{keystroke['prefix']}: " + ('-' if keystroke['first_ms'] is None else f"{keystroke['first_ms']:.0f}")
+                    for keystroke in keystrokes
+                ))],
+                'group': 'Typeahead',
+            })
+    except Exception as e:
+        tester.test_results.append({
+            'step': 'Typeahead: open search',
+            'status': 'FAILED',
+            'message': f'Could not open the search field: {str(e)}',
+            'duration': f'{time.time() - tester.start_time:.2f}s',
+            'group': 'Typeahead',
+        })
+    finally:
+        tester.close()
+
+    tester.end_time = time.time()
+    tester.hooks.append(TypeaheadSummary(all_keystrokes))
+    overall_result = bool(tester.test_results) and all(
+        result['status'] in PASSING_STATUSES for result in tester.test_results)
+    report_filename = tester.generate_html_report(overall_result)
+    return overall_result, all_keystrokes, report_filename
+
+
+def main(argv=None):
+    from suites import SUITES, load_suite_class
+    from viewport_matrix import DEVICE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Measure search-as-you-type latency per keystroke')
+    parser.add_argument('--queries', help='Comma-separated queries')
+    parser.add_argument('--corpus', help='File with one query per line')
+    parser.add_argument('--url', default=SUITES['navbar']['url'])
+    parser.add_argument('--profile', choices=list(DEVICE_PROFILES), help='Device profile')
+    parser.add_argument('--timeout', type=float, default=2.0, help='Seconds to wait for an update per key')
+    args = parser.parse_args(argv)
+
+    queries = None
+    if args.corpus:
+        with open(args.corpus, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    elif args.queries:
+        queries = [query.strip() for query in args.queries.split(',') if query.strip()]
+
+    overall_result, _, _ = run_typeahead_benchmark(load_suite_class('navbar'), args.url, queries,
+                                                   device_profile=args.profile, timeout=args.timeout)
+    return 0 if overall_result else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
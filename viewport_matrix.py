@@ -0,0 +1,148 @@
+"""
+Viewport matrix runner for the hamburger and navbar checks
+Website: https://www.thesouledstore.com/
+Runs the navbar steps across several viewports and device-emulation profiles
+concurrently and writes one report with the results grouped by profile.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from step_runner import run_step, PASSING_STATUSES
+
+
+MOBILE_USER_AGENT = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+TABLET_USER_AGENT = (
+    "Mozilla/5.0 (iPad; CPU OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+
+# Desktop profiles only size the window; mobile/tablet profiles use Chrome's device emulation
+DEVICE_PROFILES = {
+    'desktop': {'window_size': (1920, 1080)},
+    'laptop': {'window_size': (1366, 768)},
+    'tablet': {
+        'window_size': (900, 1200),
+        'device_metrics': {'width': 768, 'height': 1024, 'pixelRatio': 2.0},
+        'user_agent': TABLET_USER_AGENT,
+    },
+    'mobile': {
+        'window_size': (500, 950),
+        'device_metrics': {'width': 390, 'height': 844, 'pixelRatio': 3.0},
+        'user_agent': MOBILE_USER_AGENT,
+    },
+}
+
+# Steps that depend on the layout; they share the main driver so they run in order
+MATRIX_STEPS = [
+    'test_hamburger_menu_presence',
+    'test_hamburger_menu_clickable',
+    'test_menu_opens',
+    'test_navbar_structure',
+]
+
+
+def apply_device_profile(options, profile_name):
+    """
+    Apply a device profile to Chrome options
+
+    Args:
+        options (ChromeOptions): Options that will be used to start the browser
+        profile_name (str): Key of DEVICE_PROFILES
+    """
+    if profile_name not in DEVICE_PROFILES:
+        raise ValueError(f"Unknown device profile '{profile_name}'. "
+                         f"Available: {', '.join(DEVICE_PROFILES)}")
+
+    profile = DEVICE_PROFILES[profile_name]
+    width, height = profile['window_size']
+    options.add_argument(f"--window-size={width},{height}")
+
+    if 'device_metrics' in profile:
+        options.add_experimental_option('mobileEmulation', {
+            'deviceMetrics': profile['device_metrics'],
+            'userAgent': profile['user_agent'],
+        })
+
+
+def _run_profile(tester_cls, website_url, profile_name, steps):
+    """Run the matrix steps for one profile in its own browser"""
+    print(f"\n[MATRIX] Starting profile '{profile_name}'")
+    tester = tester_cls(website_url, device_profile=profile_name)
+    try:
+        for step in steps:
+            # Later steps depend on the earlier ones (e.g. the menu must be clicked first)
+            if not run_step(tester, getattr(tester, step)):
+                break
+    finally:
+        tester.close()
+
+    for result in tester.test_results:
+        result['group'] = profile_name
+    return tester.test_results
+
+
+def run_viewport_matrix(tester_cls, website_url, profiles=None, steps=None, max_workers=None):
+    """
+    Run the navbar steps for every profile concurrently and write one grouped report
+
+    Args:
+        tester_cls (type): NavbarTester (or a compatible class taking device_profile)
+        website_url (str): Store URL to test
+        profiles (list): Profile names (default: all DEVICE_PROFILES)
+        steps (list): Step method names (default: MATRIX_STEPS)
+        max_workers (int): Concurrent browsers (default: one per profile)
+
+    Returns:
+        tuple: (overall_result: bool, results_by_profile: dict, report_filename: str)
+    """
+    profiles = profiles or list(DEVICE_PROFILES)
+    steps = steps or MATRIX_STEPS
+
+    print("=" * 60)
+    print("STARTING VIEWPORT MATRIX TEST")
+    print(f"Profiles: {', '.join(profiles)}")
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    start_time = time.time()
+    results_by_profile = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(profiles)) as executor:
+        futures = {
+            profile: executor.submit(_run_profile, tester_cls, website_url, profile, steps)
+            for profile in profiles
+        }
+        for profile, future in futures.items():
+            try:
+                results_by_profile[profile] = future.result()
+            except Exception as e:
+                print(f"[ERROR] Profile '{profile}' failed to run: {str(e)}")
+                results_by_profile[profile] = [{
+                    'step': 'Browser Startup',
+                    'status': 'FAILED',
+                    'message': f'Could not run profile: {str(e)}',
+                    'duration': '0.00s',
+                    'group': profile,
+                }]
+
+    # The report tester never starts a browser; it only renders the merged results
+    report_tester = tester_cls(website_url)
+    report_tester.start_time = start_time
+    report_tester.end_time = time.time()
+    report_tester.test_results = [result for profile in profiles for result in results_by_profile[profile]]
+
+    overall_result = all(result['status'] in PASSING_STATUSES for result in report_tester.test_results)
+
+    print("=" * 60)
+    for profile in profiles:
+        passed = sum(1 for result in results_by_profile[profile] if result['status'] == 'PASSED')
+        print(f"  {profile}: {passed}/{len(results_by_profile[profile])} steps passed")
+    print(f"MATRIX RESULT: {'PASSED' if overall_result else 'FAILED'}")
+    print("=" * 60)
+
+    report_filename = report_tester.generate_html_report(overall_result)
+    return overall_result, results_by_profile, report_filename
@@ -0,0 +1,241 @@
+"""
+Visual regression check for the navbar region
+Website: https://www.thesouledstore.com/
+Crops the navbar and brand icon regions out of a single page screenshot and
+compares them with stored baselines using NumPy array operations.
+
+Requires: pip install numpy pillow
+"""
+
+import io
+import os
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+
+# Regions cropped out of the page screenshot (name -> CSS selector)
+DEFAULT_REGIONS = {
+    'navbar': "nav, .navbar",
+    'brand_icon': ".icon-container a[href='/']",
+}
+
+# Returns the bounding rect of every region plus the device pixel ratio in one round trip
+REGION_RECTS_SCRIPT = """
+const selectors = arguments[0];
+const rects = {};
+for (const [name, selector] of Object.entries(selectors)) {
+    const el = document.querySelector(selector);
+    if (!el) { rects[name] = null; continue; }
+    const r = el.getBoundingClientRect();
+    rects[name] = {x: r.left, y: r.top, width: r.width, height: r.height};
+}
+return {
+    rects: rects,
+    dpr: window.devicePixelRatio || 1,
+    viewport: [window.innerWidth, window.innerHeight]
+};
+"""
+
+
+def build_tolerance_mask(baseline, pixel_tolerance=16, edge_tolerance=64, edge_threshold=48):
+    """
+    Build a per-pixel tolerance mask for a baseline image
+
+    Pixels on strong edges (anti-aliased text, icon outlines) get a looser
+    tolerance than flat areas, so sub-pixel rendering noise does not count
+    as a mismatch while real content changes still do.
+
+    Args:
+        baseline (np.ndarray): HxWx3 uint8 baseline image
+        pixel_tolerance (int): Allowed channel difference on flat areas
+        edge_tolerance (int): Allowed channel difference on edges
+        edge_threshold (int): Gradient magnitude that marks a pixel as an edge
+
+    Returns:
+        np.ndarray: HxW int16 tolerance values
+    """
+    gray = baseline.astype(np.int16).max(axis=2)
+    grad_x = np.zeros_like(gray)
+    grad_y = np.zeros_like(gray)
+    grad_x[:, 1:] = np.abs(np.diff(gray, axis=1))
+    grad_y[1:, :] = np.abs(np.diff(gray, axis=0))
+    edges = np.maximum(grad_x, grad_y) > edge_threshold
+    return np.where(edges, edge_tolerance, pixel_tolerance).astype(np.int16)
+
+
+def compare_images(baseline, current, tolerance_mask, max_mismatch_ratio=0.01):
+    """
+    Compare a cropped region with its baseline
+
+    Args:
+        baseline (np.ndarray): HxWx3 uint8 baseline image
+        current (np.ndarray): HxWx3 uint8 current image
+        tolerance_mask (np.ndarray): HxW per-pixel tolerance from build_tolerance_mask
+        max_mismatch_ratio (float): Fraction of pixels allowed to differ
+
+    Returns:
+        dict: passed, mismatch_ratio, mismatch_bbox and the boolean diff mask
+    """
+    if baseline.shape != current.shape:
+        return {
+            'passed': False,
+            'mismatch_ratio': 1.0,
+            'mismatch_bbox': None,
+            'diff_mask': None,
+            'reason': f'Size changed from {baseline.shape[1]}x{baseline.shape[0]} '
+                      f'to {current.shape[1]}x{current.shape[0]}',
+        }
+
+    diff = np.abs(current.astype(np.int16) - baseline.astype(np.int16)).max(axis=2)
+    diff_mask = diff > tolerance_mask
+    mismatch_ratio = float(diff_mask.mean()) if diff_mask.size else 0.0
+
+    bbox = None
+    if mismatch_ratio > 0:
+        rows = np.flatnonzero(diff_mask.any(axis=1))
+        cols = np.flatnonzero(diff_mask.any(axis=0))
+        bbox = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+    passed = mismatch_ratio <= max_mismatch_ratio
+    return {
+        'passed': passed,
+        'mismatch_ratio': mismatch_ratio,
+        'mismatch_bbox': bbox,
+        'diff_mask': diff_mask,
+        'reason': '' if passed else f'{mismatch_ratio:.2%} of pixels differ',
+    }
+
+
+class NavbarVisualChecker:
+    def __init__(self, baseline_dir='visual_baselines', regions=None, pixel_tolerance=16,
+                 edge_tolerance=64, max_mismatch_ratio=0.01, update_baselines=False,
+                 diff_dir='test_reports/visual_diffs'):
+        """
+        Initialize the checker
+
+        Args:
+            baseline_dir (str): Directory holding the .npy baselines
+            regions (dict): Region name -> CSS selector (default: navbar and brand icon)
+            pixel_tolerance (int): Allowed channel difference on flat areas
+            edge_tolerance (int): Allowed channel difference on edges
+            max_mismatch_ratio (float): Fraction of pixels allowed to differ per region
+            update_baselines (bool): Overwrite baselines with the current capture
+            diff_dir (str): Where diff masks of failed regions are written
+        """
+        self.baseline_dir = baseline_dir
+        self.regions = regions or DEFAULT_REGIONS
+        self.pixel_tolerance = pixel_tolerance
+        self.edge_tolerance = edge_tolerance
+        self.max_mismatch_ratio = max_mismatch_ratio
+        self.update_baselines = update_baselines
+        self.diff_dir = diff_dir
+        # Baselines and tolerance masks are loaded once and reused across iterations
+        self._baselines = {}
+
+    def capture_regions(self, driver):
+        """
+        Take one screenshot and crop every configured region out of it
+
+        Returns:
+            tuple: (crops: dict name -> np.ndarray or None, viewport: (width, height))
+        """
+        layout = driver.execute_script(REGION_RECTS_SCRIPT, self.regions)
+        png = driver.get_screenshot_as_png()
+        screenshot = np.asarray(Image.open(io.BytesIO(png)).convert('RGB'))
+        dpr = layout['dpr']
+
+        crops = {}
+        for name, rect in layout['rects'].items():
+            if not rect or rect['width'] <= 0 or rect['height'] <= 0:
+                crops[name] = None
+                continue
+            left = max(int(round(rect['x'] * dpr)), 0)
+            top = max(int(round(rect['y'] * dpr)), 0)
+            right = min(int(round((rect['x'] + rect['width']) * dpr)), screenshot.shape[1])
+            bottom = min(int(round((rect['y'] + rect['height']) * dpr)), screenshot.shape[0])
+            crops[name] = screenshot[top:bottom, left:right] if right > left and bottom > top else None
+
+        return crops, tuple(layout['viewport'])
+
+    def _baseline_key(self, region, viewport):
+        return f"{region}_{viewport[0]}x{viewport[1]}"
+
+    def _load_baseline(self, key):
+        if key in self._baselines:
+            return self._baselines[key]
+
+        path = os.path.join(self.baseline_dir, f"{key}.npy")
+        if not os.path.exists(path):
+            return None
+
+        baseline = np.load(path)
+        entry = (baseline, build_tolerance_mask(baseline, self.pixel_tolerance, self.edge_tolerance))
+        self._baselines[key] = entry
+        return entry
+
+    def _save_baseline(self, key, image):
+        os.makedirs(self.baseline_dir, exist_ok=True)
+        np.save(os.path.join(self.baseline_dir, f"{key}.npy"), image)
+        # PNG copy so the baseline can be reviewed by eye
+        Image.fromarray(image).save(os.path.join(self.baseline_dir, f"{key}.png"))
+        self._baselines[key] = (image, build_tolerance_mask(image, self.pixel_tolerance, self.edge_tolerance))
+
+    def _save_diff(self, key, current, diff_mask):
+        os.makedirs(self.diff_dir, exist_ok=True)
+        highlighted = current.copy()
+        highlighted[diff_mask] = (255, 0, 0)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        path = os.path.join(self.diff_dir, f"{key}_{timestamp}.png")
+        Image.fromarray(highlighted).save(path)
+        return path
+
+    def check(self, driver):
+        """
+        Capture the navbar regions and compare them with the baselines
+
+        Returns:
+            dict: region name -> comparison result (status, mismatch_ratio, message)
+        """
+        crops, viewport = self.capture_regions(driver)
+        results = {}
+
+        for region, current in crops.items():
+            key = self._baseline_key(region, viewport)
+
+            if current is None:
+                results[region] = {
+                    'status': 'FAILED',
+                    'mismatch_ratio': 1.0,
+                    'message': f'Region not found or not rendered: {self.regions[region]}',
+                }
+                continue
+
+            baseline = None if self.update_baselines else self._load_baseline(key)
+            if baseline is None:
+                self._save_baseline(key, current)
+                results[region] = {
+                    'status': 'PASSED',
+                    'mismatch_ratio': 0.0,
+                    'message': f'Baseline recorded ({current.shape[1]}x{current.shape[0]})',
+                }
+                continue
+
+            comparison = compare_images(baseline[0], current, baseline[1], self.max_mismatch_ratio)
+            if comparison['passed']:
+                message = f"Matches baseline ({comparison['mismatch_ratio']:.2%} pixels differ)"
+            else:
+                message = comparison['reason']
+                if comparison['mismatch_bbox']:
+                    message += f" in box {comparison['mismatch_bbox']}"
+                if comparison['diff_mask'] is not None:
+                    message += f" - diff: {self._save_diff(key, current, comparison['diff_mask'])}"
+
+            results[region] = {
+                'status': 'PASSED' if comparison['passed'] else 'FAILED',
+                'mismatch_ratio': comparison['mismatch_ratio'],
+                'message': message,
+            }
+
+        return results